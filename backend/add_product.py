@@ -1,26 +1,186 @@
 # Placeholder for Python script
-from database.db_config import connect_to_database
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+
+from backend.catalog_cache import invalidate_catalog
+from backend.event_log import append_new_product_events, append_stock_events
+from database.db_config import get_connection
+
+# Rows sent per executemany() call and rows committed per transaction
+IMPORT_BATCH_SIZE = 1000
+IMPORT_TRANSACTION_SIZE = 10000
+
+INSERT_PRODUCTS_QUERY = """
+INSERT INTO Products (Name, Category, Price, Stock)
+VALUES (%s, %s, %s, %s)
+"""
+
+# Products has no natural unique key, so rows carrying a ProductID are
+# upserted on the primary key and rows without one are always inserted.
+UPSERT_PRODUCTS_QUERY = """
+INSERT INTO Products (ProductID, Name, Category, Price, Stock)
+VALUES (%s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    Name = VALUES(Name),
+    Category = VALUES(Category),
+    Price = VALUES(Price),
+    Stock = VALUES(Stock)
+"""
+
 
 def add_product(name, category, price, stock):
     """Add a new product to the inventory."""
     try:
-        db = connect_to_database()
-        cursor = db.cursor()
-
-        query = """
-        INSERT INTO Products (Name, Category, Price, Stock)
-        VALUES (%s, %s, %s, %s)
-        """
-        cursor.execute(query, (name, category, price, stock))
-        db.commit()
+        with get_connection() as db:
+            cursor = db.cursor()
+            try:
+                cursor.execute(INSERT_PRODUCTS_QUERY, (name, category, price, stock))
+                append_stock_events(cursor, [cursor.lastrowid])
+                db.commit()
+            finally:
+                cursor.close()
+        invalidate_catalog()
         print(f"Product '{name}' added successfully!")
     except Exception as e:
         print(f"Error adding product: {e}")
-    finally:
-        if db.is_connected():
+
+
+def read_product_records(path):
+    """Yield product records one at a time from a CSV or JSONL file."""
+    if path.lower().endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+
+
+def _normalize_record(record):
+    """Convert a raw record into (ProductID or None, Name, Category, Price, Stock)."""
+    name = (record.get("Name") or "").strip()
+    if not name:
+        raise ValueError("Name is required")
+    product_id = record.get("ProductID")
+    product_id = int(product_id) if product_id not in (None, "") else None
+    category = record.get("Category") or None
+    price = float(record["Price"]) if record.get("Price") not in (None, "") else None
+    stock = int(record.get("Stock") or 0)
+    return product_id, name, category, price, stock
+
+
+def _load_checkpoint(checkpoint_path, source):
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
+        return 0
+    with open(checkpoint_path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("source") != source:
+        raise ValueError(f"Checkpoint {checkpoint_path} belongs to {checkpoint.get('source')}")
+    return checkpoint["committed"]
+
+
+def _save_checkpoint(checkpoint_path, source, committed):
+    if not checkpoint_path:
+        return
+    # Write-then-rename so a crash never leaves a half-written checkpoint.
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"source": source, "committed": committed}, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def _write_batch(cursor, batch):
+    inserts = [row[1:] for row in batch if row[0] is None]
+    upserts = [row for row in batch if row[0] is not None]
+    if inserts:
+        cursor.execute("SELECT COALESCE(MAX(ProductID), 0) FROM Products")
+        last_id = cursor.fetchone()[0]
+        cursor.executemany(INSERT_PRODUCTS_QUERY, inserts)
+        append_new_product_events(cursor, last_id)
+    if upserts:
+        cursor.executemany(UPSERT_PRODUCTS_QUERY, upserts)
+        append_stock_events(cursor, [row[0] for row in upserts])
+
+
+def import_products(path, batch_size=IMPORT_BATCH_SIZE, transaction_size=IMPORT_TRANSACTION_SIZE,
+                    checkpoint_path=None):
+    """Stream products from a CSV/JSONL file into the database in batches.
+
+    Records are written with multi-row INSERT (or INSERT ... ON DUPLICATE KEY
+    UPDATE for rows with a ProductID) and committed every ``transaction_size``
+    records. When ``checkpoint_path`` is given, the number of committed source
+    records is stored there after each commit and an interrupted import resumes
+    after the last committed record. Returns a summary dictionary.
+    """
+    source = os.path.abspath(path)
+    skip = _load_checkpoint(checkpoint_path, source)
+    processed = skip
+    imported = 0
+    rejected = []
+    started = time.perf_counter()
+
+    records = islice(read_product_records(path), skip, None)
+
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            pending = 0
+            while True:
+                chunk = list(islice(records, batch_size))
+                if not chunk:
+                    break
+
+                batch = []
+                for offset, record in enumerate(chunk, start=processed + 1):
+                    try:
+                        batch.append(_normalize_record(record))
+                    except (KeyError, TypeError, ValueError) as e:
+                        rejected.append((offset, str(e)))
+
+                _write_batch(cursor, batch)
+                processed += len(chunk)
+                imported += len(batch)
+                pending += len(chunk)
+
+                if pending >= transaction_size:
+                    db.commit()
+                    invalidate_catalog()
+                    _save_checkpoint(checkpoint_path, source, processed)
+                    pending = 0
+                    elapsed = time.perf_counter() - started
+                    print(f"Imported {imported} products ({imported / elapsed:.0f} rows/s)")
+
+            db.commit()
+        finally:
             cursor.close()
-            db.close()
+    invalidate_catalog()
+
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "imported": imported,
+        "rejected": len(rejected),
+        "resumed_from": skip,
+        "seconds": elapsed,
+        "rows_per_second": imported / elapsed if elapsed else 0.0,
+        "errors": rejected[:20],
+    }
+    print(f"Import finished: {imported} products in {elapsed:.2f}s "
+          f"({summary['rows_per_second']:.0f} rows/s), {len(rejected)} rejected.")
+    return summary
+
 
 if __name__ == "__main__":
-    # Example usage
-    add_product("Laptop", "Electronics", 850.50, 10)
+    if len(sys.argv) > 1:
+        # Bulk import: python -m backend.add_product products.csv [checkpoint.json]
+        import_products(sys.argv[1], checkpoint_path=sys.argv[2] if len(sys.argv) > 2 else None)
+    else:
+        # Example usage
+        add_product("Laptop", "Electronics", 850.50, 10)
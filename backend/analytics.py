@@ -0,0 +1,218 @@
+"""Vectorized sales and inventory analytics for the dashboards, using NumPy/pandas.
+
+Data is read in bulk from SalesDailySummary (one row per product per day,
+covering recorded sales and order lines) and the Products table, then every
+calculation - resampling, rolling averages, category breakdowns, top movers -
+runs on whole columns instead of Python loops. The summary is loaded once
+per process and afterwards only the days that received new sales are read
+again, so charts over millions of sales rows cost a watermark check plus a
+few milliseconds of pandas work.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from backend.sales_report import SUMMARY_SOURCES, refresh_sales_summary
+from database.db_config import get_connection
+
+FETCH_SIZE = 50000
+MAX_INCREMENTAL_DATES = 200  # more changed dates than this and the summary is reloaded in full
+FREQUENCIES = {"day": "D", "week": "W-MON", "month": "MS"}  # weeks start on Monday
+PERIOD_DAYS = {"day": 1, "week": 7, "month": 30.4}
+
+_daily = {"watermarks": None, "frame": None}
+_daily_lock = threading.Lock()
+
+
+def _fetch_columns(query, params, columns, dtypes):
+    """Run a query and return its result as a DataFrame, fetched in large batches."""
+    chunks = []
+    with get_connection() as db:
+        cursor = db.cursor(buffered=False)
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                chunks.append(pd.DataFrame.from_records(rows, columns=columns))
+        finally:
+            cursor.close()
+    frame = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns)
+    return frame.astype(dtypes)
+
+
+def load_products():
+    """Return the catalog as a DataFrame indexed by ProductID."""
+    frame = _fetch_columns("""
+        SELECT ProductID, Name, COALESCE(Category, ''), COALESCE(Price, 0), COALESCE(Stock, 0) FROM Products
+    """, (),
+        ["ProductID", "Name", "Category", "Price", "Stock"],
+        {"ProductID": "int64", "Name": "object", "Category": "object", "Price": "float64", "Stock": "int64"})
+    return frame.set_index("ProductID")
+
+
+def _fetch_daily(dates=None):
+    """Summary rows for all dates, or only for the given "YYYY-MM-DD" strings."""
+    where = f"WHERE SummaryDate IN ({', '.join(['%s'] * len(dates))})" if dates else ""
+    # Dates come back as text and are parsed in one vectorized call, not per row.
+    frame = _fetch_columns(
+        f"SELECT CAST(SummaryDate AS CHAR), ProductID, Quantity FROM SalesDailySummary {where}",
+        list(dates or ()), ["Date", "ProductID", "Quantity"], {"ProductID": "int64", "Quantity": "int64"})
+    frame["Date"] = pd.to_datetime(frame["Date"].astype(str).str[:10], format="%Y-%m-%d")
+    return frame
+
+
+def _touched_dates(old, new):
+    """Dates of source rows folded into the summary between two sets of watermarks."""
+    dates = set()
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            for source, spec in SUMMARY_SOURCES.items():
+                if new[source] > old[source]:
+                    cursor.execute(f"""
+                        SELECT DISTINCT {spec['date']} FROM {spec['rows']}
+                        WHERE {spec['id']} > %s AND {spec['id']} <= %s
+                    """, (old[source], new[source]))
+                    dates.update(str(row[0])[:10] for row in cursor.fetchall() if row[0] is not None)
+        finally:
+            cursor.close()
+    return dates
+
+
+def daily_sales():
+    """Return the whole daily summary as (Date, ProductID, Quantity), oldest first.
+
+    The frame is kept between calls and tagged with the summary watermarks;
+    when new sales have been folded in, only the summary rows of the dates
+    they touched are read again. The returned frame is shared; do not modify it.
+    """
+    with _daily_lock:
+        watermarks = refresh_sales_summary()
+        old = _daily["watermarks"]
+        if old == watermarks:
+            return _daily["frame"]
+        touched = None
+        if old is not None and all(watermarks[s] >= old[s] for s in watermarks):
+            touched = _touched_dates(old, watermarks)
+        if touched is None or len(touched) > MAX_INCREMENTAL_DATES:
+            frame = _fetch_daily()
+        else:
+            keys = pd.to_datetime(sorted(touched), format="%Y-%m-%d")
+            frame = pd.concat([_daily["frame"][~_daily["frame"]["Date"].isin(keys)], _fetch_daily(touched)],
+                              ignore_index=True)
+        frame = frame.sort_values(["Date", "ProductID"], kind="stable", ignore_index=True)
+        _daily["frame"] = frame
+        _daily["watermarks"] = watermarks
+        return frame
+
+
+def load_daily_sales(start_date=None, end_date=None):
+    """Return (Date, ProductID, Quantity) rows between two dates (inclusive), oldest first."""
+    frame = daily_sales()
+    mask = np.ones(len(frame), dtype=bool)
+    if start_date is not None:
+        mask &= (frame["Date"] >= pd.Timestamp(start_date)).to_numpy()
+    if end_date is not None:
+        mask &= (frame["Date"] <= pd.Timestamp(end_date)).to_numpy()
+    return frame[mask].reset_index(drop=True)
+
+
+def with_revenue(daily, products):
+    """Add Category and Revenue (at current prices) columns to daily sales."""
+    catalog = products.reindex(daily["ProductID"].to_numpy())
+    result = daily.copy()
+    result["Category"] = catalog["Category"].fillna("(deleted)").to_numpy()
+    result["Revenue"] = daily["Quantity"].to_numpy() * catalog["Price"].fillna(0).to_numpy()
+    return result
+
+
+def coarsest_needed(daily, freq="day", max_points=None):
+    """Return ``freq`` or the next coarser frequency that keeps the series within ``max_points``."""
+    if max_points is None or daily.empty:
+        return freq
+    span_days = (daily["Date"].max() - daily["Date"].min()).days + 1
+    names = list(FREQUENCIES)
+    for name in names[names.index(freq):]:
+        if span_days / PERIOD_DAYS[name] <= max_points:
+            return name
+    return names[-1]
+
+
+def top_n_with_other(values, n, other="Other"):
+    """Keep the ``n`` largest entries of a Series and sum the rest into one ``other`` entry."""
+    if len(values) <= n:
+        return values.sort_values(ascending=False)
+    order = np.argsort(-values.to_numpy(), kind="stable")
+    top = values.iloc[order[:n]]
+    rest = values.iloc[order[n:]].sum()
+    return pd.concat([top, pd.Series([rest], index=[other])])
+
+
+def sales_trend(daily, freq="day", window=7):
+    """Total units per period with a rolling mean over ``window`` periods.
+
+    Periods without sales are included as zero, so the rolling mean is over
+    calendar time rather than over sale days.
+    """
+    totals = daily.groupby("Date")["Quantity"].sum()
+    if totals.empty:
+        return pd.DataFrame({"Total": pd.Series(dtype="int64"), "RollingMean": pd.Series(dtype="float64")})
+    totals = totals.resample(FREQUENCIES[freq]).sum()
+    return pd.DataFrame({
+        "Total": totals,
+        "RollingMean": totals.rolling(window, min_periods=1).mean(),
+    })
+
+
+def category_breakdown(daily, products, freq="month", value="Revenue", top_n=None):
+    """Table of ``value`` (Revenue or Quantity) per period (rows) and category (columns).
+
+    With ``top_n``, only the biggest categories get a column of their own
+    and the rest are summed into "Other".
+    """
+    sales = with_revenue(daily, products)
+    if sales.empty:
+        return pd.DataFrame()
+    table = sales.pivot_table(index="Date", columns="Category", values=value, aggfunc="sum", fill_value=0)
+    table = table.resample(FREQUENCIES[freq]).sum()
+    table = table[table.sum().sort_values(ascending=False).index]
+    if top_n is not None and len(table.columns) > top_n:
+        other = table.iloc[:, top_n:].sum(axis=1)
+        table = table.iloc[:, :top_n].assign(Other=other)
+    return table
+
+
+def top_movers(daily, products, days=30, n=10):
+    """Products whose units sold changed most between the last ``days`` and the ``days`` before.
+
+    Returns a DataFrame indexed by ProductID with Name, Previous, Current,
+    Change and PercentChange (NaN when the product had no earlier sales),
+    largest absolute change first.
+    """
+    if daily.empty:
+        return pd.DataFrame(columns=["Name", "Previous", "Current", "Change", "PercentChange"])
+    end = daily["Date"].max()
+    age = (end - daily["Date"]).dt.days.to_numpy()
+    current = np.where(age < days, daily["Quantity"].to_numpy(), 0)
+    previous = np.where((age >= days) & (age < 2 * days), daily["Quantity"].to_numpy(), 0)
+    window = pd.DataFrame({"ProductID": daily["ProductID"].to_numpy(), "Previous": previous, "Current": current})
+    movers = window.groupby("ProductID").sum()
+    movers["Change"] = movers["Current"] - movers["Previous"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        movers["PercentChange"] = np.where(movers["Previous"] > 0,
+                                           movers["Change"] / movers["Previous"] * 100, np.nan)
+    movers = movers[movers["Change"] != 0]
+    order = np.argsort(-np.abs(movers["Change"].to_numpy()), kind="stable")[:n]
+    movers = movers.iloc[order]
+    movers.insert(0, "Name", products["Name"].reindex(movers.index).fillna("(deleted)"))
+    return movers
+
+
+def inventory_by_category(products):
+    """Units in stock and stock value per category, largest value first."""
+    value = products["Stock"] * products["Price"]
+    table = pd.DataFrame({"Stock": products["Stock"], "Value": value, "Category": products["Category"]})
+    return table.groupby("Category").sum().sort_values("Value", ascending=False)
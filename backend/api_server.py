@@ -0,0 +1,342 @@
+"""Local HTTP/JSON API over backend/services.py, for scripted and load-test clients.
+
+Run from the project root:
+
+    python -m backend.api_server --port 8080
+
+Authenticate with POST /login and send the returned token as
+"Authorization: Bearer <token>". Routes:
+
+    POST   /login                  {"username", "password"}
+    POST   /logout
+    POST   /register               {"username", "password", "confirm_password"}
+    GET    /products               ?in_stock=1&sort=Price&desc=0&after=<value>&after_id=<id>&limit=100
+                                   &q=<search>&category=<name>&min_price=<n>&max_price=<n>
+    GET    /categories
+    POST   /orders                 {"product_id", "quantity"} or {"items": [[product_id, quantity], ...]}
+    GET    /orders                 the caller's past orders, paged like /admin/orders
+                                   ?from=<YYYY-MM-DD>&to=<YYYY-MM-DD>&count=1
+    GET    /orders/<id>/receipt
+    GET    /admin/orders           ?sort=OrderDate&desc=1&after=<value>&after_id=<id>&limit=100
+                                   &from=<YYYY-MM-DD>&to=<YYYY-MM-DD>&customer=<username>&count=1
+    POST   /admin/products         {"name", "category", "price", "stock", "supplier_id"}
+    DELETE /admin/products/<id>
+    GET    /admin/reorders         ?supplier=<id>&sort=DaysOfStock&desc=0&after=<value>&after_id=<id>&limit=100
+    POST   /admin/reorders/refresh
+    POST   /admin/stock            {"adjustments": [[product_id, value], ...], "mode": "set"|"delta"}
+    GET    /admin/events           ?after=<event id>&limit=100  order and stock events, oldest first
+    GET    /stats                  service, pool, cache and per-statement query counters (admin only)
+
+count=1 adds "count" and "count_kind" (exact, estimate or "at least") to a
+page of orders; the count never scans the whole table.
+
+Blocking database work runs on a thread pool sized to the connection pool,
+so the event loop only parses requests and writes responses.
+"""
+import argparse
+import asyncio
+import datetime
+import decimal
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from backend import services
+from backend.catalog_cache import catalog_cache_stats
+from backend.credentials import end_session, get_session, login
+from backend.order_service import InsufficientStockError, OrderError
+from backend.receipt_service import start_receipt_worker, stop_receipt_worker
+from backend.reorder_service import start_reorder_worker, stop_reorder_worker
+from database.db_config import POOL_SIZE, pool_stats
+from database.query_profiler import query_profile
+
+API_HOST = "127.0.0.1"
+API_PORT = 8080
+MAX_BODY_BYTES = 1024 * 1024
+PAGE_LIMIT = 500
+
+# How to read a page's "after" value back from the query string, per sort
+# column (other columns sort as text). Sort expressions such as
+# COALESCE(Price, 0) have no type on SQLite, where a number never equals or
+# orders with a string, so the value must arrive with the column's type.
+PRODUCT_SORT_TYPES = {"ProductID": int, "Price": decimal.Decimal, "Stock": int}
+PAST_ORDER_SORT_TYPES = {"OrderID": int, "OrderDate": datetime.date.fromisoformat, "Quantity": int,
+                         "Total": decimal.Decimal}
+CUSTOMER_ORDER_SORT_TYPES = {"OrderID": int, "OrderDate": datetime.date.fromisoformat, "Quantity": int}
+REORDER_SORT_TYPES = {"ProductID": int, "Stock": int, "DaysOfStock": decimal.Decimal, "Quantity": int}
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden",
+           404: "Not Found", 409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ApiError(Exception):
+    """An error that maps to an HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value):
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _session(headers, role=None):
+    auth = headers.get("authorization", "")
+    user = get_session(auth[7:]) if auth.lower().startswith("bearer ") else None
+    if user is None:
+        raise ApiError(401, "Login required.")
+    if role is not None and user["Role"] != role:
+        raise ApiError(403, "Not allowed.")
+    return user
+
+
+def _page_args(query, default_sort, default_desc, columns, sort_types):
+    sort = query.get("sort", default_sort)
+    if sort not in columns:
+        raise ApiError(400, f"Cannot sort by {sort}.")
+    descending = query.get("desc", "1" if default_desc else "0") == "1"
+    limit = min(int(query.get("limit", 100)), PAGE_LIMIT)
+    after = None
+    if "after_id" in query:
+        try:
+            after_id = int(query["after_id"])
+            value = after_id if sort == columns[0] else sort_types.get(sort, str)(query.get("after", ""))
+        except (ValueError, decimal.InvalidOperation):
+            raise ApiError(400, f"Invalid page key for {sort}.")
+        after = (value, after_id)
+    return sort, descending, after, limit
+
+
+def _date_args(query):
+    try:
+        return tuple(datetime.date.fromisoformat(query[name]) if name in query else None
+                     for name in ("from", "to"))
+    except ValueError:
+        raise ApiError(400, "Dates must be YYYY-MM-DD.")
+
+
+def _with_count(page, query, count):
+    if query.get("count") == "1":
+        page["count"], page["count_kind"] = count()
+    return page
+
+
+def _page(rows, columns, sort):
+    items = [dict(zip(columns, row)) for row in rows]
+    next_key = None
+    if items:
+        last = items[-1]
+        next_key = {"after": last[sort], "after_id": last[columns[0]]}
+    return {"items": items, "next": next_key}
+
+
+def route(method, path, query, headers, body):
+    """Dispatch one request; runs on a worker thread. Returns (status, payload)."""
+    parts = [p for p in path.split("/") if p]
+
+    if method == "POST" and parts == ["login"]:
+        token, user = login(body.get("username", ""), body.get("password", ""))
+        if token is None:
+            raise ApiError(401, "Invalid username or password!")
+        return 200, {"token": token, "user": user}
+
+    if method == "POST" and parts == ["logout"]:
+        end_session(headers.get("authorization", "")[7:])
+        return 200, {}
+
+    if method == "POST" and parts == ["register"]:
+        error = services.register_user(body.get("username"), body.get("password"),
+                                       body.get("confirm_password", body.get("password")))
+        if error:
+            raise ApiError(409 if "exists" in error else 400, error)
+        return 201, {}
+
+    if method == "GET" and parts == ["products"]:
+        columns = list(services.PRODUCT_COLUMNS)
+        sort, descending, after, limit = _page_args(query, "ProductID", False, columns, PRODUCT_SORT_TYPES)
+        min_price = float(query["min_price"]) if "min_price" in query else None
+        max_price = float(query["max_price"]) if "max_price" in query else None
+        rows = services.list_products(query.get("in_stock", "1") == "1", sort, descending, after, limit,
+                                      query.get("q", ""), query.get("category"), min_price, max_price)
+        return 200, _page(rows, columns, sort)
+
+    if method == "GET" and parts == ["categories"]:
+        return 200, {"items": services.categories()}
+
+    if parts[:1] == ["orders"]:
+        user = _session(headers)
+        if method == "POST" and len(parts) == 1:
+            if "items" in body:
+                order_id = services.checkout(user["UserID"], [(int(p), int(q)) for p, q in body["items"]])
+            else:
+                order_id = services.place_order(user["UserID"], int(body["product_id"]), int(body["quantity"]))
+            return 201, {"order_id": order_id}
+        if method == "GET" and len(parts) == 1:
+            columns = list(services.PAST_ORDER_COLUMNS)
+            sort, descending, after, limit = _page_args(query, "OrderDate", True, columns, PAST_ORDER_SORT_TYPES)
+            start, end = _date_args(query)
+            rows = services.past_orders(user["UserID"], sort, descending, after, limit, start, end)
+            return 200, _with_count(_page(rows, columns, sort), query,
+                                    lambda: services.count_past_orders(user["UserID"], start, end))
+        if method == "GET" and len(parts) == 3 and parts[2] == "receipt":
+            filename, error = services.receipt(int(parts[1]), user["UserID"])
+            if error:
+                raise ApiError(404, error)
+            return 200, {"filename": filename}
+
+    if parts[:1] == ["admin"]:
+        _session(headers, role="admin")
+        if method == "GET" and parts == ["admin", "orders"]:
+            columns = list(services.CUSTOMER_ORDER_COLUMNS)
+            sort, descending, after, limit = _page_args(query, "OrderDate", True, columns,
+                                                        CUSTOMER_ORDER_SORT_TYPES)
+            start, end = _date_args(query)
+            customer = query.get("customer") or None
+            rows = services.customer_orders(sort, descending, after, limit, start, end, customer)
+            return 200, _with_count(_page(rows, columns, sort), query,
+                                    lambda: services.count_customer_orders(start, end, customer))
+        if method == "POST" and parts == ["admin", "products"]:
+            supplier_id = int(body["supplier_id"]) if body.get("supplier_id") is not None else None
+            product_id = services.add_product(body["name"], body.get("category", ""),
+                                              float(body["price"]), int(body["stock"]), supplier_id)
+            return 201, {"product_id": product_id}
+        if method == "DELETE" and len(parts) == 3 and parts[1] == "products":
+            if not services.delete_product(int(parts[2])):
+                raise ApiError(404, f"Product ID {parts[2]} not found.")
+            return 200, {}
+        if method == "GET" and parts == ["admin", "reorders"]:
+            columns = list(services.REORDER_COLUMNS)
+            sort, descending, after, limit = _page_args(query, "DaysOfStock", False, columns, REORDER_SORT_TYPES)
+            supplier_id = int(query["supplier"]) if "supplier" in query else None
+            return 200, _page(services.reorder_suggestions(supplier_id, sort, descending, after, limit),
+                              columns, sort)
+        if method == "POST" and parts == ["admin", "reorders", "refresh"]:
+            changed, resolved = services.refresh_reorders()
+            return 200, {"changed": changed, "resolved": resolved}
+        if method == "POST" and parts == ["admin", "stock"]:
+            results, summary = services.set_stock(body["adjustments"], body.get("mode", "set"))
+            return 200, {"results": results, "summary": summary}
+        if method == "GET" and parts == ["admin", "events"]:
+            after_id = int(query.get("after", 0))
+            items = services.events(after_id, min(int(query.get("limit", 100)), PAGE_LIMIT))
+            return 200, {"items": items, "next": {"after": items[-1]["EventID"] if items else after_id}}
+
+    if method == "GET" and parts == ["stats"]:
+        _session(headers, role="admin")
+        return 200, {"services": services.service_stats(), "pool": pool_stats(),
+                     "catalog_cache": catalog_cache_stats(), "queries": query_profile()[:20]}
+
+    raise ApiError(404, f"No route for {method} {path}.")
+
+
+def _handle(method, target, headers, raw_body):
+    url = urlsplit(target)
+    query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+    try:
+        body = json.loads(raw_body) if raw_body else {}
+        if not isinstance(body, dict):
+            raise ApiError(400, "Request body must be a JSON object.")
+        return route(method, url.path, query, headers, body)
+    except ApiError as e:
+        return e.status, {"error": str(e)}
+    except InsufficientStockError as e:
+        return 409, {"error": str(e), "available": e.available}
+    except OrderError as e:
+        return 400, {"error": str(e)}
+    except (KeyError, ValueError, TypeError) as e:
+        return 400, {"error": f"Bad request: {e}"}
+    except Exception as e:
+        return 500, {"error": f"Internal error: {e}"}
+
+
+class ApiServer:
+    """asyncio HTTP/1.1 server with keep-alive; one JSON request per exchange."""
+
+    def __init__(self, host=API_HOST, port=API_PORT, workers=POOL_SIZE):
+        self.host = host
+        self.port = port
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api-worker")
+        self.server = None
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, target, version = request_line.decode("latin-1").split()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        if length > MAX_BODY_BYTES:
+            raise ApiError(413, "Request body too large.")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, version, headers, body
+
+    async def _serve_client(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                keep_alive = True
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, target, version, headers, body = request
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = connection != "close" and (version == "HTTP/1.1" or connection == "keep-alive")
+                    status, payload = await loop.run_in_executor(
+                        self.executor, _handle, method, target, headers, body)
+                except ApiError as e:
+                    status, payload, keep_alive = e.status, {"error": str(e)}, False
+                except (ValueError, asyncio.IncompleteReadError):
+                    status, payload, keep_alive = 400, {"error": "Malformed request."}, False
+
+                data = json.dumps(payload, default=_json_default).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve_client, self.host, self.port)
+        return self.server
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"API listening on http://{self.host}:{self.port}")
+        async with self.server:
+            await self.server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the e-commerce operations over HTTP/JSON.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args()
+    # Orders placed through the API queue receipts like the GUI does.
+    start_receipt_worker()
+    start_reorder_worker()
+    try:
+        asyncio.run(ApiServer(args.host, args.port).serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_reorder_worker()
+        stop_receipt_worker()
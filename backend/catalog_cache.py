@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Product listings are cached per filter/page for at most this long
+CATALOG_CACHE_TTL = 30
+CATALOG_CACHE_SIZE = 512
+
+
+class TTLCache:
+    """A thread-safe LRU cache whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, max_entries=CATALOG_CACHE_SIZE, ttl=CATALOG_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value), oldest first
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0, "invalidations": 0}
+
+    def get(self, key):
+        """Return (True, value) on a fresh hit, otherwise (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return True, entry[1]
+                del self._entries[key]
+                self._stats["expired"] += 1
+            self._stats["misses"] += 1
+            return False, None
+
+    def put(self, key, value, generation=None):
+        """Store a value unless the cache was invalidated since ``generation``."""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evicted"] += 1
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for key, calling loader() on a miss."""
+        hit, value = self.get(key)
+        if hit:
+            return value
+        with self._lock:
+            generation = self._generation
+        value = loader()
+        # A write that lands while loader() runs bumps the generation, so a
+        # result read before that write is not cached.
+        self.put(key, value, generation)
+        return value
+
+    def pop(self, key):
+        """Remove one entry if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._stats["invalidations"] += 1
+
+    def stats(self):
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["size"] = len(self._entries)
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_rate"] = snapshot["hits"] / lookups if lookups else 0.0
+        return snapshot
+
+
+_catalog = TTLCache()
+
+
+def cached_catalog_query(key, loader):
+    """Return a cached product listing, loading it with loader() on a miss."""
+    return _catalog.get_or_load(key, loader)
+
+
+def invalidate_catalog():
+    """Forget all cached product listings; call after any write to Products."""
+    _catalog.clear()
+
+
+def catalog_cache_stats():
+    """Return hit/miss counters for the product catalog cache."""
+    return _catalog.stats()
@@ -0,0 +1,189 @@
+"""Password hashing, login and session tokens.
+
+Passwords are stored as "scheme$cost$salt$hash" strings produced by scrypt
+(default) or PBKDF2-SHA256 from hashlib, with a random salt per user. Rows
+still holding a plaintext password from before hashing was introduced are
+accepted once and rehashed on that login, as are hashes made with an older
+scheme or a lower cost.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+
+from backend.catalog_cache import TTLCache
+from database.db_config import get_connection
+
+PASSWORD_SCHEME = "scrypt"  # or "pbkdf2_sha256"
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = 600000
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+SESSION_TTL = 30 * 60  # seconds a login token stays valid
+AUTH_CACHE_TTL = 60  # seconds a verified username/password pair skips the KDF
+AUTH_CACHE_SIZE = 1024
+
+_sessions = TTLCache(max_entries=10000, ttl=SESSION_TTL)
+_verified = TTLCache(max_entries=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+_cache_key = secrets.token_bytes(32)  # per process; cached passwords are never stored
+_dummy_hash = None
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def _derive(password, scheme, cost, salt):
+    password = password.encode("utf-8")
+    if scheme == "scrypt":
+        n, r, p = cost
+        return hashlib.scrypt(password, salt=salt, n=n, r=r, p=p, dklen=HASH_BYTES,
+                              maxmem=256 * n * r * p)
+    if scheme == "pbkdf2_sha256":
+        return hashlib.pbkdf2_hmac("sha256", password, salt, cost[0], dklen=HASH_BYTES)
+    raise ValueError(f"Unknown password scheme: {scheme}")
+
+
+def _default_cost(scheme):
+    return (SCRYPT_N, SCRYPT_R, SCRYPT_P) if scheme == "scrypt" else (PBKDF2_ITERATIONS,)
+
+
+def hash_password(password, scheme=None, cost=None):
+    """Return a salted hash of password in "scheme$cost$salt$hash" form.
+
+    ``cost`` is (n, r, p) for scrypt or (iterations,) for PBKDF2; the module
+    settings are used when it is omitted.
+    """
+    scheme = scheme or PASSWORD_SCHEME
+    cost = tuple(cost or _default_cost(scheme))
+    salt = os.urandom(SALT_BYTES)
+    digest = _derive(password, scheme, cost, salt)
+    return "$".join([scheme, ",".join(str(c) for c in cost), _b64(salt), _b64(digest)])
+
+
+def _parse(stored):
+    """Split a stored hash into (scheme, cost, salt, digest); None for legacy plaintext."""
+    parts = stored.split("$")
+    if len(parts) != 4 or parts[0] not in ("scrypt", "pbkdf2_sha256"):
+        return None
+    try:
+        cost = tuple(int(c) for c in parts[1].split(","))
+        return parts[0], cost, base64.b64decode(parts[2]), base64.b64decode(parts[3])
+    except ValueError:
+        return None
+
+
+def verify_password(password, stored):
+    """Check a password against a stored hash (or legacy plaintext) in constant time."""
+    parsed = _parse(stored)
+    if parsed is None:
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    scheme, cost, salt, digest = parsed
+    return hmac.compare_digest(_derive(password, scheme, cost, salt), digest)
+
+
+def needs_rehash(stored):
+    """True for plaintext rows and hashes weaker than the current settings."""
+    parsed = _parse(stored)
+    if parsed is None:
+        return True
+    scheme, cost, _, _ = parsed
+    return scheme != PASSWORD_SCHEME or cost != _default_cost(scheme)
+
+
+def _auth_cache_key(username, password):
+    message = username.encode("utf-8") + b"\0" + password.encode("utf-8")
+    return hmac.new(_cache_key, message, hashlib.sha256).digest()
+
+
+def _fetch_user(username):
+    with get_connection() as db:
+        cursor = db.cursor(dictionary=True)
+        try:
+            cursor.execute("SELECT UserID, Username, PasswordHash, Role FROM Users WHERE Username = %s",
+                           (username,))
+            return cursor.fetchone()
+        finally:
+            cursor.close()
+
+
+def _store_rehash(user, password):
+    """Replace an outdated hash, unless the password changed since it was read."""
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            cursor.execute("UPDATE Users SET PasswordHash = %s WHERE UserID = %s AND PasswordHash = %s",
+                           (hash_password(password), user["UserID"], user["PasswordHash"]))
+            db.commit()
+        finally:
+            cursor.close()
+    forget_credentials()
+
+
+def authenticate(username, password):
+    """Return {"UserID", "Username", "Role"} for valid credentials, else None.
+
+    A successful check is remembered for AUTH_CACHE_TTL seconds under an HMAC
+    of the credentials, so repeated logins do not run the KDF again.
+    """
+    global _dummy_hash
+    key = _auth_cache_key(username, password)
+    hit, user = _verified.get(key)
+    if hit:
+        return dict(user)
+
+    row = _fetch_user(username)
+    if row is None:
+        # Spend the same time as a real check so unknown usernames are not revealed.
+        if _dummy_hash is None:
+            _dummy_hash = hash_password(secrets.token_hex(8))
+        verify_password(password, _dummy_hash)
+        return None
+    if not verify_password(password, row["PasswordHash"]):
+        return None
+
+    if needs_rehash(row["PasswordHash"]):
+        try:
+            _store_rehash(row, password)
+        except Exception as e:
+            print(f"Error upgrading password hash for {username}: {e}")
+
+    user = {"UserID": row["UserID"], "Username": row["Username"], "Role": row["Role"]}
+    _verified.put(key, user)
+    return dict(user)
+
+
+def create_session(user):
+    """Issue a login token for an authenticated user."""
+    token = secrets.token_urlsafe(32)
+    _sessions.put(token, dict(user, ExpiresAt=time.time() + SESSION_TTL))
+    return token
+
+
+def get_session(token):
+    """Return the user for a valid login token, or None once it has expired."""
+    hit, user = _sessions.get(token)
+    return dict(user) if hit else None
+
+
+def end_session(token):
+    """Log a token out."""
+    _sessions.pop(token)
+
+
+def login(username, password):
+    """Authenticate and return (token, user), or (None, None) for bad credentials."""
+    user = authenticate(username, password)
+    if user is None:
+        return None, None
+    return create_session(user), user
+
+
+def forget_credentials():
+    """Drop cached logins; called after every write to Users.PasswordHash."""
+    _verified.clear()
@@ -0,0 +1,419 @@
+"""Append-only log of order and stock events, and the projections built from it.
+
+Placing an order, changing stock, adding/importing or deleting a product
+appends rows to EventLog in the same transaction as the change itself, so
+the log never misses a committed change and never holds one that rolled
+back. Events are only ever inserted.
+
+Consumers read the log in EventID order from their own offset (EventOffsets).
+A projection writes its results and its new offset in one transaction, so
+every event is applied exactly once; after downtime it catches up by reading
+only the events past its offset, and replay() rebuilds it from event 1.
+
+MySQL hands out EventIDs at insert time, not at commit, so a reader can find
+a gap: an ID whose transaction is still open (or rolled back). Projections
+do not wait for it; they note the gap in EventGaps and apply its event on a
+later catch-up once it has committed. Applying it late is safe: every event
+is written after its transaction has locked the Products row it is about,
+so two events for the same product always commit in EventID order.
+
+    sales   order lines -> Sales rows (with their OrderID). SalesDailySummary
+            is folded from Sales, so the sales report, charts, forecasts and
+            reorder engine see GUI/API orders as well as recorded sales.
+    stock   StockLevels: each product's stock as the log has it, which
+            check_stock_levels() compares with Products.Stock.
+
+    python -m backend.event_log                 # catch every projection up
+    python -m backend.event_log replay sales
+    python -m backend.event_log check [--repair]
+"""
+import sys
+
+from database.db_config import get_connection
+from database.query_profiler import get_logger
+
+ORDER_LINE = "order_line"  # OrderID, ProductID, Quantity sold, UnitPrice
+STOCK_SET = "stock_set"  # ProductID, Stock: the product's new stock level
+PRODUCT_DELETED = "product_deleted"  # ProductID
+
+EVENT_COLUMNS = ("EventID", "EventType", "OrderID", "ProductID", "Quantity", "UnitPrice", "Stock", "EventDate")
+EVENT_BATCH_SIZE = 5000  # events applied per projection transaction
+# read_events() callers keep no gap list, so they are only given events up to
+# a gap until the events after it are this old.
+EVENT_GAP_SECONDS = 30
+# Gaps still empty after this long were rolled back (or never used, as
+# InnoDB skips IDs after bulk inserts) and are forgotten; a projection that
+# still misses an event then is found by check_projections() and replayed.
+EVENT_GAP_RETENTION_SECONDS = 24 * 60 * 60
+
+
+def append_order_events(cursor, order_id):
+    """Log the lines of a just-inserted order; call before the order's commit."""
+    cursor.execute("""
+        INSERT INTO EventLog (EventType, OrderID, ProductID, Quantity, UnitPrice, EventDate)
+        SELECT %s, i.OrderID, i.ProductID, i.Quantity, i.UnitPrice, o.OrderDate
+        FROM OrderItems i
+        JOIN Orders o ON o.OrderID = i.OrderID
+        WHERE i.OrderID = %s
+        ORDER BY i.OrderItemID
+    """, (ORDER_LINE, order_id))
+
+
+def append_stock_events(cursor, product_ids):
+    """Log the current stock of the given products, after they were inserted or updated."""
+    product_ids = sorted(set(product_ids))
+    if not product_ids:
+        return
+    cursor.execute(f"""
+        INSERT INTO EventLog (EventType, ProductID, Stock, EventDate)
+        SELECT %s, ProductID, COALESCE(Stock, 0), CURDATE()
+        FROM Products
+        WHERE ProductID IN ({', '.join(['%s'] * len(product_ids))})
+        ORDER BY ProductID
+    """, [STOCK_SET] + product_ids)
+
+
+def append_new_product_events(cursor, after_product_id):
+    """Log the stock of products inserted with IDs above ``after_product_id`` (bulk inserts)."""
+    cursor.execute("""
+        INSERT INTO EventLog (EventType, ProductID, Stock, EventDate)
+        SELECT %s, ProductID, COALESCE(Stock, 0), CURDATE()
+        FROM Products
+        WHERE ProductID > %s
+        ORDER BY ProductID
+    """, (STOCK_SET, after_product_id))
+
+
+def append_delete_event(cursor, product_id):
+    """Log the deletion of a product."""
+    cursor.execute("""
+        INSERT INTO EventLog (EventType, ProductID, EventDate) VALUES (%s, %s, CURDATE())
+    """, (PRODUCT_DELETED, product_id))
+
+
+def _readable_through(cursor, after_id, limit):
+    """Return the last EventID a reader without a gap list may consume, at most ``limit`` events on.
+
+    IDs are consecutive unless a transaction rolled back or has not committed
+    yet; the reader stops before a gap until the events after it are
+    EVENT_GAP_SECONDS old.
+    """
+    cursor.execute("""
+        SELECT EventID, CreatedAt >= NOW() - INTERVAL %s SECOND
+        FROM EventLog
+        WHERE EventID > %s
+        ORDER BY EventID
+        LIMIT %s
+    """, (EVENT_GAP_SECONDS, after_id, limit))
+    last = after_id
+    for event_id, recent in cursor.fetchall():
+        if event_id != last + 1 and recent:
+            break
+        last = event_id
+    return last
+
+
+def read_events(after_id=0, limit=EVENT_BATCH_SIZE):
+    """Return up to ``limit`` events after ``after_id`` as dicts, oldest first.
+
+    External consumers keep the last EventID they processed and pass it back
+    as ``after_id``. An event that commits more than EVENT_GAP_SECONDS after
+    it was inserted can be missed this way; the projections in this module
+    track gaps instead and never miss one.
+    """
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            up_to_id = _readable_through(cursor, after_id, limit)
+            cursor.execute(f"""
+                SELECT {', '.join(EVENT_COLUMNS)} FROM EventLog
+                WHERE EventID > %s AND EventID <= %s
+                ORDER BY EventID
+            """, (after_id, up_to_id))
+            return [dict(zip(EVENT_COLUMNS, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+
+def _id_list(event_ids):
+    return ", ".join(["%s"] * len(event_ids))
+
+
+def _project_sales(cursor, event_ids):
+    # Lines of products deleted since cannot be stored (Sales.ProductID is a
+    # foreign key) and are skipped.
+    cursor.execute(f"""
+        INSERT INTO Sales (ProductID, Quantity, SaleDate, OrderID)
+        SELECT e.ProductID, e.Quantity, e.EventDate, e.OrderID
+        FROM EventLog e
+        WHERE e.EventID IN ({_id_list(event_ids)}) AND e.EventType = %s
+          AND EXISTS (SELECT 1 FROM Products p WHERE p.ProductID = e.ProductID)
+        ORDER BY e.EventID
+    """, list(event_ids) + [ORDER_LINE])
+
+
+def _reset_sales(cursor):
+    # The summary is rebuilt from Sales on the next refresh_sales_summary().
+    cursor.execute("DELETE FROM Sales WHERE OrderID IS NOT NULL")
+    cursor.execute("DELETE FROM SalesDailySummary")
+    cursor.execute("DELETE FROM SalesSummaryWatermarks")
+
+
+def _project_stock(cursor, event_ids):
+    cursor.execute(f"""
+        SELECT EventType, ProductID, Quantity, Stock
+        FROM EventLog
+        WHERE EventID IN ({_id_list(event_ids)}) AND ProductID IS NOT NULL
+        ORDER BY EventID
+    """, list(event_ids))
+    levels = {}  # ProductID -> stock level set in this batch, None if deleted
+    sold = {}  # ProductID -> units ordered since then (or since the stored level)
+    for event_type, product_id, quantity, stock in cursor.fetchall():
+        if event_type == ORDER_LINE:
+            sold[product_id] = sold.get(product_id, 0) + (quantity or 0)
+        elif event_type in (STOCK_SET, PRODUCT_DELETED):
+            levels[product_id] = stock if event_type == STOCK_SET else None
+            sold.pop(product_id, None)
+
+    deleted = [(product_id,) for product_id, stock in levels.items() if stock is None]
+    if deleted:
+        cursor.executemany("DELETE FROM StockLevels WHERE ProductID = %s", deleted)
+    upserts = [(product_id, stock - sold.pop(product_id, 0))
+               for product_id, stock in sorted(levels.items()) if stock is not None]
+    if upserts:
+        cursor.executemany("""
+            INSERT INTO StockLevels (ProductID, Stock) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE Stock = VALUES(Stock)
+        """, upserts)
+    if sold:
+        cursor.executemany("UPDATE StockLevels SET Stock = Stock - %s WHERE ProductID = %s",
+                           [(quantity, product_id) for product_id, quantity in sorted(sold.items())])
+
+
+def _reset_stock(cursor):
+    cursor.execute("DELETE FROM StockLevels")
+
+
+# name: (apply the events with the given IDs, clear the projection)
+PROJECTIONS = {
+    "sales": (_project_sales, _reset_sales),
+    "stock": (_project_stock, _reset_stock),
+}
+
+
+def _lock_offset(cursor, name):
+    """Return a projection's offset, locking its row until commit."""
+    cursor.execute("INSERT IGNORE INTO EventOffsets (Consumer, LastEventID) VALUES (%s, 0)", (name,))
+    cursor.execute("SELECT LastEventID FROM EventOffsets WHERE Consumer = %s FOR UPDATE", (name,))
+    return cursor.fetchone()[0]
+
+
+def _missing_ranges(after_id, event_ids):
+    """(first, last) ranges of IDs missing after ``after_id`` and between the sorted ``event_ids``."""
+    ranges = []
+    last = after_id
+    for event_id in event_ids:
+        if event_id > last + 1:
+            ranges.append((last + 1, event_id - 1))
+        last = event_id
+    return ranges
+
+
+def _fill_gaps(cursor, name, apply):
+    """Apply events that committed into gaps skipped earlier; returns how many."""
+    cursor.execute("""
+        DELETE FROM EventGaps WHERE Consumer = %s AND SeenAt < NOW() - INTERVAL %s SECOND
+    """, (name, EVENT_GAP_RETENTION_SECONDS))
+    if cursor.rowcount > 0:
+        get_logger().warning("Projection %s: forgot %d event ID gap(s) that never filled", name, cursor.rowcount)
+
+    cursor.execute("""
+        SELECT g.FromID, g.ToID, g.SeenAt, e.EventID
+        FROM EventGaps g
+        JOIN EventLog e ON e.EventID >= g.FromID AND e.EventID <= g.ToID
+        WHERE g.Consumer = %s
+        ORDER BY e.EventID
+    """, (name,))
+    filled = {}
+    for from_id, to_id, seen_at, event_id in cursor.fetchall():
+        filled.setdefault((from_id, to_id, seen_at), []).append(event_id)
+    for (from_id, to_id, seen_at), event_ids in filled.items():
+        apply(cursor, event_ids)
+        cursor.execute("DELETE FROM EventGaps WHERE Consumer = %s AND FromID = %s", (name, from_id))
+        _record_gaps(cursor, name, _missing_ranges(from_id - 1, event_ids + [to_id + 1]), seen_at)
+    return sum(len(event_ids) for event_ids in filled.values())
+
+
+def _record_gaps(cursor, name, ranges, seen_at=None):
+    if ranges:
+        cursor.executemany("""
+            INSERT INTO EventGaps (Consumer, FromID, ToID, SeenAt) VALUES (%s, %s, %s, COALESCE(%s, NOW()))
+        """, [(name, from_id, to_id, seen_at) for from_id, to_id in ranges])
+
+
+def catch_up(name, batch_size=EVENT_BATCH_SIZE):
+    """Apply every committed event the projection has not seen; returns its new offset.
+
+    Events that have committed into earlier gaps are applied first, then the
+    events past the offset in transactions of at most ``batch_size``, each of
+    which also moves the offset and records any new gaps, so an interrupted
+    catch-up resumes where it stopped.
+    """
+    apply = PROJECTIONS[name][0]
+    fill_gaps = True
+    while True:
+        with get_connection() as db:
+            cursor = db.cursor()
+            try:
+                offset = _lock_offset(cursor, name)
+                if fill_gaps:
+                    _fill_gaps(cursor, name, apply)
+                    fill_gaps = False
+                # Read the IDs once and apply exactly those: a gap that commits
+                # in the meantime is left for the next catch-up, never applied twice.
+                cursor.execute("SELECT EventID FROM EventLog WHERE EventID > %s ORDER BY EventID LIMIT %s",
+                               (offset, batch_size))
+                event_ids = [row[0] for row in cursor.fetchall()]
+                if event_ids:
+                    apply(cursor, event_ids)
+                    _record_gaps(cursor, name, _missing_ranges(offset, event_ids))
+                    cursor.execute("UPDATE EventOffsets SET LastEventID = %s WHERE Consumer = %s",
+                                   (event_ids[-1], name))
+                db.commit()
+            finally:
+                cursor.close()
+        if len(event_ids) < batch_size:
+            return event_ids[-1] if event_ids else offset
+
+
+def catch_up_all():
+    """Bring every projection up to date; returns {name: offset}."""
+    return {name: catch_up(name) for name in PROJECTIONS}
+
+
+def replay(name):
+    """Clear a projection and rebuild it from the start of the log."""
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            _lock_offset(cursor, name)
+            PROJECTIONS[name][1](cursor)
+            cursor.execute("UPDATE EventOffsets SET LastEventID = 0 WHERE Consumer = %s", (name,))
+            cursor.execute("DELETE FROM EventGaps WHERE Consumer = %s", (name,))
+            db.commit()
+        finally:
+            cursor.close()
+    offset = catch_up(name)
+    print(f"Projection '{name}' replayed up to event {offset}.")
+    return offset
+
+
+def projection_status():
+    """Return {name: (offset, events behind)} for every projection."""
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            cursor.execute("SELECT COALESCE(MAX(EventID), 0) FROM EventLog")
+            head = cursor.fetchone()[0]
+            cursor.execute("SELECT Consumer, LastEventID FROM EventOffsets")
+            offsets = dict(cursor.fetchall())
+        finally:
+            cursor.close()
+    return {name: (offsets.get(name, 0), head - offsets.get(name, 0)) for name in PROJECTIONS}
+
+
+def check_stock_levels(repair=False):
+    """Compare the stock projection with Products.Stock.
+
+    Returns a list of (ProductID, stock, projected) tuples for products that
+    disagree (None where a side has no row); an empty list means every stock
+    change went through the log. Orders committed while the check runs can
+    show up as differences, so run it again before acting on a result. With
+    ``repair``, a projection that disagrees is replayed from the whole log
+    (which recovers events it skipped) and checked again.
+    """
+    catch_up("stock")
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            cursor.execute("""
+                SELECT p.ProductID, COALESCE(p.Stock, 0), l.Stock
+                FROM Products p
+                LEFT JOIN StockLevels l ON l.ProductID = p.ProductID
+                WHERE l.Stock IS NULL OR l.Stock <> COALESCE(p.Stock, 0)
+                UNION ALL
+                SELECT l.ProductID, NULL, l.Stock
+                FROM StockLevels l
+                WHERE NOT EXISTS (SELECT 1 FROM Products p WHERE p.ProductID = l.ProductID)
+                ORDER BY 1
+            """)
+            mismatches = cursor.fetchall()
+        finally:
+            cursor.close()
+
+    if mismatches:
+        print(f"Stock levels differ from the event log for {len(mismatches)} product(s):")
+        for product_id, stock, projected in mismatches[:20]:
+            print(f"Product ID {product_id}: stock {stock}, from events {projected}")
+        if repair:
+            replay("stock")
+            return check_stock_levels()
+    else:
+        print("Stock levels match the event log.")
+    return mismatches
+
+
+def check_sales_projection(repair=False):
+    """Compare units per product in the logged order lines with the Sales rows projected from them.
+
+    Returns a list of (ProductID, logged, projected) tuples for products
+    that disagree; ``repair`` replays the projection as in check_stock_levels().
+    """
+    catch_up("sales")
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            cursor.execute("""
+                SELECT e.ProductID, SUM(e.Quantity)
+                FROM EventLog e
+                WHERE e.EventType = %s
+                  AND EXISTS (SELECT 1 FROM Products p WHERE p.ProductID = e.ProductID)
+                GROUP BY e.ProductID
+            """, (ORDER_LINE,))
+            logged = {product_id: int(quantity or 0) for product_id, quantity in cursor.fetchall()}
+            cursor.execute("SELECT ProductID, SUM(Quantity) FROM Sales WHERE OrderID IS NOT NULL GROUP BY ProductID")
+            projected = {product_id: int(quantity or 0) for product_id, quantity in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+    mismatches = [
+        (product_id, logged.get(product_id, 0), projected.get(product_id, 0))
+        for product_id in sorted(set(logged) | set(projected))
+        if logged.get(product_id, 0) != projected.get(product_id, 0)
+    ]
+    if mismatches:
+        print(f"Sales differ from the logged orders for {len(mismatches)} product(s):")
+        for product_id, want, got in mismatches[:20]:
+            print(f"Product ID {product_id}: logged {want}, in Sales {got}")
+        if repair:
+            replay("sales")
+            return check_sales_projection()
+    else:
+        print("Sales match the logged orders.")
+    return mismatches
+
+
+def check_projections(repair=False):
+    """Check every projection against its source; returns {name: mismatches}."""
+    return {"sales": check_sales_projection(repair), "stock": check_stock_levels(repair)}
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "catch-up"
+    if command == "replay":
+        replay(sys.argv[2])
+    elif command == "check":
+        check_projections(repair="--repair" in sys.argv)
+    else:
+        for projection, position in catch_up_all().items():
+            print(f"{projection}: up to event {position}")
@@ -0,0 +1,245 @@
+"""Per-product demand forecasts for inventory planning, fitted for every product at once.
+
+Each product gets the same candidate models: simple exponential smoothing
+with each smoothing factor in SES_ALPHAS, and a MA_WINDOW-day moving
+average. The models are run forward one day at a time over the daily sales
+history (Sales and order lines, from analytics.daily_sales()); a step
+updates every model of every product with a few NumPy operations on whole
+arrays, so the cost grows with the number of days, not of products. The
+squared one-step-ahead error of each model is tracked per product as an
+exponentially weighted mean (squared, not absolute, so that for products
+selling only now and then the models track the mean rather than zero), and
+each product is forecast with the model whose error is currently smallest.
+
+The fitted state is kept in memory and saved to FORECAST_CACHE_PATH
+(cache/forecast.npz in the project directory, wherever the process was
+started from, so the GUI, the API server and this module share it). Later
+calls only fold in the complete days since the last fit; if sales turn up
+for days already folded in (e.g. back-dated rows) the state is fitted again.
+
+    python -m backend.forecasting --horizon 14 --top 20
+"""
+import argparse
+import datetime
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.analytics import daily_sales, load_products
+
+SES_ALPHAS = np.array([0.05, 0.1, 0.2, 0.3, 0.5])
+MA_WINDOW = 28
+MODEL_NAMES = [f"ses {alpha:g}" for alpha in SES_ALPHAS] + [f"ma {MA_WINDOW}"]
+ERROR_DECAY = 0.95  # weight of the past in the running one-step squared error
+FIT_HISTORY_DAYS = 365  # a fresh fit starts this many days back
+FORECAST_HORIZON_DAYS = 14
+FORECAST_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                   "cache", "forecast.npz")
+
+_state = {"fit": None, "frame": None}
+_state_lock = threading.Lock()
+
+
+def _config():
+    # Stored with the fit; a cached fit made with other settings is discarded.
+    return np.concatenate([SES_ALPHAS, [MA_WINDOW, ERROR_DECAY]])
+
+
+def _new_fit(start):
+    return {
+        "product_ids": np.zeros(0, dtype="int64"),
+        "levels": np.zeros((len(SES_ALPHAS), 0)),
+        "window": np.zeros((MA_WINDOW, 0)),
+        "window_pos": 0,
+        "errors": np.zeros((len(MODEL_NAMES), 0)),
+        "first": start,
+        "through": start - np.timedelta64(1, "D"),
+        "day_totals": np.zeros(0),
+    }
+
+
+def _add_products(fit, product_ids):
+    """Give products seen for the first time a zeroed column in every state array."""
+    product_ids = np.unique(product_ids)
+    positions = np.searchsorted(fit["product_ids"], product_ids)
+    known = positions < len(fit["product_ids"])
+    known[known] = fit["product_ids"][positions[known]] == product_ids[known]
+    if known.all():
+        return
+    ids = np.union1d(fit["product_ids"], product_ids[~known])
+    old_columns = np.searchsorted(ids, fit["product_ids"])
+    for name in ("levels", "window", "errors"):
+        grown = np.zeros((fit[name].shape[0], len(ids)))
+        grown[:, old_columns] = fit[name]
+        fit[name] = grown
+    fit["product_ids"] = ids
+
+
+def _step(fit, x):
+    """Fold one day of units sold (one value per product) into every model."""
+    levels = fit["levels"]
+    errors = fit["errors"]
+    errors *= ERROR_DECAY
+    errors[:-1] += (1 - ERROR_DECAY) * np.square(x - levels)
+    errors[-1] += (1 - ERROR_DECAY) * np.square(x - fit["window"].sum(axis=0) / MA_WINDOW)
+    levels += SES_ALPHAS[:, None] * (x - levels)
+    fit["window"][fit["window_pos"]] = x
+    fit["window_pos"] = (fit["window_pos"] + 1) % MA_WINDOW
+
+
+def _date_rows(daily, first, last):
+    """Slice of the (date ordered) daily rows from ``first`` to ``last``, and their day numbers."""
+    dates = daily["Date"].to_numpy()
+    rows = slice(np.searchsorted(dates, first.astype(dates.dtype)),
+                 np.searchsorted(dates, last.astype(dates.dtype), side="right"))
+    return rows, (dates[rows].astype("datetime64[D]") - first).astype("int64")
+
+
+def _fold(fit, daily, end):
+    """Run the models over the days after fit["through"] up to ``end``."""
+    start = fit["through"] + np.timedelta64(1, "D")
+    if end < start:
+        return
+    rows, day_index = _date_rows(daily, start, end)
+    _add_products(fit, daily["ProductID"].to_numpy()[rows])
+
+    columns = np.searchsorted(fit["product_ids"], daily["ProductID"].to_numpy()[rows])
+    quantities = daily["Quantity"].to_numpy()[rows].astype("float64")
+    days = int((end - start).astype("int64")) + 1
+    bounds = np.searchsorted(day_index, np.arange(days + 1))  # rows are in date order
+
+    x = np.zeros(len(fit["product_ids"]))
+    for day in range(days):
+        x[:] = 0
+        x[columns[bounds[day]:bounds[day + 1]]] = quantities[bounds[day]:bounds[day + 1]]
+        _step(fit, x)
+    fit["day_totals"] = np.concatenate([fit["day_totals"], np.bincount(day_index, quantities, minlength=days)])
+    fit["through"] = end
+
+
+def _day_totals(daily, first, through):
+    """Units sold per day from ``first`` to ``through``, as folded into a fit."""
+    rows, day_index = _date_rows(daily, first, through)
+    days = int((through - first).astype("int64")) + 1
+    return np.bincount(day_index, daily["Quantity"].to_numpy()[rows].astype("float64"), minlength=max(days, 0))
+
+
+def _load_cache(path=FORECAST_CACHE_PATH):
+    try:
+        with np.load(path) as cached:
+            if not np.array_equal(cached["config"], _config()):
+                return None
+            fit = {name: cached[name] for name in ("product_ids", "levels", "window", "errors", "day_totals")}
+            fit["window_pos"] = int(cached["window_pos"])
+            fit["first"] = cached["first"][()]
+            fit["through"] = cached["through"][()]
+            return fit
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _save_cache(fit, path=FORECAST_CACHE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_name = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_name, "wb") as f:
+            np.savez(f, config=_config(), **fit)
+        os.replace(temp_name, path)
+    finally:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+
+
+def fitted_state():
+    """Return the model state fitted through yesterday, folding in new days as needed.
+
+    The returned dict is shared; do not modify it.
+    """
+    with _state_lock:
+        daily = daily_sales()
+        end = np.datetime64(datetime.date.today(), "D") - np.timedelta64(1, "D")
+        fit = _state["fit"]
+        if fit is None:
+            fit = _load_cache()
+        if fit is not None and daily is not _state["frame"]:
+            # New sales for days already folded in invalidate the fit.
+            if not np.array_equal(_day_totals(daily, fit["first"], fit["through"]), fit["day_totals"]):
+                fit = None
+        if fit is None:
+            start = end - np.timedelta64(FIT_HISTORY_DAYS - 1, "D")
+            if not daily.empty:
+                start = max(start, daily["Date"].min().to_datetime64().astype("datetime64[D]"))
+            fit = _new_fit(start)
+        if fit["through"] < end:
+            _fold(fit, daily, end)
+            _save_cache(fit)
+        _state["fit"] = fit
+        _state["frame"] = daily
+        return fit
+
+
+def _best_models(fit):
+    """Index of each product's best model, its daily demand and its root mean squared error."""
+    columns = np.arange(len(fit["product_ids"]))
+    best = np.argmin(fit["errors"], axis=0)
+    candidates = np.vstack([fit["levels"], fit["window"].sum(axis=0) / MA_WINDOW])
+    return best, candidates[best, columns], np.sqrt(fit["errors"][best, columns])
+
+
+def forecast(horizon_days=FORECAST_HORIZON_DAYS):
+    """Forecast demand for every product that has sold.
+
+    Returns a DataFrame indexed by ProductID with Model (name of the model
+    used), DailyDemand, Forecast (units over ``horizon_days``) and Error (the
+    model's recent root mean squared one-day error).
+    """
+    fit = fitted_state()
+    best, demand, error = _best_models(fit)
+    return pd.DataFrame({
+        "Model": np.array(MODEL_NAMES)[best],
+        "DailyDemand": demand,
+        "Forecast": demand * horizon_days,
+        "Error": error,
+    }, index=pd.Index(fit["product_ids"], name="ProductID"))
+
+
+def daily_demand(product_ids):
+    """Return {ProductID: forecast units per day} for the given products that have a forecast."""
+    fit = fitted_state()
+    ids = np.asarray(list(product_ids), dtype="int64")
+    columns = np.searchsorted(fit["product_ids"], ids)
+    known = columns < len(fit["product_ids"])
+    known[known] = fit["product_ids"][columns[known]] == ids[known]
+    _, demand, _ = _best_models(fit)
+    return dict(zip(ids[known].tolist(), demand[columns[known]].tolist()))
+
+
+def total_demand(horizon_days=FORECAST_HORIZON_DAYS):
+    """Forecast total units per day for the next ``horizon_days``, with a +/- error band.
+
+    Returns a DataFrame indexed by date with Forecast, Low and High.
+    """
+    fit = fitted_state()
+    _, demand, error = _best_models(fit)
+    dates = pd.date_range(pd.Timestamp(fit["through"]) + pd.Timedelta(days=1), periods=horizon_days, freq="D")
+    # Products' errors are taken as independent, so they add in quadrature.
+    total, spread = float(demand.sum()), float(np.sqrt(np.square(error).sum()))
+    return pd.DataFrame({"Forecast": total, "Low": max(total - spread, 0.0), "High": total + spread},
+                        index=pd.Index(dates, name="Date"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit the demand forecasts and show the busiest products.")
+    parser.add_argument("--horizon", type=int, default=FORECAST_HORIZON_DAYS, help="days to forecast")
+    parser.add_argument("--top", type=int, default=20, help="products to list")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = forecast(args.horizon)
+    print(f"Forecast {len(result)} products in {time.perf_counter() - started:.2f}s")
+    top = result.sort_values("Forecast", ascending=False).head(args.top)
+    top.insert(0, "Name", load_products()["Name"].reindex(top.index).fillna("(deleted)"))
+    print(top.to_string(float_format=lambda value: f"{value:.2f}"))
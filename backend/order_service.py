@@ -0,0 +1,171 @@
+import random
+import time
+
+from backend.catalog_cache import invalidate_catalog
+from backend.event_log import append_order_events
+from database.db_config import get_connection, get_storage
+
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.02  # seconds, doubled on every retry
+RETRY_MAX_DELAY = 1.0
+
+
+class OrderError(Exception):
+    """Raised when an order cannot be placed."""
+
+
+class InsufficientStockError(OrderError):
+    """Raised when the product does not have enough stock for the order."""
+
+    def __init__(self, product_id, requested, available):
+        self.product_id = product_id
+        self.requested = requested
+        self.available = available
+        super().__init__(f"Not enough stock! Only {available} available.")
+
+
+def is_retryable(error):
+    """Return True for deadlocks and lock-wait timeouts."""
+    return get_storage().is_lock_error(error)
+
+
+def _backoff_delay(attempt):
+    """Exponential backoff with full jitter for the given retry attempt."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+def _place_order_once(customer_id, product_id, quantity):
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            # Guarded decrement: the stock check and the update happen in one
+            # statement under the row lock, so concurrent buyers cannot oversell.
+            cursor.execute("""
+                UPDATE Products
+                SET Stock = Stock - %s
+                WHERE ProductID = %s AND Stock >= %s
+            """, (quantity, product_id, quantity))
+
+            if cursor.rowcount != 1:
+                cursor.execute("SELECT Stock FROM Products WHERE ProductID = %s", (product_id,))
+                row = cursor.fetchone()
+                db.rollback()
+                if row is None:
+                    raise OrderError(f"Product ID {product_id} does not exist.")
+                raise InsufficientStockError(product_id, quantity, row[0])
+
+            cursor.execute("""
+                INSERT INTO Orders (CustomerID, ProductID, Quantity, OrderDate)
+                VALUES (%s, %s, %s, CURDATE())
+            """, (customer_id, product_id, quantity))
+            order_id = cursor.lastrowid
+
+            cursor.execute("""
+                INSERT INTO OrderItems (OrderID, ProductID, Quantity, UnitPrice)
+                SELECT %s, ProductID, %s, Price FROM Products WHERE ProductID = %s
+            """, (order_id, quantity, product_id))
+            append_order_events(cursor, order_id)
+
+            db.commit()
+            invalidate_catalog()
+            return order_id
+        finally:
+            cursor.close()
+
+
+def _checkout_cart_once(customer_id, items):
+    product_ids = sorted(items)
+    placeholders = ", ".join(["%s"] * len(product_ids))
+
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            # Lock every product in primary-key order; two carts that share
+            # products then always wait on each other instead of deadlocking.
+            cursor.execute(
+                f"SELECT ProductID, Stock, Price FROM Products WHERE ProductID IN ({placeholders}) "
+                f"ORDER BY ProductID FOR UPDATE",
+                product_ids,
+            )
+            locked = {product_id: (stock, price) for product_id, stock, price in cursor.fetchall()}
+
+            for product_id in product_ids:
+                if product_id not in locked:
+                    raise OrderError(f"Product ID {product_id} does not exist.")
+                stock = locked[product_id][0] or 0
+                if stock < items[product_id]:
+                    raise InsufficientStockError(product_id, items[product_id], stock)
+
+            cases = " ".join(["WHEN %s THEN %s"] * len(product_ids))
+            params = [value for product_id in product_ids for value in (product_id, items[product_id])]
+            cursor.execute(
+                f"UPDATE Products SET Stock = Stock - CASE ProductID {cases} END "
+                f"WHERE ProductID IN ({placeholders})",
+                params + product_ids,
+            )
+
+            # Single-line orders keep ProductID on the header for older readers.
+            header_product = product_ids[0] if len(product_ids) == 1 else None
+            cursor.execute("""
+                INSERT INTO Orders (CustomerID, ProductID, Quantity, OrderDate)
+                VALUES (%s, %s, %s, CURDATE())
+            """, (customer_id, header_product, sum(items.values())))
+            order_id = cursor.lastrowid
+
+            cursor.executemany("""
+                INSERT INTO OrderItems (OrderID, ProductID, Quantity, UnitPrice)
+                VALUES (%s, %s, %s, %s)
+            """, [(order_id, product_id, items[product_id], locked[product_id][1]) for product_id in product_ids])
+            append_order_events(cursor, order_id)
+
+            db.commit()
+            invalidate_catalog()
+            return order_id
+        finally:
+            cursor.close()
+
+
+def _with_retries(func, max_retries, *args):
+    """Call func(*args), retrying deadlocks and lock-wait timeouts with backoff."""
+    attempt = 0
+    while True:
+        try:
+            return func(*args)
+        except OrderError:
+            raise
+        except Exception as e:
+            if not is_retryable(e) or attempt >= max_retries:
+                raise
+            time.sleep(_backoff_delay(attempt))
+            attempt += 1
+
+
+def create_order(customer_id, product_id, quantity, max_retries=MAX_RETRIES):
+    """Atomically place an order and decrement stock, returning the new order ID.
+
+    Deadlocks and lock-wait timeouts are retried with exponential backoff;
+    an InsufficientStockError is raised if the stock cannot cover the order.
+    """
+    quantity = int(quantity)
+    if quantity <= 0:
+        raise OrderError("Please enter a valid quantity!")
+    return _with_retries(_place_order_once, max_retries, customer_id, product_id, quantity)
+
+
+def checkout_cart(customer_id, items, max_retries=MAX_RETRIES):
+    """Place one order for a whole cart in a single transaction.
+
+    ``items`` is an iterable of (product_id, quantity) pairs; repeated products
+    are merged. All products are locked in ProductID order, stock is checked
+    for every line, decremented with one batched UPDATE and the order is
+    committed once. Returns the new order ID.
+    """
+    merged = {}
+    for product_id, quantity in items:
+        quantity = int(quantity)
+        if quantity <= 0:
+            raise OrderError("Please enter a valid quantity!")
+        merged[int(product_id)] = merged.get(int(product_id), 0) + quantity
+    if not merged:
+        raise OrderError("Your cart is empty!")
+    return _with_retries(_checkout_cart_once, max_retries, customer_id, merged)
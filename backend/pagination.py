@@ -0,0 +1,104 @@
+from backend.catalog_cache import cached_catalog_query
+from database.db_config import get_connection, get_storage
+
+COUNT_CAP = 1000  # matching rows counted exactly before falling back to an estimate
+
+
+class KeysetQuery:
+    """Page through a SELECT with keyset (seek) pagination.
+
+    ``columns`` maps each display column, in row order, to the SQL expression
+    that produces it. Rows are ordered by the sort column and then by
+    ``id_column`` so every row has a unique, stable position; a page starts
+    strictly after (or before) the key of the last row already shown instead
+    of using OFFSET, so deep pages cost the same as the first one. Nullable
+    sort columns should be wrapped in COALESCE by the caller. Pages of queries
+    with a ``cache_key`` are served from the product catalog cache.
+
+    For the pages to be cheap, an index should lead with the filtered columns
+    and end with (sort column, id), e.g. Orders (CustomerID, OrderDate, OrderID).
+    """
+
+    def __init__(self, select_sql, columns, id_column, where="", params=(), cache_key=None):
+        self.cache_key = cache_key
+        self.select_sql = select_sql
+        self.columns = columns
+        self.column_names = list(columns)
+        self.id_column = id_column
+        self.where = where
+        self.params = tuple(params)
+
+    def row_key(self, row, sort_column):
+        """Return the (sort value, id) key of a row."""
+        return (row[self.column_names.index(sort_column)],
+                row[self.column_names.index(self.id_column)])
+
+    def fetch_page(self, sort_column, descending, key, forward, limit):
+        """Fetch up to ``limit`` rows after ``key`` (forward) or before it, in display order."""
+        if self.cache_key is None:
+            return self._query_page(sort_column, descending, key, forward, limit)
+        return cached_catalog_query(
+            (self.cache_key, self.params, sort_column, descending, key, forward, limit),
+            lambda: self._query_page(sort_column, descending, key, forward, limit),
+        )
+
+    def _query_page(self, sort_column, descending, key, forward, limit):
+        sort_expr = self.columns[sort_column]
+        id_expr = self.columns[self.id_column]
+        ascending = (not descending) == forward
+        op = ">" if ascending else "<"
+        direction = "ASC" if ascending else "DESC"
+
+        conditions = [self.where] if self.where else []
+        params = list(self.params)
+        if key is not None:
+            if sort_column == self.id_column:
+                conditions.append(f"{id_expr} {op} %s")
+                params.append(key[1])
+            else:
+                # The leading "sort >= key" gives the planner an index range to seek to;
+                # the OR alone would make it scan from the start of the index.
+                conditions.append(f"{sort_expr} {op}= %s AND ({sort_expr} {op} %s OR {id_expr} {op} %s)")
+                params.extend([key[0], key[0], key[1]])
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        order = f"{sort_expr} {direction}" if sort_column == self.id_column else \
+            f"{sort_expr} {direction}, {id_expr} {direction}"
+        query = f"{self.select_sql} {where} ORDER BY {order} LIMIT %s"
+        params.append(limit)
+
+        with get_connection() as db:
+            cursor = db.cursor()
+            try:
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+
+        if not forward:
+            rows.reverse()
+        return rows
+
+    def count_estimate(self, cap=COUNT_CAP):
+        """Return (row count, "exact" | "estimate" | "at least") without a full COUNT(*).
+
+        Up to ``cap`` matching rows are counted exactly, reading no more than
+        ``cap + 1`` of them. Beyond that the engine's planner estimate is used
+        (MySQL's EXPLAIN row count); engines without one report "at least" ``cap``.
+        """
+        where = f"WHERE {self.where}" if self.where else ""
+        params = list(self.params)
+        with get_connection() as db:
+            cursor = db.cursor()
+            try:
+                cursor.execute(f"SELECT COUNT(*) FROM ({self.select_sql} {where} LIMIT %s) AS capped",
+                               params + [cap + 1])
+                count = cursor.fetchone()[0]
+                if count <= cap:
+                    return count, "exact"
+                estimate = get_storage().estimate_rows(cursor, f"{self.select_sql} {where}", params)
+            finally:
+                cursor.close()
+        if estimate is None or estimate <= cap:
+            return cap, "at least"
+        return estimate, "estimate"
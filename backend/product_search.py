@@ -0,0 +1,62 @@
+"""Search and filter conditions for the product catalog queries.
+
+Search text is split into words and each word must start a word of the
+product's name or category, so "lap pro" finds "Laptop Pro 14". Matching is
+done by the database's full-text index (MySQL FULLTEXT or SQLite FTS5, see
+database/storage.py); category and price filters are plain indexed
+conditions. Everything is pushed into the SQL of the paged query, so a
+search only ever returns one page of rows.
+"""
+import re
+
+from backend.catalog_cache import cached_catalog_query
+from database.db_config import get_connection, get_storage
+
+SEARCH_MAX_WORDS = 8
+
+
+def search_words(text):
+    """Split search text into lowercase words (letters and digits only)."""
+    return re.findall(r"[^\W_]+", (text or "").lower())[:SEARCH_MAX_WORDS]
+
+
+def product_filters(in_stock_only=False, search="", category=None, min_price=None, max_price=None):
+    """Return (WHERE condition, params) for the given catalog filters."""
+    conditions = []
+    params = []
+    if in_stock_only:
+        conditions.append("Stock > 0")
+    words = search_words(search)
+    if words:
+        condition, values = get_storage().product_search(words)
+        conditions.append(condition)
+        params.extend(values)
+    if category:
+        conditions.append("Category = %s")
+        params.append(category)
+    if min_price is not None:
+        conditions.append("Price >= %s")
+        params.append(min_price)
+    if max_price is not None:
+        conditions.append("Price <= %s")
+        params.append(max_price)
+    return " AND ".join(conditions), params
+
+
+def _load_categories():
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            cursor.execute("""
+                SELECT DISTINCT Category FROM Products
+                WHERE Category IS NOT NULL AND Category <> ''
+                ORDER BY Category
+            """)
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+
+def list_categories():
+    """Return every product category, for the category filter."""
+    return cached_catalog_query("categories", _load_categories)
@@ -0,0 +1,403 @@
+"""Asynchronous PDF receipt generation.
+
+Placing an order only adds a row to ReceiptJobs. A ReceiptWorker claims
+pending jobs in batches, loads every claimed order with two queries and
+renders the PDFs in a pool of worker processes from a precompiled template.
+Each job records a hash of the receipt's content, so an unchanged receipt is
+served from disk instead of being rendered again. The GUI runs one worker in
+the background; it can also run on its own:
+
+    python -m backend.receipt_service
+"""
+import hashlib
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from database.db_config import get_connection
+
+RECEIPTS_DIR = "receipts"
+RECEIPT_BATCH_SIZE = 50
+RECEIPT_WORKERS = max(1, min(4, os.cpu_count() or 1))
+RECEIPT_POLL_SECONDS = 5
+RECEIPT_MAX_ATTEMPTS = 3
+RECEIPT_STALE_SECONDS = 300  # "rendering" jobs older than this were abandoned by a crashed worker
+RECEIPT_TEMPLATE_VERSION = 1  # bump when the layout changes so stored receipts are rendered again
+
+_template = None  # compiled once per renderer process
+_wakeup = threading.Event()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def receipt_path(order_id, customer_id, directory=RECEIPTS_DIR):
+    """Return the file a receipt is (or will be) written to."""
+    return os.path.join(directory, f"Order_{order_id}_{customer_id}.pdf")
+
+
+def enqueue_receipt(order_id, customer_id):
+    """Queue a receipt for rendering and return immediately."""
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            cursor.execute("""
+                INSERT IGNORE INTO ReceiptJobs (OrderID, CustomerID, Status, CreatedAt, UpdatedAt)
+                VALUES (%s, %s, 'pending', NOW(), NOW())
+            """, (order_id, customer_id))
+            db.commit()
+        finally:
+            cursor.close()
+    _wakeup.set()
+
+
+def requeue_stale_jobs(older_than=RECEIPT_STALE_SECONDS):
+    """Put jobs a crashed worker left in "rendering" back in the queue."""
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            cursor.execute("""
+                UPDATE ReceiptJobs SET Status = 'pending', ClaimToken = NULL, UpdatedAt = NOW()
+                WHERE Status = 'rendering' AND UpdatedAt < NOW() - INTERVAL %s SECOND
+            """, (older_than,))
+            db.commit()
+            return cursor.rowcount
+        finally:
+            cursor.close()
+
+
+def claim_jobs(limit=RECEIPT_BATCH_SIZE):
+    """Mark up to ``limit`` pending jobs as rendering and return their order IDs."""
+    token = uuid.uuid4().hex
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            # The UPDATE claims rows atomically, so several workers never render the same job.
+            # The derived table lets MySQL limit a subquery on the table being updated,
+            # and keeps the statement valid on SQLite, which has no UPDATE ... LIMIT.
+            cursor.execute("""
+                UPDATE ReceiptJobs
+                SET Status = 'rendering', ClaimToken = %s, Attempts = Attempts + 1, UpdatedAt = NOW()
+                WHERE Status = 'pending' AND OrderID IN (
+                    SELECT OrderID FROM (
+                        SELECT OrderID FROM ReceiptJobs WHERE Status = 'pending' ORDER BY OrderID LIMIT %s
+                    ) AS picked
+                )
+            """, (token, limit))
+            db.commit()
+            if cursor.rowcount == 0:
+                return []
+            cursor.execute("SELECT OrderID FROM ReceiptJobs WHERE ClaimToken = %s ORDER BY OrderID", (token,))
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+
+def fetch_receipt_data(order_ids):
+    """Load headers and lines for many orders; returns {OrderID: order dict}."""
+    if not order_ids:
+        return {}
+    placeholders = ", ".join(["%s"] * len(order_ids))
+    with get_connection() as db:
+        cursor = db.cursor(dictionary=True)
+        try:
+            cursor.execute(f"""
+                SELECT o.OrderID, o.OrderDate, o.CustomerID, u.Username AS CustomerName, r.ContentHash
+                FROM Orders o
+                JOIN Users u ON o.CustomerID = u.UserID
+                LEFT JOIN ReceiptJobs r ON r.OrderID = o.OrderID
+                WHERE o.OrderID IN ({placeholders})
+            """, tuple(order_ids))
+            orders = {order["OrderID"]: dict(order, items=[]) for order in cursor.fetchall()}
+
+            cursor.execute(f"""
+                SELECT i.OrderID, p.Name AS ProductName, i.UnitPrice AS Price, i.Quantity
+                FROM OrderItems i
+                JOIN Products p ON i.ProductID = p.ProductID
+                WHERE i.OrderID IN ({placeholders})
+                ORDER BY i.OrderID, i.OrderItemID
+            """, tuple(order_ids))
+            for item in cursor.fetchall():
+                if item["OrderID"] in orders:
+                    orders[item["OrderID"]]["items"].append(item)
+        finally:
+            cursor.close()
+    return {order_id: order for order_id, order in orders.items() if order["items"]}
+
+
+class ReceiptTemplate:
+    """Receipt layout compiled once per renderer process.
+
+    Static rows are kept as ready-made cell arguments; for each order only the
+    detail fields and the item rows are formatted.
+    """
+
+    RULE = "-" * 50
+    ITEM_WIDTHS = (100, 30, 30, 30)
+
+    def __init__(self, fpdf_class):
+        self.fpdf_class = fpdf_class
+        # (width, text, cell options)
+        self.header = [
+            (200, "ORDER RECEIPT", {"ln": 1, "align": "C"}),
+            (200, self.RULE, {"ln": 1, "align": "C"}),
+        ]
+        # (width, label, order field, cell options)
+        self.details = [
+            (200, "Order ID: ", "OrderID", {"ln": 1}),
+            (200, "Date: ", "OrderDate", {"ln": 1}),
+            (200, "Customer: ", "CustomerName", {"ln": 1}),
+        ]
+        self.table_header = [
+            (200, self.RULE, {"ln": 1}),
+            (100, "Product", {"border": 1}),
+            (30, "Price", {"border": 1}),
+            (30, "Qty", {"border": 1}),
+            (30, "Subtotal", {"border": 1, "ln": 1}),
+        ]
+        self.footer = [(200, "Thank you for your order!", {"ln": 1, "align": "C"})]
+
+    def render(self, order):
+        """Return an FPDF document for one order."""
+        pdf = self.fpdf_class()
+        pdf.add_page()
+        pdf.set_font("Arial", size=12)
+        cell = pdf.cell
+
+        for width, text, options in self.header:
+            cell(width, 10, txt=text, **options)
+        for width, label, field, options in self.details:
+            cell(width, 10, txt=f"{label}{order[field]}", **options)
+        for width, text, options in self.table_header:
+            cell(width, 10, txt=text, **options)
+
+        name_width, price_width, qty_width, subtotal_width = self.ITEM_WIDTHS
+        total = 0
+        for item in order["items"]:
+            subtotal = item['Quantity'] * item['Price']
+            total += subtotal
+            cell(name_width, 10, txt=item['ProductName'], border=1)
+            cell(price_width, 10, txt=f"${item['Price']:.2f}", border=1)
+            cell(qty_width, 10, txt=str(item['Quantity']), border=1)
+            cell(subtotal_width, 10, txt=f"${subtotal:.2f}", border=1, ln=1)
+
+        cell(name_width + price_width + qty_width, 10, txt="TOTAL:", border=1)
+        cell(subtotal_width, 10, txt=f"${total:.2f}", border=1, ln=1)
+
+        for width, text, options in self.footer:
+            cell(width, 10, txt=text, **options)
+        return pdf
+
+
+def _init_renderer():
+    """Process initializer: import fpdf and compile the template once."""
+    global _template
+    if _template is None:
+        from fpdf import FPDF
+        _template = ReceiptTemplate(FPDF)
+
+
+def receipt_digest(order):
+    """Return a hash of everything printed on the receipt."""
+    content = [
+        RECEIPT_TEMPLATE_VERSION, order["OrderID"], str(order["OrderDate"]), order["CustomerName"],
+        [[item["ProductName"], str(item["Price"]), item["Quantity"]] for item in order["items"]],
+    ]
+    return hashlib.sha256(json.dumps(content).encode("utf-8")).hexdigest()
+
+
+def is_receipt_current(order, digest, directory=RECEIPTS_DIR):
+    """True when the stored receipt file was rendered from exactly this content."""
+    return (order.get("ContentHash") == digest
+            and os.path.exists(receipt_path(order["OrderID"], order["CustomerID"], directory)))
+
+
+def render_receipt(order, directory=RECEIPTS_DIR):
+    """Render one order to PDF and return the file name.
+
+    The PDF is written to a temporary file first and renamed into place, so a
+    reader never sees a half-written receipt.
+    """
+    _init_renderer()
+    pdf = _template.render(order)
+
+    os.makedirs(directory, exist_ok=True)
+    filename = receipt_path(order["OrderID"], order["CustomerID"], directory)
+    temp_name = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        pdf.output(temp_name)
+        os.replace(temp_name, filename)
+    finally:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+    return filename
+
+
+def render_receipts(orders, directory=RECEIPTS_DIR):
+    """Render a batch of orders; returns (OrderID, file name, digest, error) per order.
+
+    Orders whose stored receipt already matches their content are not rendered again.
+    """
+    results = []
+    for order in orders:
+        try:
+            digest = receipt_digest(order)
+            if is_receipt_current(order, digest, directory):
+                filename = receipt_path(order["OrderID"], order["CustomerID"], directory)
+            else:
+                filename = render_receipt(order, directory)
+            results.append((order["OrderID"], filename, digest, None))
+        except Exception as e:
+            results.append((order["OrderID"], None, None, str(e)))
+    return results
+
+
+def _finish_jobs(results, max_attempts=RECEIPT_MAX_ATTEMPTS):
+    """Record render results; failed jobs go back to the queue until max_attempts."""
+    if not results:
+        return
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            cursor.executemany("""
+                UPDATE ReceiptJobs
+                SET Status = IF(%s IS NULL, 'done', IF(Attempts >= %s, 'failed', 'pending')),
+                    Error = %s, ContentHash = COALESCE(%s, ContentHash), ClaimToken = NULL, UpdatedAt = NOW()
+                WHERE OrderID = %s
+            """, [(error, max_attempts, error[:255] if error else None, digest, order_id)
+                  for order_id, _, digest, error in results])
+            db.commit()
+        finally:
+            cursor.close()
+
+
+class ReceiptWorker:
+    """Drain the receipt queue with a pool of renderer processes."""
+
+    def __init__(self, workers=RECEIPT_WORKERS, batch_size=RECEIPT_BATCH_SIZE, directory=RECEIPTS_DIR):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.directory = directory
+        self._executor = None
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_renderer)
+        return self._executor
+
+    def run_once(self):
+        """Claim and render one batch of jobs; returns the number of jobs handled."""
+        order_ids = claim_jobs(self.batch_size)
+        if not order_ids:
+            return 0
+
+        try:
+            orders = fetch_receipt_data(order_ids)
+            batch = [orders[order_id] for order_id in order_ids if order_id in orders]
+            # One chunk per process keeps the pickling overhead to a few calls per batch.
+            chunk_size = max(1, -(-len(batch) // self.workers))
+            futures = [self._pool().submit(render_receipts, batch[i:i + chunk_size], self.directory)
+                       for i in range(0, len(batch), chunk_size)]
+            results = [(order_id, None, None, "Order not found!") for order_id in order_ids if order_id not in orders]
+            for future in futures:
+                results.extend(future.result())
+        except Exception as e:
+            results = [(order_id, None, None, f"Error generating receipt: {e}") for order_id in order_ids]
+
+        _finish_jobs(results)
+        return len(order_ids)
+
+    def run_forever(self, poll_seconds=RECEIPT_POLL_SECONDS):
+        """Render jobs until stop() is called, sleeping while the queue is empty."""
+        try:
+            requeue_stale_jobs()
+        except Exception as e:
+            print(f"Error requeueing receipt jobs: {e}")
+        while not self._stopping.is_set():
+            # Cleared before claiming, so a job queued during the batch wakes the next wait.
+            _wakeup.clear()
+            try:
+                handled = self.run_once()
+            except Exception as e:
+                print(f"Error processing receipt jobs: {e}")
+                handled = 0
+            if handled < self.batch_size:
+                _wakeup.wait(poll_seconds)
+
+    def start(self):
+        """Run the worker on a daemon thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run_forever, name="receipt-worker", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stop after the current batch and shut the renderer processes down."""
+        self._stopping.set()
+        _wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def start_receipt_worker():
+    """Start the shared background receipt worker if it is not running yet."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = ReceiptWorker().start()
+    return _worker
+
+
+def stop_receipt_worker():
+    """Stop the shared background receipt worker."""
+    global _worker
+    with _worker_lock:
+        worker, _worker = _worker, None
+    if worker is not None:
+        worker.stop()
+
+
+def _record_receipt(order, digest):
+    """Mark an order's receipt as rendered, creating its job row if needed."""
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO ReceiptJobs (OrderID, CustomerID, Status, ContentHash, CreatedAt, UpdatedAt)
+                VALUES (%s, %s, 'done', %s, NOW(), NOW())
+                ON DUPLICATE KEY UPDATE Status = 'done', Error = NULL, ContentHash = VALUES(ContentHash),
+                                        ClaimToken = NULL, UpdatedAt = NOW()
+            """, (order["OrderID"], order["CustomerID"], digest))
+            db.commit()
+        finally:
+            cursor.close()
+
+
+def generate_receipt(order_id, customer_id):
+    """Return (file name, error) for an order's receipt.
+
+    A stored receipt whose content hash still matches the order is returned
+    as is; otherwise the receipt is rendered now.
+    """
+    try:
+        order = fetch_receipt_data([order_id]).get(order_id)
+        if not order or order["CustomerID"] != customer_id:
+            return None, "Order not found!"
+        digest = receipt_digest(order)
+        if is_receipt_current(order, digest):
+            return receipt_path(order_id, customer_id), None
+        filename = render_receipt(order)
+        _record_receipt(order, digest)
+        return filename, None
+    except Exception as e:
+        return None, f"Error generating receipt: {e}"
+
+
+if __name__ == "__main__":
+    ReceiptWorker().run_forever()
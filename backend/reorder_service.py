@@ -0,0 +1,332 @@
+"""Low-stock alerts and reorder suggestions per supplier.
+
+A ReorderEngine projects how many days each product's stock will last from
+its forecast daily demand (backend/forecasting.py), or for products without
+a forecast yet, its average sales over the last REORDER_VELOCITY_DAYS days
+(read from SalesDailySummary, which covers Sales and order lines). Products that will
+run out within their supplier's lead time plus REORDER_SAFETY_DAYS, or are
+already below LOW_STOCK_LEVEL, are kept in a priority queue, fewest days of
+stock first, and written to ReorderSuggestions in per-supplier batches.
+
+After the first run only products touched since the previous run are
+projected again: rows of Products that changed (UpdatedAt, bumped by stock
+updates and orders) and products with new sales in the summary. Everything
+is recomputed once a day, when the velocity window moves. The GUI and the
+API server run an engine in the background; it can also run on its own:
+
+    python -m backend.reorder_service
+"""
+import datetime
+import heapq
+import math
+import threading
+import time
+
+from backend.forecasting import daily_demand
+from backend.sales_report import SUMMARY_SOURCES, refresh_sales_summary
+from database.db_config import get_connection
+from database.query_profiler import get_logger
+
+REORDER_VELOCITY_DAYS = 28
+REORDER_SAFETY_DAYS = 7  # reorder this many days before stock would run out on arrival
+REORDER_COVER_DAYS = 30  # a suggested order should last this long after it arrives
+REORDER_MIN_QUANTITY = 10
+LOW_STOCK_LEVEL = 5  # below this a product is low on stock whatever its sales
+DEFAULT_LEAD_TIME_DAYS = 7  # for products without a supplier
+REORDER_BATCH_SIZE = 500  # products per statement when projecting and writing
+REORDER_POLL_SECONDS = 60
+TOUCH_SLACK_SECONDS = 60  # also re-read rows changed just before the last run, in case they committed late
+
+SUGGESTION_COLUMNS = ("ProductID", "SupplierID", "Stock", "DailyVelocity", "DaysOfStock", "Quantity")
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _chunks(values, size=REORDER_BATCH_SIZE):
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def project(stock, velocity, lead_time_days):
+    """Return (days of stock or None, reorder needed?, quantity to order).
+
+    ``velocity`` is the expected units sold per day. Days of stock is None
+    for products that are not expected to sell at all.
+    """
+    stock = max(stock or 0, 0)
+    days = stock / velocity if velocity else None
+    needed = stock < LOW_STOCK_LEVEL or (days is not None and days <= lead_time_days + REORDER_SAFETY_DAYS)
+    quantity = max(math.ceil(velocity * (lead_time_days + REORDER_COVER_DAYS)) - stock, REORDER_MIN_QUANTITY)
+    return days, needed, quantity
+
+
+def _urgency(suggestion):
+    """Priority queue key: projected days of stock, with unsold low-stock products last."""
+    if suggestion["Stock"] <= 0:
+        return 0.0
+    days = suggestion["DaysOfStock"]
+    return float("inf") if days is None else days
+
+
+def _forecast_demand(product_ids):
+    try:
+        return daily_demand(product_ids)
+    except Exception as e:
+        get_logger().warning("No demand forecast, using %d-day averages: %s", REORDER_VELOCITY_DAYS, e)
+        return {}
+
+
+def load_projections(product_ids, since_date, demand=None):
+    """Return {ProductID: suggestion dict or None} for the given products.
+
+    ``demand`` maps products to forecast units per day; others use their
+    average since ``since_date``. None means the product does not need
+    reordering (or no longer exists).
+    """
+    demand = demand or {}
+    projections = dict.fromkeys(product_ids)
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            for chunk in _chunks(product_ids):
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(f"""
+                    SELECT p.ProductID, p.Stock, p.SupplierID, COALESCE(s.LeadTimeDays, %s),
+                           (SELECT COALESCE(SUM(d.Quantity), 0) FROM SalesDailySummary d
+                            WHERE d.ProductID = p.ProductID AND d.SummaryDate >= %s)
+                    FROM Products p
+                    LEFT JOIN Suppliers s ON s.SupplierID = p.SupplierID
+                    WHERE p.ProductID IN ({placeholders})
+                """, [DEFAULT_LEAD_TIME_DAYS, since_date] + chunk)
+                for product_id, stock, supplier_id, lead_time, sold in cursor.fetchall():
+                    velocity = demand.get(product_id, int(sold) / REORDER_VELOCITY_DAYS)
+                    days, needed, quantity = project(stock, velocity, lead_time)
+                    if needed:
+                        projections[product_id] = {
+                            "ProductID": product_id, "SupplierID": supplier_id, "Stock": max(stock or 0, 0),
+                            "DailyVelocity": round(velocity, 3),
+                            "DaysOfStock": None if days is None else round(days, 2), "Quantity": quantity,
+                        }
+        finally:
+            cursor.close()
+    return projections
+
+
+class ReorderEngine:
+    """Keeps the products that need reordering in a priority queue and in ReorderSuggestions."""
+
+    def __init__(self, batch_size=REORDER_BATCH_SIZE, on_batch=None):
+        self.batch_size = batch_size
+        self.on_batch = on_batch  # called with (supplier ID, suggestions) for every changed batch
+        self._due = None  # ProductID -> suggestion currently stored
+        self._heap = []  # (urgency, ProductID, version); stale entries are skipped
+        self._versions = {}
+        self._next_version = 0
+        self._watermarks = None
+        self._last_run = None  # (monotonic time, date) of the last run
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def _push(self, suggestion):
+        self._next_version += 1
+        self._versions[suggestion["ProductID"]] = self._next_version
+        heapq.heappush(self._heap, (_urgency(suggestion), suggestion["ProductID"], self._next_version))
+
+    def _compact(self):
+        if len(self._heap) > 2 * len(self._versions) + 64:
+            self._heap = [entry for entry in self._heap if self._versions.get(entry[1]) == entry[2]]
+            heapq.heapify(self._heap)
+
+    def _load_stored(self):
+        with get_connection() as db:
+            cursor = db.cursor()
+            try:
+                cursor.execute(f"SELECT {', '.join(SUGGESTION_COLUMNS)} FROM ReorderSuggestions")
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        self._due = {}
+        for row in rows:
+            suggestion = dict(zip(SUGGESTION_COLUMNS, row))
+            suggestion["DailyVelocity"] = float(suggestion["DailyVelocity"])
+            if suggestion["DaysOfStock"] is not None:
+                suggestion["DaysOfStock"] = float(suggestion["DaysOfStock"])
+            self._due[suggestion["ProductID"]] = suggestion
+            self._push(suggestion)
+
+    def _all_candidates(self, since_date):
+        """Products that sold in the velocity window or are low on stock, plus those stored."""
+        with get_connection() as db:
+            cursor = db.cursor()
+            try:
+                cursor.execute("SELECT DISTINCT ProductID FROM SalesDailySummary WHERE SummaryDate >= %s",
+                               (since_date,))
+                candidates = {row[0] for row in cursor.fetchall()}
+                cursor.execute("SELECT ProductID FROM Products WHERE Stock < %s", (LOW_STOCK_LEVEL,))
+                candidates.update(row[0] for row in cursor.fetchall())
+            finally:
+                cursor.close()
+        return candidates | set(self._due)
+
+    def _touched(self, old_watermarks, new_watermarks, seconds):
+        """Products changed in the last ``seconds`` or with summary rows added between the watermarks."""
+        with get_connection() as db:
+            cursor = db.cursor()
+            try:
+                cursor.execute("SELECT ProductID FROM Products WHERE UpdatedAt >= NOW() - INTERVAL %s SECOND",
+                               (math.ceil(seconds),))
+                touched = {row[0] for row in cursor.fetchall()}
+                for source, spec in SUMMARY_SOURCES.items():
+                    if new_watermarks[source] > old_watermarks[source]:
+                        cursor.execute(f"""
+                            SELECT DISTINCT {spec['product']} FROM {spec['rows']}
+                            WHERE {spec['id']} > %s AND {spec['id']} <= %s
+                        """, (old_watermarks[source], new_watermarks[source]))
+                        touched.update(row[0] for row in cursor.fetchall() if row[0] is not None)
+            finally:
+                cursor.close()
+        return touched
+
+    def _write(self, changed, resolved):
+        """Store changed suggestions, one batch per supplier, and drop resolved ones."""
+        by_supplier = {}
+        for suggestion in sorted(changed, key=_urgency):
+            by_supplier.setdefault(suggestion["SupplierID"], []).append(suggestion)
+        with get_connection() as db:
+            cursor = db.cursor()
+            try:
+                for supplier_id, suggestions in by_supplier.items():
+                    for batch in _chunks(suggestions, self.batch_size):
+                        cursor.executemany(f"""
+                            INSERT INTO ReorderSuggestions ({', '.join(SUGGESTION_COLUMNS)}, UpdatedAt)
+                            VALUES (%s, %s, %s, %s, %s, %s, NOW())
+                            ON DUPLICATE KEY UPDATE SupplierID = VALUES(SupplierID), Stock = VALUES(Stock),
+                                DailyVelocity = VALUES(DailyVelocity), DaysOfStock = VALUES(DaysOfStock),
+                                Quantity = VALUES(Quantity), UpdatedAt = NOW()
+                        """, [tuple(s[column] for column in SUGGESTION_COLUMNS) for s in batch])
+                for batch in _chunks(resolved, self.batch_size):
+                    cursor.execute(f"DELETE FROM ReorderSuggestions WHERE ProductID IN "
+                                   f"({', '.join(['%s'] * len(batch))})", batch)
+                db.commit()
+            finally:
+                cursor.close()
+        for supplier_id, suggestions in by_supplier.items():
+            get_logger().info("Reorder: supplier %s, %d product(s), most urgent product %s (%s days of stock)",
+                              supplier_id if supplier_id is not None else "(none)", len(suggestions),
+                              suggestions[0]["ProductID"], suggestions[0]["DaysOfStock"])
+            if self.on_batch is not None:
+                self.on_batch(supplier_id, suggestions)
+
+    def run_once(self):
+        """Project the touched products again and store the changes; returns (changed, resolved) counts."""
+        with self._lock:
+            if self._due is None:
+                self._load_stored()
+            started = time.monotonic()
+            today = datetime.date.today()
+            since_date = today - datetime.timedelta(days=REORDER_VELOCITY_DAYS - 1)
+            watermarks = refresh_sales_summary()
+
+            if self._last_run is None or self._last_run[1] != today:
+                product_ids = self._all_candidates(since_date)
+            else:
+                product_ids = self._touched(self._watermarks, watermarks,
+                                            started - self._last_run[0] + TOUCH_SLACK_SECONDS)
+
+            changed = []
+            resolved = []
+            demand = _forecast_demand(product_ids)
+            for product_id, suggestion in load_projections(product_ids, since_date, demand).items():
+                current = self._due.get(product_id)
+                if suggestion is None:
+                    if current is not None:
+                        del self._due[product_id]
+                        del self._versions[product_id]
+                        resolved.append(product_id)
+                elif suggestion != current:
+                    self._due[product_id] = suggestion
+                    self._push(suggestion)
+                    changed.append(suggestion)
+            self._compact()
+
+            if changed or resolved:
+                self._write(changed, resolved)
+            self._watermarks = watermarks
+            self._last_run = (started, today)
+            return len(changed), len(resolved)
+
+    def most_urgent(self, limit=20):
+        """The ``limit`` products with the fewest days of stock left, as suggestion dicts."""
+        with self._lock:
+            entries = heapq.nsmallest(limit, (entry for entry in self._heap
+                                              if self._versions.get(entry[1]) == entry[2]))
+            return [dict(self._due[product_id]) for _, product_id, _ in entries]
+
+    def supplier_batches(self, limit=None):
+        """Products to reorder grouped by supplier ID, most urgent first within each supplier."""
+        batches = {}
+        for suggestion in self.most_urgent(limit if limit is not None else len(self._versions)):
+            batches.setdefault(suggestion["SupplierID"], []).append(suggestion)
+        return batches
+
+    def run_forever(self, poll_seconds=REORDER_POLL_SECONDS):
+        """Run until stop() is called, once every ``poll_seconds``."""
+        while not self._stopping.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Error updating reorder suggestions: {e}")
+            self._stopping.wait(poll_seconds)
+
+    def start(self):
+        """Run the engine on a daemon thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run_forever, name="reorder-engine", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stop after the current run."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def start_reorder_worker():
+    """Start the shared background reorder engine if it is not running yet."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = ReorderEngine().start()
+    return _worker
+
+
+def stop_reorder_worker():
+    """Stop the shared background reorder engine."""
+    global _worker
+    with _worker_lock:
+        worker, _worker = _worker, None
+    if worker is not None:
+        worker.stop()
+
+
+def refresh_reorder_suggestions():
+    """Bring the suggestions up to date now; returns (changed, resolved) counts."""
+    with _worker_lock:
+        engine = _worker
+    return (engine or ReorderEngine()).run_once()
+
+
+if __name__ == "__main__":
+    engine = ReorderEngine()
+    changed, resolved = engine.run_once()
+    print(f"{changed} suggestion(s) updated, {resolved} resolved.")
+    for supplier_id, suggestions in engine.supplier_batches(50).items():
+        print(f"Supplier {supplier_id if supplier_id is not None else '(none)'}:")
+        for s in suggestions:
+            days = "no recent sales" if s["DaysOfStock"] is None else f"{s['DaysOfStock']} days left"
+            print(f"  Product ID {s['ProductID']}: stock {s['Stock']}, {days}, order {s['Quantity']}")
+    engine.run_forever()
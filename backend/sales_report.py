@@ -1,32 +1,277 @@
-from database.db_config import connect_to_database
+import csv
+import json
+import sys
 
+from backend.event_log import catch_up
+from database.db_config import get_connection
 
-def generate_sales_report():
-    """Generate a sales report summarizing product sales."""
-    try:
-        db = connect_to_database()
+REPORT_COLUMNS = ("ProductID", "ProductName", "TotalSold", "TotalRevenue")
+REPORT_FETCH_SIZE = 1000
+
+# Sources folded into SalesDailySummary. Each source is read in order of the
+# auto-increment "id" column of "table"; "rows" is the FROM clause providing
+# the id, date, product and quantity expressions. Order lines reach Sales
+# through the event log's "sales" projection (backend/event_log.py).
+SUMMARY_SOURCES = {
+    "Sales": {
+        "table": "Sales", "rows": "Sales s", "id": "s.SaleID",
+        "date": "s.SaleDate", "product": "s.ProductID", "quantity": "s.Quantity",
+    },
+}
+
+
+def _lock_watermark(cursor, source):
+    """Return the watermark for a source, locking its row until commit."""
+    cursor.execute("INSERT IGNORE INTO SalesSummaryWatermarks (Source, LastID) VALUES (%s, 0)", (source,))
+    cursor.execute("SELECT LastID FROM SalesSummaryWatermarks WHERE Source = %s FOR UPDATE", (source,))
+    return cursor.fetchone()[0]
+
+
+def _max_source_id(cursor, source):
+    spec = SUMMARY_SOURCES[source]
+    id_column = spec["id"].split(".")[-1]
+    cursor.execute(f"SELECT COALESCE(MAX({id_column}), 0) FROM {spec['table']}")
+    return cursor.fetchone()[0]
+
+
+def _fold_into_summary(cursor, source, after_id, up_to_id):
+    """Add source rows with after_id < id <= up_to_id to the daily summary."""
+    spec = SUMMARY_SOURCES[source]
+    cursor.execute(f"""
+        INSERT INTO SalesDailySummary (SummaryDate, ProductID, Quantity)
+        SELECT {spec['date']}, {spec['product']}, SUM({spec['quantity']})
+        FROM {spec['rows']}
+        WHERE {spec['id']} > %s AND {spec['id']} <= %s
+          AND {spec['product']} IS NOT NULL AND {spec['date']} IS NOT NULL
+        GROUP BY {spec['date']}, {spec['product']}
+        ON DUPLICATE KEY UPDATE Quantity = SalesDailySummary.Quantity + VALUES(Quantity)
+    """, (after_id, up_to_id))
+    cursor.execute("UPDATE SalesSummaryWatermarks SET LastID = %s WHERE Source = %s", (up_to_id, source))
+
+
+def refresh_sales_summary():
+    """Fold Sales rows added since the last refresh into SalesDailySummary.
+
+    Orders logged since the last refresh are first projected into Sales. Each
+    source keeps a watermark (the highest row ID already counted), so a
+    refresh only reads new rows through the primary key. Returns the new
+    watermark per source.
+    """
+    catch_up("sales")
+    watermarks = {}
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            for source in SUMMARY_SOURCES:
+                last_id = _lock_watermark(cursor, source)
+                high_id = _max_source_id(cursor, source)
+                if high_id > last_id:
+                    _fold_into_summary(cursor, source, last_id, high_id)
+                watermarks[source] = max(high_id, last_id)
+            db.commit()
+        finally:
+            cursor.close()
+    return watermarks
+
+
+def rebuild_sales_summary():
+    """Recompute SalesDailySummary from scratch and reset the watermarks."""
+    catch_up("sales")
+    with get_connection() as db:
         cursor = db.cursor()
+        try:
+            for source in SUMMARY_SOURCES:
+                _lock_watermark(cursor, source)
+            cursor.execute("DELETE FROM SalesDailySummary")
+            for source in SUMMARY_SOURCES:
+                _fold_into_summary(cursor, source, 0, _max_source_id(cursor, source))
+            db.commit()
+        finally:
+            cursor.close()
+    print("Sales summary rebuilt.")
+
+
+def check_sales_summary():
+    """Compare the summary with the source tables up to the current watermarks.
+
+    Returns a list of (ProductID, expected, summarized) tuples for products whose
+    totals disagree; an empty list means the summary is consistent. Rows that
+    committed out of ID order after a refresh show up here and are fixed by
+    rebuild_sales_summary().
+    """
+    expected = {}
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            cursor.execute("SELECT Source, LastID FROM SalesSummaryWatermarks")
+            watermarks = dict(cursor.fetchall())
+            for source, spec in SUMMARY_SOURCES.items():
+                cursor.execute(f"""
+                    SELECT {spec['product']}, SUM({spec['quantity']})
+                    FROM {spec['rows']}
+                    WHERE {spec['id']} <= %s AND {spec['product']} IS NOT NULL AND {spec['date']} IS NOT NULL
+                    GROUP BY {spec['product']}
+                """, (watermarks.get(source, 0),))
+                for product_id, quantity in cursor.fetchall():
+                    expected[product_id] = expected.get(product_id, 0) + int(quantity or 0)
+
+            cursor.execute("SELECT ProductID, SUM(Quantity) FROM SalesDailySummary GROUP BY ProductID")
+            summarized = {product_id: int(quantity or 0) for product_id, quantity in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+    mismatches = [
+        (product_id, expected.get(product_id, 0), summarized.get(product_id, 0))
+        for product_id in sorted(set(expected) | set(summarized))
+        if expected.get(product_id, 0) != summarized.get(product_id, 0)
+    ]
+    if mismatches:
+        print(f"Sales summary is inconsistent for {len(mismatches)} product(s):")
+        for product_id, want, got in mismatches[:20]:
+            print(f"Product ID {product_id}: expected {want}, summarized {got}")
+    else:
+        print("Sales summary is consistent.")
+    return mismatches
+
+
+def _sales_report_query(start_date=None, end_date=None, top_n=None):
+    """Build the report query with date range and top-N pushed into SQL."""
+    conditions = []
+    params = []
+    if start_date is not None:
+        conditions.append("s.SummaryDate >= %s")
+        params.append(start_date)
+    if end_date is not None:
+        conditions.append("s.SummaryDate <= %s")
+        params.append(end_date)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    limit = ""
+    if top_n is not None:
+        limit = "LIMIT %s"
+        params.append(int(top_n))
 
-        query = """
-        SELECT p.Name AS ProductName, SUM(s.Quantity) AS TotalSold, SUM(s.Quantity * p.Price) AS TotalRevenue
-        FROM Sales s
-        JOIN Products p ON s.ProductID = p.ProductID
-        GROUP BY p.Name
-        ORDER BY TotalSold DESC
-        """
-        cursor.execute(query)
+    query = f"""
+    SELECT p.ProductID, p.Name AS ProductName, SUM(s.Quantity) AS TotalSold, SUM(s.Quantity) * p.Price AS TotalRevenue
+    FROM SalesDailySummary s
+    JOIN Products p ON s.ProductID = p.ProductID
+    {where}
+    GROUP BY p.ProductID, p.Name, p.Price
+    ORDER BY TotalSold DESC, p.ProductID
+    {limit}
+    """
+    return query, params
 
+
+def iter_sales_report(start_date=None, end_date=None, top_n=None, batch_size=REPORT_FETCH_SIZE):
+    """Yield report rows in batches of at most ``batch_size``.
+
+    Rows are read through an unbuffered cursor with fetchmany(), so the client
+    never holds more than one batch regardless of catalog size.
+    """
+    refresh_sales_summary()
+    query, params = _sales_report_query(start_date, end_date, top_n)
+    with get_connection() as db:
+        cursor = db.cursor(buffered=False)
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
+
+def _report_record(row):
+    product_id, name, sold, revenue = row
+    return product_id, name, int(sold or 0), float(revenue or 0)
+
+
+def _write_csv(f, batches):
+    writer = csv.writer(f)
+    writer.writerow(REPORT_COLUMNS)
+    for rows in batches:
+        writer.writerows(_report_record(row) for row in rows)
+
+
+def _write_jsonl(f, batches):
+    for rows in batches:
+        for row in rows:
+            f.write(json.dumps(dict(zip(REPORT_COLUMNS, _report_record(row)))) + "\n")
+
+
+def _write_columnar(f, batches):
+    # One JSON object of column arrays per fetched batch ("row group").
+    for rows in batches:
+        records = [_report_record(row) for row in rows]
+        f.write(json.dumps({column: [r[i] for r in records] for i, column in enumerate(REPORT_COLUMNS)}) + "\n")
+
+
+def _write_parquet(path, batches):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([("ProductID", pa.int64()), ("ProductName", pa.string()),
+                        ("TotalSold", pa.int64()), ("TotalRevenue", pa.float64())])
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in batches:
+            records = [_report_record(row) for row in rows]
+            columns = [[r[i] for r in records] for i in range(len(REPORT_COLUMNS))]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+
+
+def export_sales_report(path, fmt="csv", start_date=None, end_date=None, top_n=None,
+                        batch_size=REPORT_FETCH_SIZE):
+    """Stream the sales report to a file with bounded memory.
+
+    ``fmt`` is "csv", "jsonl", "columnar" (one JSON object of column arrays per
+    batch) or "parquet" (requires pyarrow). Returns the number of rows written.
+    """
+    written = 0
+
+    def counted(batches):
+        nonlocal written
+        for rows in batches:
+            written += len(rows)
+            yield rows
+
+    batches = counted(iter_sales_report(start_date, end_date, top_n, batch_size))
+    if fmt == "parquet":
+        _write_parquet(path, batches)
+    elif fmt in ("csv", "jsonl", "columnar"):
+        writer = {"csv": _write_csv, "jsonl": _write_jsonl, "columnar": _write_columnar}[fmt]
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer(f, batches)
+    else:
+        raise ValueError(f"Unsupported report format: {fmt}")
+
+    print(f"Sales report written to {path} ({written} rows).")
+    return written
+
+
+def generate_sales_report(start_date=None, end_date=None, top_n=None):
+    """Generate a sales report summarizing product sales."""
+    try:
         print("Sales Report:")
-        for row in cursor.fetchall():
-            print(f"Product: {row[0]}, Total Sold: {row[1]}, Total Revenue: {row[2]:.2f}")
+        for rows in iter_sales_report(start_date, end_date, top_n):
+            for row in rows:
+                print(f"Product: {row[1]}, Total Sold: {row[2]}, Total Revenue: {row[3] or 0:.2f}")
     except Exception as e:
         print(f"Error generating sales report: {e}")
-    finally:
-        if db.is_connected():
-            cursor.close()
-            db.close()
 
 
 if __name__ == "__main__":
-    generate_sales_report()
+    command = sys.argv[1] if len(sys.argv) > 1 else "report"
+    if command == "refresh":
+        print(f"Sales summary refreshed up to: {refresh_sales_summary()}")
+    elif command == "rebuild":
+        rebuild_sales_summary()
+    elif command == "check":
+        check_sales_summary()
+    elif command == "export":
+        # python -m backend.sales_report export report.csv [csv|jsonl|columnar|parquet]
+        export_sales_report(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else "csv")
+    else:
+        generate_sales_report()
 # Placeholder for Python script
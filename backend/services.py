@@ -0,0 +1,333 @@
+"""UI-independent operations shared by the Tk GUI and the HTTP API.
+
+Every public function here uses the pooled connection and is timed, so
+service_stats() shows the same numbers whether the calls came from a window
+or from a load-testing client.
+"""
+import functools
+import threading
+import time
+
+from backend.catalog_cache import invalidate_catalog
+from backend.credentials import authenticate, forget_credentials, hash_password
+from backend.event_log import append_delete_event, append_stock_events, read_events
+from backend.order_service import checkout_cart, create_order
+from backend.pagination import KeysetQuery
+from backend.product_search import list_categories, product_filters
+from backend.receipt_service import enqueue_receipt, generate_receipt
+from backend.reorder_service import refresh_reorder_suggestions
+from backend.update_stock import update_stock_batch
+from database.db_config import get_connection
+
+PRODUCT_COLUMNS = {
+    "ProductID": "ProductID",
+    "Name": "Name",
+    "Category": "COALESCE(Category, '')",
+    "Price": "COALESCE(Price, 0)",
+    "Stock": "COALESCE(Stock, 0)",
+}
+
+# Multi-line orders have no ProductID on the header
+CUSTOMER_ORDER_COLUMNS = {
+    "OrderID": "o.OrderID",
+    "CustomerName": "u.Username",
+    "ProductName": "COALESCE(p.Name, 'Multiple items')",
+    "Quantity": "o.Quantity",
+    "OrderDate": "o.OrderDate",
+}
+
+PAST_ORDER_COLUMNS = {
+    "OrderID": "o.OrderID",
+    "OrderDate": "o.OrderDate",
+    "ProductName": "COALESCE(p.Name, 'Multiple items')",
+    "Quantity": "o.Quantity",
+    "Total": "(SELECT COALESCE(SUM(i.Quantity * i.UnitPrice), 0) FROM OrderItems i WHERE i.OrderID = o.OrderID)",
+}
+
+# Products without sales have no projection; they sort after every dated one
+REORDER_COLUMNS = {
+    "ProductID": "r.ProductID",
+    "Name": "p.Name",
+    "Supplier": "COALESCE(s.Name, '')",
+    "Stock": "r.Stock",
+    "DaysOfStock": "COALESCE(r.DaysOfStock, 999999)",
+    "Quantity": "r.Quantity",
+}
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def timed(func):
+    """Record call count, errors and latency of a service function."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        failed = False
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with _stats_lock:
+                entry = _stats.setdefault(func.__name__, {"calls": 0, "errors": 0, "seconds": 0.0, "max": 0.0})
+                entry["calls"] += 1
+                entry["errors"] += failed
+                entry["seconds"] += elapsed
+                entry["max"] = max(entry["max"], elapsed)
+    return wrapper
+
+
+def service_stats():
+    """Return per-operation call counts and mean/max latency in milliseconds."""
+    with _stats_lock:
+        return {
+            name: {"calls": s["calls"], "errors": s["errors"],
+                   "mean_ms": s["seconds"] * 1000 / s["calls"] if s["calls"] else 0.0,
+                   "max_ms": s["max"] * 1000}
+            for name, s in _stats.items()
+        }
+
+
+def product_query(in_stock_only=False, search="", category=None, min_price=None, max_price=None):
+    """Keyset-paged query over the Products table, optionally searched and filtered."""
+    where, params = product_filters(in_stock_only, search, category, min_price, max_price)
+    return KeysetQuery(f"SELECT {', '.join(PRODUCT_COLUMNS.values())} FROM Products",
+                       PRODUCT_COLUMNS, "ProductID", where=where, params=params,
+                       cache_key=("products", where))
+
+
+def order_filters(start_date=None, end_date=None, customer=None):
+    """Return (WHERE condition, params) for order date range (inclusive) and customer filters.
+
+    ``customer`` is a user ID or a username; usernames need the Users join.
+    """
+    conditions = []
+    params = []
+    if customer is not None:
+        conditions.append("o.CustomerID = %s" if isinstance(customer, int) else "u.Username = %s")
+        params.append(customer)
+    if start_date is not None:
+        conditions.append("o.OrderDate >= %s")
+        params.append(start_date)
+    if end_date is not None:
+        conditions.append("o.OrderDate <= %s")
+        params.append(end_date)
+    return " AND ".join(conditions), params
+
+
+def customer_orders_query(start_date=None, end_date=None, customer=None):
+    """Keyset-paged query over all orders with customer and product names."""
+    where, params = order_filters(start_date, end_date, customer)
+    return KeysetQuery("""
+        SELECT o.OrderID, u.Username AS CustomerName, COALESCE(p.Name, 'Multiple items') AS ProductName,
+               o.Quantity, o.OrderDate
+        FROM Orders o
+        JOIN Users u ON o.CustomerID = u.UserID
+        LEFT JOIN Products p ON o.ProductID = p.ProductID
+    """, CUSTOMER_ORDER_COLUMNS, "OrderID", where=where, params=params)
+
+
+def past_orders_query(customer_id, start_date=None, end_date=None):
+    """Keyset-paged query over one customer's orders, one row per order with its total."""
+    where, params = order_filters(start_date, end_date, int(customer_id))
+    return KeysetQuery("""
+        SELECT o.OrderID, o.OrderDate, COALESCE(p.Name, 'Multiple items') AS ProductName, o.Quantity,
+               (SELECT COALESCE(SUM(i.Quantity * i.UnitPrice), 0) FROM OrderItems i
+                WHERE i.OrderID = o.OrderID) AS Total
+        FROM Orders o
+        LEFT JOIN Products p ON o.ProductID = p.ProductID
+    """, PAST_ORDER_COLUMNS, "OrderID", where=where, params=params)
+
+
+def reorder_query(supplier_id=None):
+    """Keyset-paged query over the reorder suggestions, optionally for one supplier."""
+    return KeysetQuery("""
+        SELECT r.ProductID, p.Name, COALESCE(s.Name, '') AS Supplier, r.Stock,
+               COALESCE(r.DaysOfStock, 999999) AS DaysOfStock, r.Quantity
+        FROM ReorderSuggestions r
+        JOIN Products p ON p.ProductID = r.ProductID
+        LEFT JOIN Suppliers s ON s.SupplierID = r.SupplierID
+    """, REORDER_COLUMNS, "ProductID", where="r.SupplierID = %s" if supplier_id is not None else "",
+        params=(supplier_id,) if supplier_id is not None else ())
+
+
+@timed
+def authenticate_user(username, password):
+    """Authenticate the user by checking credentials in the database."""
+    try:
+        user = authenticate(username, password)
+        if user:
+            return user["Role"], user["UserID"], None  # Return role, user ID, and no error
+        else:
+            return None, None, "Invalid username or password!"
+    except Exception as e:
+        return None, None, f"Authentication error: {e}"
+
+
+@timed
+def register_user(username, password, confirm_password):
+    """Register a new user in the database."""
+    if not username or not password:
+        return "Username and password are required!"
+
+    if password != confirm_password:
+        return "Passwords do not match!"
+
+    try:
+        with get_connection() as db:
+            cursor = db.cursor()
+            try:
+                # Check if username already exists
+                cursor.execute("SELECT * FROM Users WHERE Username = %s", (username,))
+                if cursor.fetchone():
+                    return "Username already exists!"
+
+                # Insert new user with 'customer' role by default
+                cursor.execute("""
+                    INSERT INTO Users (Username, PasswordHash, Role)
+                    VALUES (%s, %s, 'customer')
+                """, (username, hash_password(password)))
+                db.commit()
+            finally:
+                cursor.close()
+        forget_credentials()
+
+        return None  # No error means success
+
+    except Exception as e:
+        return f"Registration error: {e}"
+
+
+@timed
+def list_products(in_stock_only=False, sort_column="ProductID", descending=False, after=None,
+                  limit=100, search="", category=None, min_price=None, max_price=None):
+    """Return one page of matching products after the (sort value, ProductID) key ``after``."""
+    query = product_query(in_stock_only, search, category, min_price, max_price)
+    return query.fetch_page(sort_column, descending, after, True, limit)
+
+
+@timed
+def categories():
+    """Return every product category."""
+    return list_categories()
+
+
+@timed
+def add_product(name, category, price, stock, supplier_id=None):
+    """Insert a product and return its ID."""
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO Products (Name, Category, Price, Stock, SupplierID)
+                VALUES (%s, %s, %s, %s, %s)
+            """, (name, category, price, stock, supplier_id))
+            product_id = cursor.lastrowid
+            append_stock_events(cursor, [product_id])
+            db.commit()
+        finally:
+            cursor.close()
+    invalidate_catalog()
+    return product_id
+
+
+@timed
+def delete_product(product_id):
+    """Delete a product; returns True if it existed."""
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            cursor.execute("DELETE FROM Products WHERE ProductID = %s", (product_id,))
+            deleted = cursor.rowcount == 1
+            if deleted:
+                append_delete_event(cursor, product_id)
+            db.commit()
+        finally:
+            cursor.close()
+    invalidate_catalog()
+    return deleted
+
+
+@timed
+def set_stock(adjustments, mode="set"):
+    """Apply (product_id, value) stock changes; see update_stock_batch()."""
+    return update_stock_batch(adjustments, mode)
+
+
+def _queue_receipt(order_id, customer_id):
+    # The order stands even if queueing fails; View Receipt renders on demand.
+    try:
+        enqueue_receipt(order_id, customer_id)
+    except Exception as e:
+        print(f"Error queueing receipt for order {order_id}: {e}")
+
+
+@timed
+def place_order(customer_id, product_id, quantity):
+    """Place a single-product order and queue its receipt; returns the order ID."""
+    order_id = create_order(customer_id, product_id, quantity)
+    _queue_receipt(order_id, customer_id)
+    return order_id
+
+
+@timed
+def checkout(customer_id, items):
+    """Place a cart of (product_id, quantity) pairs as one order and queue its receipt."""
+    order_id = checkout_cart(customer_id, items)
+    _queue_receipt(order_id, customer_id)
+    return order_id
+
+
+@timed
+def past_orders(customer_id, sort_column="OrderDate", descending=True, after=None, limit=100,
+                start_date=None, end_date=None):
+    """Return one page of the customer's orders, newest first by default."""
+    query = past_orders_query(customer_id, start_date, end_date)
+    return query.fetch_page(sort_column, descending, after, True, limit)
+
+
+@timed
+def count_past_orders(customer_id, start_date=None, end_date=None):
+    """Return (count, "exact" | "estimate" | "at least") for the customer's orders."""
+    return past_orders_query(customer_id, start_date, end_date).count_estimate()
+
+
+@timed
+def customer_orders(sort_column="OrderDate", descending=True, after=None, limit=100,
+                    start_date=None, end_date=None, customer=None):
+    """Return one page of all customers' orders."""
+    query = customer_orders_query(start_date, end_date, customer)
+    return query.fetch_page(sort_column, descending, after, True, limit)
+
+
+@timed
+def count_customer_orders(start_date=None, end_date=None, customer=None):
+    """Return (count, "exact" | "estimate" | "at least") for all customers' orders."""
+    return customer_orders_query(start_date, end_date, customer).count_estimate()
+
+
+@timed
+def reorder_suggestions(supplier_id=None, sort_column="DaysOfStock", descending=False, after=None, limit=100):
+    """Return one page of products to reorder, fewest days of stock first by default."""
+    return reorder_query(supplier_id).fetch_page(sort_column, descending, after, True, limit)
+
+
+@timed
+def refresh_reorders():
+    """Update the reorder suggestions now; returns (changed, resolved) counts."""
+    return refresh_reorder_suggestions()
+
+
+@timed
+def events(after_id=0, limit=100):
+    """Return up to ``limit`` order/stock events after the EventID ``after_id``."""
+    return read_events(after_id, limit)
+
+
+@timed
+def receipt(order_id, customer_id):
+    """Return (file name, error) for an order's receipt."""
+    return generate_receipt(order_id, customer_id)
@@ -1,26 +1,121 @@
-from database.db_config import connect_to_database
+import time
+from itertools import islice
+
+from backend.catalog_cache import invalidate_catalog
+from backend.event_log import append_stock_events
+from database.db_config import get_connection
+
+# Products updated per transaction in batch mode
+STOCK_BATCH_SIZE = 1000
 
 
 def update_stock(product_id, new_stock):
     """Update stock levels for a specific product."""
     try:
-        db = connect_to_database()
-        cursor = db.cursor()
-
-        query = """
-        UPDATE Products
-        SET Stock = %s
-        WHERE ProductID = %s
-        """
-        cursor.execute(query, (new_stock, product_id))
-        db.commit()
+        with get_connection() as db:
+            cursor = db.cursor()
+            try:
+                query = """
+                UPDATE Products
+                SET Stock = %s
+                WHERE ProductID = %s
+                """
+                cursor.execute(query, (new_stock, product_id))
+                append_stock_events(cursor, [product_id])
+                db.commit()
+            finally:
+                cursor.close()
+        invalidate_catalog()
         print(f"Stock updated for Product ID {product_id}. New stock: {new_stock}.")
     except Exception as e:
         print(f"Error updating stock: {e}")
-    finally:
-        if db.is_connected():
+
+
+def _apply_stock_chunk(cursor, chunk, mode):
+    """Lock, validate and update one chunk of (product_id, value) pairs."""
+    ids = sorted({product_id for product_id, _ in chunk})
+    placeholders = ", ".join(["%s"] * len(ids))
+
+    # Lock the rows in primary-key order so concurrent batches and orders
+    # always acquire locks in the same sequence.
+    cursor.execute(
+        f"SELECT ProductID, Stock FROM Products WHERE ProductID IN ({placeholders}) "
+        f"ORDER BY ProductID FOR UPDATE",
+        ids,
+    )
+    current = {product_id: stock for product_id, stock in cursor.fetchall()}
+
+    results = []
+    for product_id, value in chunk:
+        if product_id not in current:
+            results.append({"product_id": product_id, "status": "not_found"})
+            continue
+        old_stock = current[product_id] or 0
+        new_stock = old_stock + value if mode == "delta" else value
+        if new_stock < 0:
+            results.append({"product_id": product_id, "status": "rejected",
+                            "stock": old_stock, "reason": "stock would become negative"})
+            continue
+        current[product_id] = new_stock
+        results.append({"product_id": product_id, "status": "updated",
+                        "old_stock": old_stock, "stock": new_stock})
+
+    changed = {r["product_id"]: current[r["product_id"]] for r in results if r["status"] == "updated"}
+    if changed:
+        cases = " ".join(["WHEN %s THEN %s"] * len(changed))
+        params = [item for pair in changed.items() for item in pair]
+        params.extend(changed)
+        cursor.execute(
+            f"UPDATE Products SET Stock = CASE ProductID {cases} END "
+            f"WHERE ProductID IN ({', '.join(['%s'] * len(changed))})",
+            params,
+        )
+        append_stock_events(cursor, changed)
+    return results
+
+
+def update_stock_batch(adjustments, mode="set", batch_size=STOCK_BATCH_SIZE):
+    """Apply many stock changes in chunked transactions.
+
+    ``adjustments`` is an iterable of (product_id, value) pairs, where value is
+    the new stock level (mode="set") or a signed change (mode="delta"). Each
+    chunk is locked, validated and written with a single CASE-batched UPDATE
+    and committed on its own. Returns (results, summary): one result per input
+    pair with status "updated", "not_found" or "rejected", and a summary with
+    counts and rows/sec.
+    """
+    if mode not in ("set", "delta"):
+        raise ValueError("mode must be 'set' or 'delta'")
+
+    results = []
+    started = time.perf_counter()
+    adjustments = iter(adjustments)
+
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            while True:
+                chunk = [(int(product_id), int(value)) for product_id, value in islice(adjustments, batch_size)]
+                if not chunk:
+                    break
+                results.extend(_apply_stock_chunk(cursor, chunk, mode))
+                db.commit()
+                invalidate_catalog()
+        finally:
             cursor.close()
-            db.close()
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "rows": len(results),
+        "updated": sum(1 for r in results if r["status"] == "updated"),
+        "not_found": sum(1 for r in results if r["status"] == "not_found"),
+        "rejected": sum(1 for r in results if r["status"] == "rejected"),
+        "seconds": elapsed,
+        "rows_per_second": len(results) / elapsed if elapsed else 0.0,
+    }
+    print(f"Stock batch ({mode}): {summary['updated']} updated, {summary['not_found']} not found, "
+          f"{summary['rejected']} rejected in {elapsed:.2f}s ({summary['rows_per_second']:.0f} rows/s)")
+    return results, summary
 
 
 if __name__ == "__main__":
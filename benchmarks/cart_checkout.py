@@ -0,0 +1,83 @@
+"""Compare placing a basket item by item with a single cart checkout.
+
+Run from the project root against a database created by database/setup.py:
+
+    python -m benchmarks.cart_checkout --items 20 --rounds 25
+"""
+import argparse
+import time
+
+from backend.order_service import checkout_cart, create_order
+from database.db_config import get_connection
+
+
+def _create_products(count, stock):
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            cursor.executemany("""
+                INSERT INTO Products (Name, Category, Price, Stock)
+                VALUES (%s, 'Benchmark', 1.00, %s)
+            """, [(f"Benchmark Cart SKU {i}", stock) for i in range(count)])
+            cursor.execute("SELECT ProductID FROM Products WHERE Category = 'Benchmark' ORDER BY ProductID")
+            product_ids = [row[0] for row in cursor.fetchall()][-count:]
+            cursor.execute("SELECT UserID FROM Users ORDER BY UserID LIMIT 1")
+            row = cursor.fetchone()
+            db.commit()
+        finally:
+            cursor.close()
+    if row is None:
+        raise SystemExit("Benchmark needs at least one row in Users.")
+    return product_ids, row[0]
+
+
+def _cleanup(product_ids):
+    placeholders = ", ".join(["%s"] * len(product_ids))
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            cursor.execute(f"""
+                SELECT DISTINCT OrderID FROM OrderItems WHERE ProductID IN ({placeholders})
+            """, product_ids)
+            order_ids = [row[0] for row in cursor.fetchall()]
+            cursor.execute(f"DELETE FROM Sales WHERE ProductID IN ({placeholders})", product_ids)
+            cursor.execute(f"DELETE FROM OrderItems WHERE ProductID IN ({placeholders})", product_ids)
+            if order_ids:
+                cursor.execute(f"DELETE FROM Orders WHERE OrderID IN ({', '.join(['%s'] * len(order_ids))})",
+                               order_ids)
+            cursor.execute(f"DELETE FROM Products WHERE ProductID IN ({placeholders})", product_ids)
+            db.commit()
+        finally:
+            cursor.close()
+
+
+def _time_rounds(rounds, place_basket):
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        place_basket()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return timings
+
+
+def run(items, rounds):
+    product_ids, customer_id = _create_products(items, stock=rounds * 2 + 1)
+    try:
+        per_item = _time_rounds(rounds, lambda: [create_order(customer_id, pid, 1) for pid in product_ids])
+        batched = _time_rounds(rounds, lambda: checkout_cart(customer_id, [(pid, 1) for pid in product_ids]))
+    finally:
+        _cleanup(product_ids)
+
+    for label, timings in (("Per-item orders", per_item), ("Cart checkout", batched)):
+        print(f"{label}: median {timings[len(timings) // 2] * 1000:.1f} ms per {items}-item basket, "
+              f"{rounds / sum(timings):.1f} baskets/s")
+    print(f"Speed-up: {sum(per_item) / sum(batched):.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=20, help="distinct products per basket")
+    parser.add_argument("--rounds", type=int, default=25, help="baskets placed with each method")
+    args = parser.parse_args()
+    run(args.items, args.rounds)
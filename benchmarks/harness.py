@@ -0,0 +1,326 @@
+"""Seed a database, run the hot application paths and record latency percentiles.
+
+Run from the project root:
+
+    python -m benchmarks.harness --users 200 --products 2000 --orders 20000 \\
+        --iterations 500 --concurrency 8 --output results.json
+    python -m benchmarks.harness --output new.json --compare results.json
+
+By default the run uses a throwaway SQLite database in a temporary directory,
+deleted afterwards. --sqlite-path runs against the given file instead, and
+--storage mysql against the MySQL database in database/db_config.py (created
+by database/setup.py); only then are real tables touched.
+
+Seeded rows are tagged (usernames starting with "bench_user_", products in
+the "Benchmark" category) and removed afterwards unless --keep is given,
+together with their order lines, event log entries and projected rows.
+Results are JSON: one entry per scenario with throughput and p50/p95/p99
+latency, plus the git commit and settings, so runs can be compared across
+commits; --compare exits with status 1 if a scenario got slower than the
+tolerance.
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend import analytics, services
+from backend.credentials import hash_password
+from backend.event_log import catch_up_all
+from backend.sales_report import iter_sales_report
+from database import db_config
+from database.db_config import close_pool, configure_storage, get_connection, pool_stats
+from frontend.visualizations import fetch_inventory, fetch_sales_trends
+
+USER_PREFIX = "bench_user_"
+BENCH_CATEGORY = "Benchmark"
+SEED_BATCH_SIZE = 1000
+SCENARIOS = ("place_order", "catalog_listing", "past_orders", "sales_report", "plot_data", "dashboard")
+
+
+def _executemany(cursor, query, rows):
+    for i in range(0, len(rows), SEED_BATCH_SIZE):
+        cursor.executemany(query, rows[i:i + SEED_BATCH_SIZE])
+
+
+def seed(users, products, orders, days, rng):
+    """Insert benchmark users, products, orders and sales; returns (user IDs, product IDs)."""
+    password_hash = hash_password("benchmark")  # one KDF run shared by every seeded user
+    today = datetime.date.today()
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            _executemany(cursor, "INSERT INTO Users (Username, PasswordHash, Role) VALUES (%s, %s, 'customer')",
+                         [(f"{USER_PREFIX}{i}", password_hash) for i in range(users)])
+            _executemany(cursor, """
+                INSERT INTO Products (Name, Category, Price, Stock) VALUES (%s, %s, %s, %s)
+            """, [(f"Benchmark Product {i}", BENCH_CATEGORY, round(rng.uniform(1, 500), 2), 10 ** 6)
+                  for i in range(products)])
+            db.commit()
+
+            cursor.execute("SELECT UserID FROM Users WHERE Username LIKE %s", (USER_PREFIX + "%",))
+            user_ids = [row[0] for row in cursor.fetchall()]
+            cursor.execute("SELECT ProductID FROM Products WHERE Category = %s ORDER BY ProductID",
+                           (BENCH_CATEGORY,))
+            product_ids = [row[0] for row in cursor.fetchall()]
+
+            order_rows = [(rng.choice(user_ids), rng.choice(product_ids), rng.randint(1, 5),
+                           today - datetime.timedelta(days=rng.randrange(days))) for _ in range(orders)]
+            _executemany(cursor, """
+                INSERT INTO Orders (CustomerID, ProductID, Quantity, OrderDate) VALUES (%s, %s, %s, %s)
+            """, order_rows)
+            cursor.execute("""
+                INSERT INTO OrderItems (OrderID, ProductID, Quantity, UnitPrice)
+                SELECT o.OrderID, o.ProductID, o.Quantity, p.Price
+                FROM Orders o
+                JOIN Products p ON p.ProductID = o.ProductID
+                WHERE p.Category = %s
+                  AND NOT EXISTS (SELECT 1 FROM OrderItems i WHERE i.OrderID = o.OrderID)
+            """, (BENCH_CATEGORY,))
+            _executemany(cursor, "INSERT INTO Sales (ProductID, Quantity, SaleDate) VALUES (%s, %s, %s)",
+                         [(product_id, quantity, date) for _, product_id, quantity, date in order_rows])
+            db.commit()
+        finally:
+            cursor.close()
+    return user_ids, product_ids
+
+
+def cleanup():
+    """Delete every seeded row, including orders placed during the run."""
+    # Projections must have read every benchmark event before the events go:
+    # the offsets then stay past them and nothing is replayed into real rows.
+    catch_up_all()
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            bench_orders = """
+                SELECT o.OrderID FROM Orders o JOIN Users u ON u.UserID = o.CustomerID
+                WHERE u.Username LIKE %s
+            """
+            bench_products = "SELECT ProductID FROM Products WHERE Category = %s"
+            pattern = (USER_PREFIX + "%",)
+            for query, params in (
+                (f"DELETE FROM ReceiptJobs WHERE OrderID IN ({bench_orders})", pattern),
+                (f"DELETE FROM OrderItems WHERE OrderID IN ({bench_orders})", pattern),
+                (f"DELETE FROM SalesDailySummary WHERE ProductID IN ({bench_products})", (BENCH_CATEGORY,)),
+                (f"DELETE FROM Sales WHERE ProductID IN ({bench_products})", (BENCH_CATEGORY,)),
+                (f"DELETE FROM StockLevels WHERE ProductID IN ({bench_products})", (BENCH_CATEGORY,)),
+                (f"DELETE FROM EventLog WHERE ProductID IN ({bench_products})", (BENCH_CATEGORY,)),
+            ):
+                cursor.execute(query, params)
+            cursor.execute("""
+                DELETE FROM Orders WHERE CustomerID IN (SELECT UserID FROM Users WHERE Username LIKE %s)
+            """, pattern)
+            cursor.execute("DELETE FROM Products WHERE Category = %s", (BENCH_CATEGORY,))
+            cursor.execute("DELETE FROM Users WHERE Username LIKE %s", pattern)
+            # Offsets and gaps past the remaining log would point at IDs the
+            # engine may hand out again (MySQL before 8.0 after a restart)
+            cursor.execute("SELECT COALESCE(MAX(EventID), 0) FROM EventLog")
+            head = cursor.fetchone()[0]
+            cursor.execute("UPDATE EventOffsets SET LastEventID = %s WHERE LastEventID > %s", (head, head))
+            cursor.execute("DELETE FROM EventGaps WHERE FromID > %s", (head,))
+            cursor.execute("UPDATE EventGaps SET ToID = %s WHERE ToID > %s", (head, head))
+            db.commit()
+        finally:
+            cursor.close()
+
+
+def _scenario_functions(user_ids, product_ids):
+    sort_columns = list(services.PRODUCT_COLUMNS)
+    return {
+        "place_order": lambda rng: services.place_order(rng.choice(user_ids), rng.choice(product_ids), 1),
+        "catalog_listing": lambda rng: services.list_products(True, rng.choice(sort_columns), rng.random() < 0.5),
+        "past_orders": lambda rng: services.past_orders(rng.choice(user_ids)),
+        "sales_report": lambda rng: sum(len(rows) for rows in iter_sales_report(top_n=100)),
+        "plot_data": lambda rng: (fetch_inventory(), fetch_sales_trends()),
+        "dashboard": _dashboard,
+    }
+
+
+def _dashboard(rng):
+    # Everything the analytics charts compute, from one bulk load
+    daily = analytics.load_daily_sales()
+    products = analytics.load_products()
+    return (analytics.sales_trend(daily, rng.choice(list(analytics.FREQUENCIES))),
+            analytics.category_breakdown(daily, products),
+            analytics.top_movers(daily, products))
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def run_scenario(func, iterations, concurrency, seed_value):
+    """Call func(rng) ``iterations`` times from ``concurrency`` threads; returns a result dict."""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker(worker_id, count):
+        rng = random.Random(seed_value * 1000 + worker_id)
+        local = []
+        for _ in range(count):
+            started = time.perf_counter()
+            try:
+                func(rng)
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    counts = [iterations // concurrency + (1 if i < iterations % concurrency else 0) for i in range(concurrency)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker, i, count) for i, count in enumerate(counts)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ms = [value * 1000 for value in latencies]
+    return {
+        "operations": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "seconds": round(elapsed, 4),
+        "throughput_per_s": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 0.50), 3),
+        "p95_ms": round(percentile(ms, 0.95), 3),
+        "p99_ms": round(percentile(ms, 0.99), 3),
+        "max_ms": round(ms[-1], 3) if ms else 0.0,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(current, baseline, tolerance):
+    """Print per-scenario changes against a baseline run; returns the regressed scenario names."""
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        changes = []
+        regressed = False
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if before[metric]:
+                change = (result[metric] - before[metric]) / before[metric]
+                regressed = regressed or (metric != "p99_ms" and change > tolerance)
+                changes.append(f"{metric} {change:+.1%}")
+        if before["throughput_per_s"]:
+            change = (result["throughput_per_s"] - before["throughput_per_s"]) / before["throughput_per_s"]
+            regressed = regressed or change < -tolerance
+            changes.append(f"throughput {change:+.1%}")
+        print(f"{name}: {', '.join(changes)}{'  <-- REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--days", type=int, default=365, help="spread of seeded order dates")
+    parser.add_argument("--iterations", type=int, default=500, help="operations per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="client threads per scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=42, help="random seed for data and workload")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown vs the baseline")
+    parser.add_argument("--keep", action="store_true", help="leave the seeded rows in the database")
+    parser.add_argument("--storage", choices=("mysql", "sqlite"), default="sqlite",
+                        help="storage engine; mysql uses the configured database (default: sqlite)")
+    parser.add_argument("--sqlite-path", help="SQLite database file (default: a throwaway temporary file)")
+    args = parser.parse_args(argv)
+    if args.storage == "mysql" and args.sqlite_path:
+        parser.error("--sqlite-path cannot be combined with --storage mysql")
+
+    temp_dir = None
+    if args.storage == "sqlite" and not args.sqlite_path:
+        temp_dir = tempfile.mkdtemp(prefix="ecommerce-bench-")
+        args.sqlite_path = os.path.join(temp_dir, "bench.db")
+    configure_storage(args.storage, args.sqlite_path)
+    try:
+        return _run(args)
+    finally:
+        close_pool()
+        if temp_dir and not args.keep:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        elif temp_dir:
+            print(f"Benchmark database kept in {args.sqlite_path}")
+
+
+def _run(args):
+
+    rng = random.Random(args.seed)
+    cleanup()  # rows left by an interrupted run would skew the numbers
+    started = time.perf_counter()
+    user_ids, product_ids = seed(args.users, args.products, args.orders, args.days, rng)
+    print(f"Seeded {len(user_ids)} users, {len(product_ids)} products, {args.orders} orders "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    results = {}
+    try:
+        functions = _scenario_functions(user_ids, product_ids)
+        for name in args.scenarios:
+            results[name] = run_scenario(functions[name], args.iterations, args.concurrency, args.seed)
+            r = results[name]
+            print(f"{name}: {r['throughput_per_s']:.1f} ops/s, p50 {r['p50_ms']:.2f} ms, "
+                  f"p95 {r['p95_ms']:.2f} ms, p99 {r['p99_ms']:.2f} ms, {r['errors']} errors")
+    finally:
+        if not args.keep:
+            cleanup()
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "storage": db_config.STORAGE_BACKEND,
+            "settings": {key: value for key, value in vars(args).items()
+                         if key not in ("output", "compare", "keep")},
+            "pool": pool_stats(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
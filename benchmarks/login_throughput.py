@@ -0,0 +1,52 @@
+"""Measure password checks per second at different hashing costs.
+
+No database is needed; the benchmark times the same verification
+authenticate() performs, with and without the short-lived login cache:
+
+    python -m benchmarks.login_throughput --logins 20
+    python -m benchmarks.login_throughput --scheme pbkdf2_sha256 --iterations 200000 600000
+"""
+import argparse
+import time
+
+from backend.catalog_cache import TTLCache
+from backend.credentials import (AUTH_CACHE_TTL, PBKDF2_ITERATIONS, SCRYPT_N, SCRYPT_P, SCRYPT_R,
+                                 _auth_cache_key, hash_password, verify_password)
+
+
+def _logins_per_second(logins, check):
+    started = time.perf_counter()
+    for _ in range(logins):
+        check()
+    return logins / (time.perf_counter() - started)
+
+
+def run(scheme, costs, logins):
+    password = "correct horse battery staple"
+    for cost in costs:
+        stored = hash_password(password, scheme, cost)
+        rate = _logins_per_second(logins, lambda: verify_password(password, stored))
+        label = ",".join(str(c) for c in cost)
+        print(f"{scheme} cost {label}: {rate:.1f} logins/s ({1000 / rate:.1f} ms each)")
+
+    # A repeat login within AUTH_CACHE_TTL is one HMAC and a dictionary lookup.
+    cache = TTLCache(ttl=AUTH_CACHE_TTL)
+    cache.put(_auth_cache_key("benchmark", password), {"UserID": 1})
+    rate = _logins_per_second(logins * 1000, lambda: cache.get(_auth_cache_key("benchmark", password)))
+    print(f"Cached repeat login: {rate:.0f} logins/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scheme", choices=("scrypt", "pbkdf2_sha256"), default="scrypt")
+    parser.add_argument("--n", type=int, nargs="+", default=[SCRYPT_N // 4, SCRYPT_N, SCRYPT_N * 2],
+                        help="scrypt N values to compare")
+    parser.add_argument("--iterations", type=int, nargs="+", default=[100000, PBKDF2_ITERATIONS],
+                        help="PBKDF2 iteration counts to compare")
+    parser.add_argument("--logins", type=int, default=20, help="verifications per cost setting")
+    args = parser.parse_args()
+    if args.scheme == "scrypt":
+        costs = [(n, SCRYPT_R, SCRYPT_P) for n in args.n]
+    else:
+        costs = [(iterations,) for iterations in args.iterations]
+    run(args.scheme, costs, args.logins)
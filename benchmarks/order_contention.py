@@ -0,0 +1,102 @@
+"""Benchmark concurrent buyers competing for a single hot product.
+
+Run from the project root against a database created by database/setup.py:
+
+    python -m benchmarks.order_contention --buyers 32 --orders 50 --stock 1000
+"""
+import argparse
+import threading
+import time
+
+from backend.order_service import create_order, InsufficientStockError
+from database.db_config import get_connection, pool_stats
+
+
+def _create_hot_product(stock):
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO Products (Name, Category, Price, Stock)
+                VALUES ('Benchmark Hot SKU', 'Benchmark', 1.00, %s)
+            """, (stock,))
+            product_id = cursor.lastrowid
+            cursor.execute("SELECT UserID FROM Users ORDER BY UserID LIMIT 1")
+            row = cursor.fetchone()
+            db.commit()
+        finally:
+            cursor.close()
+    if row is None:
+        raise SystemExit("Benchmark needs at least one row in Users.")
+    return product_id, row[0]
+
+
+def _cleanup(product_id):
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            cursor.execute("SELECT Stock FROM Products WHERE ProductID = %s", (product_id,))
+            final_stock = cursor.fetchone()[0]
+            cursor.execute("SELECT COALESCE(SUM(Quantity), 0) FROM Orders WHERE ProductID = %s", (product_id,))
+            ordered = int(cursor.fetchone()[0])
+            cursor.execute("DELETE FROM Sales WHERE ProductID = %s", (product_id,))
+            cursor.execute("DELETE FROM OrderItems WHERE ProductID = %s", (product_id,))
+            cursor.execute("DELETE FROM Orders WHERE ProductID = %s", (product_id,))
+            cursor.execute("DELETE FROM Products WHERE ProductID = %s", (product_id,))
+            db.commit()
+        finally:
+            cursor.close()
+    return final_stock, ordered
+
+
+def run(buyers, orders_per_buyer, stock, quantity):
+    product_id, customer_id = _create_hot_product(stock)
+    results = {"placed": 0, "rejected": 0, "errors": 0}
+    latencies = []
+    lock = threading.Lock()
+
+    def buyer():
+        for _ in range(orders_per_buyer):
+            started = time.perf_counter()
+            try:
+                create_order(customer_id, product_id, quantity)
+                outcome = "placed"
+            except InsufficientStockError:
+                outcome = "rejected"
+            except Exception:
+                outcome = "errors"
+            elapsed = time.perf_counter() - started
+            with lock:
+                results[outcome] += 1
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=buyer) for _ in range(buyers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    final_stock, ordered = _cleanup(product_id)
+    latencies.sort()
+    attempts = len(latencies)
+
+    print(f"Buyers: {buyers}, attempts: {attempts}, wall time: {wall:.2f}s")
+    print(f"Placed: {results['placed']}, rejected (no stock): {results['rejected']}, errors: {results['errors']}")
+    print(f"Throughput: {attempts / wall:.1f} attempts/s")
+    print(f"Latency p50: {latencies[attempts // 2] * 1000:.1f} ms, "
+          f"p95: {latencies[int(attempts * 0.95) - 1] * 1000:.1f} ms")
+    print(f"Final stock: {final_stock}, units ordered: {ordered}, "
+          f"consistent: {final_stock >= 0 and final_stock + ordered == stock}")
+    print(f"Pool: {pool_stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--buyers", type=int, default=16)
+    parser.add_argument("--orders", type=int, default=20, help="orders per buyer")
+    parser.add_argument("--stock", type=int, default=100, help="initial stock of the hot SKU")
+    parser.add_argument("--quantity", type=int, default=1, help="units per order")
+    args = parser.parse_args()
+    run(args.buyers, args.orders, args.stock, args.quantity)
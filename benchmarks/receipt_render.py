@@ -0,0 +1,77 @@
+"""Measure receipt rendering throughput in receipts per second.
+
+Uses synthetic orders, so no database is needed (fpdf must be installed):
+
+    python -m benchmarks.receipt_render --receipts 500 --items 5 --workers 4
+"""
+import argparse
+import datetime
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+
+from backend.receipt_service import _init_renderer, receipt_digest, render_receipts
+
+
+def _synthetic_orders(count, items):
+    today = datetime.date.today()
+    return [{
+        "OrderID": order_id,
+        "OrderDate": today,
+        "CustomerID": 1,
+        "CustomerName": "benchmark",
+        "ContentHash": None,
+        "items": [{"ProductName": f"Benchmark Product {i}", "Price": Decimal("9.99") + i, "Quantity": i + 1}
+                  for i in range(items)],
+    } for order_id in range(1, count + 1)]
+
+
+def _report(label, count, elapsed):
+    print(f"{label}: {count / elapsed:.0f} receipts/s ({elapsed * 1000 / count:.2f} ms each)")
+
+
+def run(receipts, items, workers):
+    orders = _synthetic_orders(receipts, items)
+    directory = tempfile.mkdtemp(prefix="receipts-bench-")
+    try:
+        _init_renderer()
+
+        started = time.perf_counter()
+        results = render_receipts(orders, directory)
+        _report("Template render, 1 process", receipts, time.perf_counter() - started)
+
+        shutil.rmtree(directory)
+        os.makedirs(directory)
+        chunk_size = -(-receipts // workers)
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_renderer) as pool:
+            futures = [pool.submit(render_receipts, orders[i:i + chunk_size], directory)
+                       for i in range(0, receipts, chunk_size)]
+            for future in futures:
+                future.result()
+        _report(f"Template render, {workers} processes", receipts, time.perf_counter() - started)
+
+        # Re-opening receipts whose content hash is already recorded only checks the file.
+        for order in orders:
+            order["ContentHash"] = receipt_digest(order)
+        started = time.perf_counter()
+        render_receipts(orders, directory)
+        _report("Cached (unchanged content)", receipts, time.perf_counter() - started)
+
+        errors = [error for _, _, _, error in results if error]
+        if errors:
+            print(f"{len(errors)} receipt(s) failed, e.g.: {errors[0]}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--receipts", type=int, default=500, help="receipts rendered per run")
+    parser.add_argument("--items", type=int, default=5, help="lines per receipt")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="renderer processes")
+    args = parser.parse_args()
+    run(args.receipts, args.items, args.workers)
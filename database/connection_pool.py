@@ -0,0 +1,204 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolExhaustedError(Exception):
+    """Raised when no connection becomes available before the checkout timeout."""
+
+
+def ping_connection(conn):
+    """Return True if the connection still answers the server."""
+    try:
+        conn.ping(reconnect=False)
+        return True
+    except Exception:
+        return False
+
+
+class ConnectionPool:
+    """A bounded pool of reusable database connections.
+
+    Connections are created lazily by ``factory`` up to ``max_size``. Idle
+    connections are health-checked before reuse once they have been idle for
+    ``health_check_interval`` seconds, and closed once idle for longer than
+    ``max_idle_seconds``.
+    """
+
+    def __init__(self, factory, max_size=10, max_idle_seconds=300,
+                 health_check_interval=30, checkout_timeout=10,
+                 health_check=ping_connection):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._factory = factory
+        self._health_check = health_check
+        self.max_size = max_size
+        self.max_idle_seconds = max_idle_seconds
+        self.health_check_interval = health_check_interval
+        self.checkout_timeout = checkout_timeout
+
+        self._idle = deque()  # (connection, released_at), most recent on the right
+        self._in_use = 0
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._closed = False
+
+        self._stats = {
+            "created": 0,
+            "checkouts": 0,
+            "reused": 0,
+            "discarded": 0,
+            "evicted_idle": 0,
+            "failed_health_checks": 0,
+            "timeouts": 0,
+            "total_wait_seconds": 0.0,
+        }
+
+    def acquire(self, timeout=None):
+        """Check a connection out of the pool, creating one if there is room."""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            stale = []
+            with self._available:
+                if self._closed:
+                    raise PoolExhaustedError("Connection pool is closed")
+
+                stale.extend(self._evict_idle_locked())
+                conn = None
+                idle_for = 0.0
+                if self._idle:
+                    conn, released_at = self._idle.pop()
+                    idle_for = time.monotonic() - released_at
+
+                if conn is None and self._in_use + len(self._idle) >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolExhaustedError(
+                            f"No database connection available after {timeout}s "
+                            f"(pool size {self.max_size})"
+                        )
+                    # Eviction only ever frees capacity, so nothing is stale here.
+                    self._available.wait(remaining)
+                    continue
+
+                # Reserve the slot before doing any network I/O outside the lock.
+                self._in_use += 1
+
+            self._close_quietly(stale)
+
+            if conn is not None:
+                if idle_for >= self.health_check_interval and not self._health_check(conn):
+                    with self._lock:
+                        self._stats["failed_health_checks"] += 1
+                    self._discard(conn)
+                    continue
+                self._record_checkout(started, reused=True)
+                return conn
+
+            try:
+                conn = self._factory()
+            except Exception:
+                with self._available:
+                    self._in_use -= 1
+                    self._available.notify()
+                raise
+            with self._lock:
+                self._stats["created"] += 1
+            self._record_checkout(started, reused=False)
+            return conn
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool, resetting any open transaction."""
+        if not discard:
+            try:
+                if getattr(conn, "in_transaction", True):
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        if discard:
+            self._discard(conn)
+            return
+
+        with self._available:
+            self._in_use -= 1
+            if self._closed:
+                self._close_quietly([conn])
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._available.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Context manager that checks a connection out and always returns it."""
+        conn = self.acquire(timeout)
+        broken = False
+        try:
+            yield conn
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            raise
+        finally:
+            self.release(conn, discard=broken)
+
+    def stats(self):
+        """Return a snapshot of pool counters for monitoring."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["max_size"] = self.max_size
+            snapshot["in_use"] = self._in_use
+            snapshot["idle"] = len(self._idle)
+            checkouts = snapshot["checkouts"]
+            snapshot["avg_wait_ms"] = (
+                snapshot["total_wait_seconds"] * 1000 / checkouts if checkouts else 0.0
+            )
+        return snapshot
+
+    def close_all(self):
+        """Close every idle connection and refuse further checkouts."""
+        with self._available:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._available.notify_all()
+        self._close_quietly(idle)
+
+    def _evict_idle_locked(self):
+        """Pop connections idle for longer than max_idle_seconds (lock held)."""
+        now = time.monotonic()
+        evicted = []
+        # The oldest releases sit on the left of the deque.
+        while self._idle and now - self._idle[0][1] > self.max_idle_seconds:
+            evicted.append(self._idle.popleft()[0])
+        self._stats["evicted_idle"] += len(evicted)
+        return evicted
+
+    def _record_checkout(self, started, reused):
+        with self._lock:
+            self._stats["checkouts"] += 1
+            if reused:
+                self._stats["reused"] += 1
+            self._stats["total_wait_seconds"] += time.monotonic() - started
+
+    def _discard(self, conn):
+        self._close_quietly([conn])
+        with self._available:
+            self._in_use -= 1
+            self._stats["discarded"] += 1
+            self._available.notify()
+
+    @staticmethod
+    def _close_quietly(connections):
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
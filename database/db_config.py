@@ -1,15 +1,108 @@
 # Placeholder for Python script
-import mysql.connector
+import os
+import threading
 
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "123",  # Replace with your database password
+    "database": "ecommerce_management_db",
+    "port": 3306,
+}
+
+# Storage engine: "mysql" (DB_CONFIG above) or "sqlite" (a local file, no server needed)
+STORAGE_BACKEND = os.environ.get("ECOM_STORAGE", "mysql")
+SQLITE_PATH = os.environ.get("ECOM_SQLITE_PATH", "ecommerce.db")
+
+# Connection pool settings
+POOL_SIZE = 10
+POOL_MAX_IDLE_SECONDS = 300
+POOL_HEALTH_CHECK_INTERVAL = 30
+POOL_CHECKOUT_TIMEOUT = 10
+
+_pool = None
+_pool_lock = threading.Lock()
+_storage = None
 
 
 def connect_to_database():
-    """Connect to the MySQL database."""
-    return mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="123",  # Replace with your database password
-        database="ecommerce_management_db",
-        port=3306
-    )
+    """Open an unpooled connection to the configured database."""
+    return get_storage().connect()
+
+
+def get_storage():
+    """Return the configured storage engine (see database/storage.py)."""
+    global _storage
+    if _storage is None:
+        with _pool_lock:
+            if _storage is None:
+                from database.storage import MySQLStorage, SQLiteStorage
+
+                if STORAGE_BACKEND == "sqlite":
+                    _storage = SQLiteStorage(SQLITE_PATH)
+                elif STORAGE_BACKEND == "mysql":
+                    _storage = MySQLStorage(DB_CONFIG)
+                else:
+                    raise ValueError(f"Unknown storage backend: {STORAGE_BACKEND}")
+    return _storage
+
+
+def configure_storage(backend, sqlite_path=None):
+    """Switch storage engine, closing connections pooled for the previous one."""
+    global STORAGE_BACKEND, SQLITE_PATH, _storage
+    close_pool()
+    with _pool_lock:
+        STORAGE_BACKEND = backend
+        if sqlite_path is not None:
+            SQLITE_PATH = sqlite_path
+        _storage = None
+    return get_storage()
+
+
+def _connect_pooled():
+    """Open a connection suitable for reuse from the pool."""
+    from database.query_profiler import PROFILE_QUERIES, ProfiledConnection
+
+    conn = get_storage().connect()
+    return ProfiledConnection(conn) if PROFILE_QUERIES else conn
+
+
+def get_pool():
+    """Return the shared connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                from database.connection_pool import ConnectionPool
+
+                _pool = ConnectionPool(
+                    _connect_pooled,
+                    max_size=POOL_SIZE,
+                    max_idle_seconds=POOL_MAX_IDLE_SECONDS,
+                    health_check_interval=POOL_HEALTH_CHECK_INTERVAL,
+                    checkout_timeout=POOL_CHECKOUT_TIMEOUT,
+                )
+    return _pool
+
+
+def get_connection(timeout=None):
+    """Check out a pooled connection for use in a ``with`` block.
+
+    The connection goes back to the pool when the block exits; any work that
+    was not committed is rolled back first.
+    """
+    return get_pool().connection(timeout)
+
+
+def pool_stats():
+    """Return monitoring counters for the shared connection pool."""
+    return get_pool().stats()
+
 
+def close_pool():
+    """Close all pooled connections (e.g. on application exit)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+            _pool = None
@@ -0,0 +1,385 @@
+"""Versioned schema migrations and an EXPLAIN check for the app's hot queries.
+
+Run from the project root after database/setup.py has created the tables:
+
+    python -m database.migrations            # apply pending migrations
+    python -m database.migrations explain    # flag full-table scans
+"""
+import sys
+
+from database.db_config import get_connection, get_storage
+
+
+def _index_exists(cursor, table, name):
+    return get_storage().index_exists(cursor, table, name)
+
+
+def add_index(table, name, columns, kind=""):
+    """Migration step that creates an index (``kind`` e.g. "FULLTEXT") unless it already exists."""
+    def step(cursor):
+        if _index_exists(cursor, table, name):
+            print(f"  {table}.{name} already exists, skipping.")
+            return
+        cursor.execute(f"CREATE {kind + ' ' if kind else ''}INDEX {name} ON {table} ({columns})")
+        print(f"  Created {table}.{name} ({columns}).")
+    return step
+
+
+def _column_exists(cursor, table, name):
+    return get_storage().column_exists(cursor, table, name)
+
+
+def add_column(table, name, definition):
+    """Migration step that adds a column unless it already exists."""
+    def step(cursor):
+        if _column_exists(cursor, table, name):
+            print(f"  {table}.{name} already exists, skipping.")
+            return
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+        print(f"  Added {table}.{name} {definition}.")
+    return step
+
+
+def rename_column(table, old, new, definition):
+    """Migration step that renames a column unless that was already done."""
+    def step(cursor):
+        if not _column_exists(cursor, table, old):
+            print(f"  {table}.{old} not found, skipping.")
+            return
+        cursor.execute(get_storage().rename_column_sql(table, old, new, definition))
+        print(f"  Renamed {table}.{old} to {new}.")
+    return step
+
+
+# Starts the event log from the existing data: past order lines first, then
+# every product's current stock as its opening level (that stock already
+# reflects those orders). Sales rows are then projected from the logged
+# orders, so the summary, which read OrderItems directly, is rebuilt from Sales.
+EVENT_LOG_SEED = [
+    """
+    INSERT INTO EventLog (EventType, OrderID, ProductID, Quantity, UnitPrice, EventDate)
+    SELECT 'order_line', i.OrderID, i.ProductID, i.Quantity, i.UnitPrice, COALESCE(o.OrderDate, CURDATE())
+    FROM OrderItems i
+    JOIN Orders o ON o.OrderID = i.OrderID
+    WHERE NOT EXISTS (SELECT 1 FROM EventLog)
+    ORDER BY i.OrderItemID
+    """,
+    """
+    INSERT INTO EventLog (EventType, ProductID, Stock, EventDate)
+    SELECT 'stock_set', ProductID, COALESCE(Stock, 0), CURDATE()
+    FROM Products
+    WHERE NOT EXISTS (SELECT 1 FROM EventLog WHERE EventType = 'stock_set')
+    ORDER BY ProductID
+    """,
+    "DELETE FROM SalesDailySummary",
+    "DELETE FROM SalesSummaryWatermarks",
+]
+
+# (version, description, steps). Append new migrations; never edit applied ones.
+MIGRATIONS = [
+    (1, "Index hot query paths", [
+        # view_products / place_order: WHERE Stock > 0
+        add_index("Products", "idx_products_stock", "Stock"),
+        # view_past_orders / generate_receipt: WHERE CustomerID = ? ORDER BY OrderDate DESC
+        add_index("Orders", "idx_orders_customer_date", "CustomerID, OrderDate, OrderID"),
+        # view_customer_orders: ORDER BY OrderDate DESC
+        add_index("Orders", "idx_orders_date", "OrderDate, OrderID"),
+        # plot_sales_trends: GROUP BY SaleDate with SUM(Quantity), answered from the index
+        add_index("Sales", "idx_sales_date_qty", "SaleDate, Quantity"),
+    ]),
+    (2, "Add OrderItems for multi-line orders", [
+        """
+        CREATE TABLE IF NOT EXISTS OrderItems (
+            OrderItemID INT PRIMARY KEY AUTO_INCREMENT,
+            OrderID INT NOT NULL,
+            ProductID INT NOT NULL,
+            Quantity INT NOT NULL,
+            UnitPrice DECIMAL(10, 2),
+            FOREIGN KEY (OrderID) REFERENCES Orders(OrderID),
+            FOREIGN KEY (ProductID) REFERENCES Products(ProductID)
+        )
+        """,
+        # Every existing order becomes a single-line order.
+        """
+        INSERT INTO OrderItems (OrderID, ProductID, Quantity, UnitPrice)
+        SELECT o.OrderID, o.ProductID, o.Quantity, p.Price
+        FROM Orders o
+        JOIN Products p ON o.ProductID = p.ProductID
+        WHERE NOT EXISTS (SELECT 1 FROM OrderItems i WHERE i.OrderID = o.OrderID)
+        """,
+        # The sales summary now reads order lines instead of Orders; clearing it
+        # makes the next refresh rebuild it from the new sources.
+        "DELETE FROM SalesDailySummary",
+        "DELETE FROM SalesSummaryWatermarks",
+    ]),
+    (3, "Add ReceiptJobs queue for background receipt rendering", [
+        """
+        CREATE TABLE IF NOT EXISTS ReceiptJobs (
+            OrderID INT PRIMARY KEY,
+            CustomerID INT NOT NULL,
+            Status ENUM('pending', 'rendering', 'done', 'failed') NOT NULL DEFAULT 'pending',
+            Attempts INT NOT NULL DEFAULT 0,
+            ClaimToken CHAR(32),
+            Error VARCHAR(255),
+            CreatedAt DATETIME NOT NULL,
+            UpdatedAt DATETIME NOT NULL,
+            KEY idx_receipt_jobs_status (Status, OrderID),
+            KEY idx_receipt_jobs_claim (ClaimToken),
+            FOREIGN KEY (OrderID) REFERENCES Orders(OrderID)
+        )
+        """,
+    ]),
+    (4, "Store receipt content hashes", [
+        # Hash of the rendered content; unchanged receipts are served from disk
+        add_column("ReceiptJobs", "ContentHash", "CHAR(64) AFTER Error"),
+    ]),
+    (5, "Store password hashes in Users.PasswordHash", [
+        # Existing plaintext values are rehashed by backend/credentials.py on the next login
+        rename_column("Users", "Password", "PasswordHash", "VARCHAR(255) NOT NULL"),
+    ]),
+    (6, "Index product search and catalog filters", [
+        # Search-as-you-type: whole-word prefixes through FULLTEXT, short prefixes through Name
+        add_index("Products", "idx_products_search", "Name, Category", kind="FULLTEXT"),
+        add_index("Products", "idx_products_name", "Name"),
+        # Category filter in ProductID order, with a price range, and price range alone
+        add_index("Products", "idx_products_category", "Category"),
+        add_index("Products", "idx_products_category_price", "Category, Price"),
+        add_index("Products", "idx_products_price", "Price"),
+    ]),
+    (7, "Cover order totals in the paged order history", [
+        # Order history pages seek on idx_orders_customer_date / idx_orders_date;
+        # each row's total is then summed from this index alone.
+        add_index("OrderItems", "idx_order_items_totals", "OrderID, Quantity, UnitPrice"),
+    ]),
+    (8, "Link products to suppliers and add reorder suggestions", [
+        add_column("Suppliers", "LeadTimeDays", "INT NOT NULL DEFAULT 7"),
+        add_column("Products", "SupplierID", "INT NULL"),
+        # Set by MySQL on every change; the reorder engine re-reads only rows changed since its last run
+        add_column("Products", "UpdatedAt",
+                   "DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        add_index("Products", "idx_products_updated", "UpdatedAt"),
+        # Units sold per product over the velocity window, from the index alone
+        add_index("SalesDailySummary", "idx_summary_product_date", "ProductID, SummaryDate, Quantity"),
+        """
+        CREATE TABLE IF NOT EXISTS ReorderSuggestions (
+            ProductID INT PRIMARY KEY,
+            SupplierID INT NULL,
+            Stock INT NOT NULL,
+            DailyVelocity DECIMAL(12, 3) NOT NULL,
+            DaysOfStock DECIMAL(12, 2) NULL,
+            Quantity INT NOT NULL,
+            UpdatedAt DATETIME NOT NULL,
+            KEY idx_reorder_supplier (SupplierID, DaysOfStock),
+            KEY idx_reorder_days (DaysOfStock, ProductID)
+        )
+        """,
+    ]),
+    (9, "Add the order/stock event log and its projections", [
+        # Append-only; no foreign keys, events outlive the products they mention
+        """
+        CREATE TABLE IF NOT EXISTS EventLog (
+            EventID BIGINT PRIMARY KEY AUTO_INCREMENT,
+            EventType VARCHAR(32) NOT NULL,
+            OrderID INT NULL,
+            ProductID INT NULL,
+            Quantity INT NULL,
+            UnitPrice DECIMAL(10, 2) NULL,
+            Stock INT NULL,
+            EventDate DATE NOT NULL,
+            CreatedAt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS EventOffsets (
+            Consumer VARCHAR(32) PRIMARY KEY,
+            LastEventID BIGINT NOT NULL DEFAULT 0
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS StockLevels (
+            ProductID INT PRIMARY KEY,
+            Stock INT NOT NULL
+        )
+        """,
+        # Sales rows projected from orders carry their OrderID; recorded sales have none
+        add_column("Sales", "OrderID", "INT NULL"),
+        add_index("Sales", "idx_sales_order", "OrderID"),
+        *EVENT_LOG_SEED,
+    ]),
+    (10, "Track event ID gaps skipped by projections", [
+        """
+        CREATE TABLE IF NOT EXISTS EventGaps (
+            Consumer VARCHAR(32) NOT NULL,
+            FromID BIGINT NOT NULL,
+            ToID BIGINT NOT NULL,
+            SeenAt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (Consumer, FromID)
+        )
+        """,
+    ]),
+]
+
+# Queries the application runs on every screen, with representative parameters.
+KNOWN_QUERIES = {
+    "login": (
+        "SELECT UserID, Username, PasswordHash, Role FROM Users WHERE Username = %s", ("admin",)),
+    "products_in_stock": (
+        "SELECT ProductID, Name, Category, Price, Stock FROM Products WHERE Stock > 0", ()),
+    "products_by_category": ("""
+        SELECT ProductID, Name, Category, Price, Stock FROM Products
+        WHERE Category = %s AND Price BETWEEN %s AND %s
+    """, ("Electronics", 10, 1000)),
+    "past_orders": ("""
+        SELECT o.OrderID, o.OrderDate, COALESCE(p.Name, 'Multiple items') AS ProductName, o.Quantity,
+               (SELECT COALESCE(SUM(i.Quantity * i.UnitPrice), 0) FROM OrderItems i
+                WHERE i.OrderID = o.OrderID) AS Total
+        FROM Orders o
+        LEFT JOIN Products p ON o.ProductID = p.ProductID
+        WHERE o.CustomerID = %s
+          AND o.OrderDate <= %s AND (o.OrderDate < %s OR o.OrderID < %s)
+        ORDER BY o.OrderDate DESC, o.OrderID DESC
+        LIMIT 100
+    """, (1, "2030-01-01", "2030-01-01", 10 ** 9)),
+    "receipt": ("""
+        SELECT p.Name AS ProductName, i.UnitPrice AS Price, i.Quantity
+        FROM OrderItems i
+        JOIN Orders o ON o.OrderID = i.OrderID
+        JOIN Products p ON i.ProductID = p.ProductID
+        WHERE i.OrderID = %s AND o.CustomerID = %s
+    """, (1, 1)),
+    "customer_orders": ("""
+        SELECT o.OrderID, u.Username AS CustomerName, COALESCE(p.Name, 'Multiple items') AS ProductName,
+               o.Quantity, o.OrderDate
+        FROM Orders o
+        JOIN Users u ON o.CustomerID = u.UserID
+        LEFT JOIN Products p ON o.ProductID = p.ProductID
+        WHERE o.OrderDate >= %s AND o.OrderDate <= %s
+        ORDER BY o.OrderDate DESC, o.OrderID DESC
+        LIMIT 100
+    """, ("2024-01-01", "2024-12-31")),
+    "customer_orders_by_customer": ("""
+        SELECT o.OrderID, u.Username AS CustomerName, COALESCE(p.Name, 'Multiple items') AS ProductName,
+               o.Quantity, o.OrderDate
+        FROM Orders o
+        JOIN Users u ON o.CustomerID = u.UserID
+        LEFT JOIN Products p ON o.ProductID = p.ProductID
+        WHERE u.Username = %s
+        ORDER BY o.OrderDate DESC, o.OrderID DESC
+        LIMIT 100
+    """, ("admin",)),
+    "reorder_touched": (
+        "SELECT ProductID FROM Products WHERE UpdatedAt >= NOW() - INTERVAL %s SECOND", (60,)),
+    "events_after": ("""
+        SELECT EventID, CreatedAt >= NOW() - INTERVAL %s SECOND
+        FROM EventLog
+        WHERE EventID > %s
+        ORDER BY EventID
+        LIMIT %s
+    """, (30, 0, 5000)),
+    "events_next": (
+        "SELECT EventID FROM EventLog WHERE EventID > %s ORDER BY EventID LIMIT %s", (0, 5000)),
+    "event_gaps_filled": ("""
+        SELECT g.FromID, g.ToID, g.SeenAt, e.EventID
+        FROM EventGaps g
+        JOIN EventLog e ON e.EventID >= g.FromID AND e.EventID <= g.ToID
+        WHERE g.Consumer = %s
+        ORDER BY e.EventID
+    """, ("sales",)),
+    "sales_trends": ("""
+        SELECT SaleDate, SUM(Quantity) AS TotalSales
+        FROM Sales
+        GROUP BY SaleDate
+        ORDER BY SaleDate
+    """, ()),
+}
+
+
+def _ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS SchemaMigrations (
+            Version INT PRIMARY KEY,
+            Description VARCHAR(255) NOT NULL,
+            AppliedAt DATETIME NOT NULL
+        )
+    """)
+
+
+def applied_versions():
+    """Return the set of migration versions already applied."""
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            _ensure_migrations_table(cursor)
+            cursor.execute("SELECT Version FROM SchemaMigrations")
+            return {row[0] for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+
+def migrate():
+    """Apply every pending migration in version order.
+
+    MySQL commits DDL implicitly, so each step checks for itself whether its
+    change is already present; re-running after a partial failure is safe.
+    """
+    done = applied_versions()
+    pending = [m for m in sorted(MIGRATIONS, key=lambda m: m[0]) if m[0] not in done]
+    if not pending:
+        print("Schema is up to date.")
+        return []
+
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            for version, description, steps in pending:
+                print(f"Applying migration {version}: {description}")
+                for step in steps:
+                    if callable(step):
+                        step(cursor)
+                    else:
+                        cursor.execute(step)
+                cursor.execute(
+                    "INSERT INTO SchemaMigrations (Version, Description, AppliedAt) VALUES (%s, %s, NOW())",
+                    (version, description),
+                )
+                db.commit()
+        finally:
+            cursor.close()
+    return [version for version, _, _ in pending]
+
+
+def explain_known_queries(queries=None):
+    """EXPLAIN each known query and return the plans that scan a whole table.
+
+    Returns a list of (query name, table, estimated rows) for every plan row
+    with access type ALL (MySQL) or a SCAN without an index (SQLite, which
+    gives no row estimate). Small tables may legitimately be scanned; run this
+    against realistically sized data.
+    """
+    queries = KNOWN_QUERIES if queries is None else queries
+    storage = get_storage()
+    flagged = []
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            for name, (query, params) in queries.items():
+                for table, rows, full_scan in storage.explain(cursor, query, params):
+                    if full_scan:
+                        flagged.append((name, table, rows))
+        finally:
+            cursor.close()
+
+    if flagged:
+        for name, table, rows in flagged:
+            estimate = f" (~{rows} rows)" if rows is not None else ""
+            print(f"Full table scan: {name} reads {table}{estimate}")
+    else:
+        print("No full table scans in known queries.")
+    return flagged
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "explain":
+        explain_known_queries()
+    else:
+        migrate()
@@ -0,0 +1,309 @@
+"""Per-statement timing for every pooled connection, with a slow-query log.
+
+db_config wraps each pooled connection in ProfiledConnection, whose cursors
+time execute()/executemany(), count the rows fetched and note the calling
+line outside the database package. Statements are aggregated by their SQL
+text into a latency histogram. Statements slower than SLOW_QUERY_MS are
+written to logs/app.log (in the project directory, wherever the process
+was started from) together with their EXPLAIN plan (once per statement, from
+a separate connection so the caller's results are not disturbed).
+
+The report (busiest statements first) can be shown from the admin dashboard,
+written to the log on exit with ECOM_PROFILE_REPORT_ON_EXIT=1, or printed with:
+
+    python -m database.query_profiler
+"""
+import atexit
+import bisect
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+PROFILE_QUERIES = os.environ.get("ECOM_PROFILE_QUERIES", "1") != "0"
+SLOW_QUERY_MS = float(os.environ.get("ECOM_SLOW_QUERY_MS", 100))
+REPORT_ON_EXIT = os.environ.get("ECOM_PROFILE_REPORT_ON_EXIT", "0") == "1"
+LOG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs", "app.log")
+STATEMENT_CHARS = 300  # statements are grouped by their first characters, whitespace collapsed
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_INTERNAL_FILES = ("query_profiler.py", "db_config.py", "connection_pool.py", "storage.py", "contextlib.py")
+
+_stats = {}
+_stats_lock = threading.Lock()
+_explained = set()
+_explainer = None
+_logger = None
+
+
+def get_logger():
+    """Return the application logger, writing to logs/app.log."""
+    global _logger
+    if _logger is None:
+        logger = logging.getLogger("ecommerce")
+        if not logger.handlers:
+            os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+            handler = logging.FileHandler(LOG_PATH, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+        _logger = logger
+    return _logger
+
+
+def normalize_sql(sql):
+    """Collapse whitespace so the same statement groups under one key."""
+    return re.sub(r"\s+", " ", sql).strip()[:STATEMENT_CHARS]
+
+
+def _call_site():
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename.endswith(_INTERNAL_FILES):
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    path = os.path.relpath(frame.f_code.co_filename)
+    return f"{path}:{frame.f_lineno} {frame.f_code.co_name}"
+
+
+def _record(key, elapsed_ms, rows, site):
+    with _stats_lock:
+        entry = _stats.get(key)
+        if entry is None:
+            entry = _stats[key] = {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                                   "histogram": [0] * (len(HISTOGRAM_BOUNDS_MS) + 1), "sites": Counter()}
+        if elapsed_ms is None:
+            entry["errors"] += 1
+        else:
+            entry["calls"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["histogram"][bisect.bisect_left(HISTOGRAM_BOUNDS_MS, elapsed_ms)] += 1
+        entry["rows"] += rows
+        entry["sites"][site] += 1
+
+
+def _add_rows(key, rows):
+    with _stats_lock:
+        if key in _stats:
+            _stats[key]["rows"] += rows
+
+
+def _explain(sql, params, note=""):
+    """Log the plan of a slow statement; runs on the explainer thread."""
+    from database.db_config import connect_to_database, get_storage
+
+    try:
+        conn = connect_to_database()
+        try:
+            cursor = conn.cursor()
+            try:
+                plan = get_storage().explain(cursor, sql, params)
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
+        lines = [f"  {table}: {'full scan' if full_scan else 'indexed'}"
+                 + (f", ~{rows} rows" if rows is not None else "") for table, rows, full_scan in plan]
+        get_logger().info("Plan for slow statement %s%s\n%s", normalize_sql(sql), note, "\n".join(lines))
+    except Exception as e:
+        get_logger().warning("Could not EXPLAIN %s: %s", normalize_sql(sql), e)
+
+
+def _slow_statement(key, sql, params, elapsed_ms, rows, site, batch=False):
+    global _explainer
+    get_logger().warning("Slow query %.1f ms, %s rows, at %s: %s", elapsed_ms, rows, site, key)
+    if not key.upper().startswith(("SELECT", "UPDATE", "DELETE", "INSERT")):
+        return
+    note = ""
+    if batch:
+        # EXPLAIN takes one set of parameters; the first stands in for the batch
+        if not params:
+            return
+        note = f" (executemany, plan for the first of {len(params)} parameter sets)"
+        params = params[0]
+    with _stats_lock:
+        if key in _explained:
+            return
+        _explained.add(key)
+        if _explainer is None:
+            _explainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-explain")
+    _explainer.submit(_explain, sql, params, note)
+
+
+class ProfiledCursor:
+    """Times statements run through a database cursor; everything else is passed through."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._key = None
+
+    def _run(self, method, sql, params, batch=False):
+        site = _call_site()
+        key = normalize_sql(sql)
+        self._key = key
+        started = time.perf_counter()
+        try:
+            result = method(sql, params)
+        except Exception:
+            _record(key, None, 0, site)
+            raise
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        # Writes report affected rows now; reads add their rows as they are fetched.
+        is_write = not key.upper().startswith(("SELECT", "WITH", "SHOW", "EXPLAIN", "PRAGMA"))
+        rows = max(self._cursor.rowcount, 0) if is_write else 0
+        _record(key, elapsed_ms, rows, site)
+        if elapsed_ms >= SLOW_QUERY_MS:
+            _slow_statement(key, sql, params, elapsed_ms, rows if is_write else "?", site, batch)
+        return result
+
+    def execute(self, sql, params=()):
+        return self._run(self._cursor.execute, sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        if not isinstance(seq_of_params, (list, tuple)):
+            seq_of_params = list(seq_of_params)  # kept for EXPLAIN if the batch is slow
+        return self._run(self._cursor.executemany, sql, seq_of_params, batch=True)
+
+    def _fetched(self, rows):
+        if self._key is not None:
+            _add_rows(self._key, rows)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        self._fetched(row is not None)
+        return row
+
+    def fetchmany(self, size=1):
+        rows = self._cursor.fetchmany(size)
+        self._fetched(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._fetched(len(rows))
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._fetched(1)
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class ProfiledConnection:
+    """Connection wrapper whose cursors are ProfiledCursors."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *args, **kwargs):
+        return ProfiledCursor(self._conn.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def _percentile(histogram, fraction, max_ms):
+    """Upper bound (ms) of the bucket holding the given fraction of calls."""
+    total = sum(histogram)
+    if not total:
+        return 0.0
+    seen = 0
+    for i, count in enumerate(histogram):
+        seen += count
+        if seen >= fraction * total:
+            return HISTOGRAM_BOUNDS_MS[i] if i < len(HISTOGRAM_BOUNDS_MS) else round(max_ms, 3)
+    return round(max_ms, 3)
+
+
+def query_profile():
+    """Return one dict per statement, most total time first."""
+    with _stats_lock:
+        snapshot = [(key, dict(entry, histogram=list(entry["histogram"]), sites=Counter(entry["sites"])))
+                    for key, entry in _stats.items()]
+    profile = []
+    for key, entry in snapshot:
+        calls = entry["calls"]
+        profile.append({
+            "statement": key,
+            "calls": calls,
+            "errors": entry["errors"],
+            "total_ms": round(entry["total_ms"], 3),
+            "mean_ms": round(entry["total_ms"] / calls, 3) if calls else 0.0,
+            "p50_ms": _percentile(entry["histogram"], 0.50, entry["max_ms"]),
+            "p95_ms": _percentile(entry["histogram"], 0.95, entry["max_ms"]),
+            "max_ms": round(entry["max_ms"], 3),
+            "rows": entry["rows"],
+            "histogram": dict(zip([f"<={b}ms" for b in HISTOGRAM_BOUNDS_MS] + ["more"], entry["histogram"])),
+            "call_sites": entry["sites"].most_common(3),
+        })
+    profile.sort(key=lambda p: p["total_ms"], reverse=True)
+    return profile
+
+
+def format_profile(limit=20):
+    """Return the profile of the ``limit`` busiest statements as text."""
+    profile = query_profile()
+    if not profile:
+        return "No queries recorded."
+    lines = [f"Query profile: {len(profile)} statements, "
+             f"{sum(p['calls'] for p in profile)} calls, {sum(p['total_ms'] for p in profile):.1f} ms total"]
+    for p in profile[:limit]:
+        lines.append("")
+        lines.append(p["statement"])
+        lines.append(f"  {p['calls']} calls, {p['errors']} errors, {p['total_ms']:.1f} ms total, "
+                     f"mean {p['mean_ms']:.2f} ms, p50 <={p['p50_ms']} ms, p95 <={p['p95_ms']} ms, "
+                     f"max {p['max_ms']:.1f} ms, {p['rows']} rows")
+        for site, count in p["call_sites"]:
+            lines.append(f"  {count} x {site}")
+    return "\n".join(lines)
+
+
+def dump_profile(limit=20):
+    """Write the profile report to logs/app.log and return it."""
+    report = format_profile(limit)
+    get_logger().info("%s", report)
+    return report
+
+
+def reset_profile():
+    """Forget all recorded statements."""
+    with _stats_lock:
+        _stats.clear()
+        _explained.clear()
+
+
+@atexit.register
+def _report_on_exit():
+    if REPORT_ON_EXIT and _stats:
+        try:
+            dump_profile()
+        except Exception as e:
+            print(f"Error writing query profile: {e}")
+
+
+if __name__ == "__main__":
+    # Profile a pass over the known hot queries. The pool records into the
+    # imported module, not this __main__ copy.
+    from database import query_profiler
+    from database.db_config import get_connection
+    from database.migrations import KNOWN_QUERIES
+
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            for query, params in KNOWN_QUERIES.values():
+                cursor.execute(query, params)
+                cursor.fetchall()
+        finally:
+            cursor.close()
+    print(query_profiler.format_profile())
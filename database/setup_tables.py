@@ -65,6 +65,60 @@ def create_tables():
         """
         cursor.execute(orders_table)
 
+        # Order lines; Orders.ProductID is only set for single-line orders
+        order_items_table = """
+        CREATE TABLE IF NOT EXISTS OrderItems (
+            OrderItemID INT PRIMARY KEY AUTO_INCREMENT,
+            OrderID INT NOT NULL,
+            ProductID INT NOT NULL,
+            Quantity INT NOT NULL,
+            UnitPrice DECIMAL(10, 2),
+            FOREIGN KEY (OrderID) REFERENCES Orders(OrderID),
+            FOREIGN KEY (ProductID) REFERENCES Products(ProductID)
+        );
+        """
+        cursor.execute(order_items_table)
+
+        # Daily sales summary maintained by backend/sales_report.py
+        sales_summary_table = """
+        CREATE TABLE IF NOT EXISTS SalesDailySummary (
+            SummaryDate DATE NOT NULL,
+            ProductID INT NOT NULL,
+            Quantity INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (SummaryDate, ProductID),
+            KEY idx_summary_product (ProductID)
+        );
+        """
+        cursor.execute(sales_summary_table)
+
+        # Highest Sales/Orders row already folded into SalesDailySummary
+        summary_watermarks_table = """
+        CREATE TABLE IF NOT EXISTS SalesSummaryWatermarks (
+            Source VARCHAR(32) PRIMARY KEY,
+            LastID INT NOT NULL DEFAULT 0
+        );
+        """
+        cursor.execute(summary_watermarks_table)
+
+        # Receipt rendering queue drained by backend/receipt_service.py
+        receipt_jobs_table = """
+        CREATE TABLE IF NOT EXISTS ReceiptJobs (
+            OrderID INT PRIMARY KEY,
+            CustomerID INT NOT NULL,
+            Status ENUM('pending', 'rendering', 'done', 'failed') NOT NULL DEFAULT 'pending',
+            Attempts INT NOT NULL DEFAULT 0,
+            ClaimToken CHAR(32),
+            Error VARCHAR(255),
+            ContentHash CHAR(64),
+            CreatedAt DATETIME NOT NULL,
+            UpdatedAt DATETIME NOT NULL,
+            KEY idx_receipt_jobs_status (Status, OrderID),
+            KEY idx_receipt_jobs_claim (ClaimToken),
+            FOREIGN KEY (OrderID) REFERENCES Orders(OrderID)
+        );
+        """
+        cursor.execute(receipt_jobs_table)
+
         db.commit()
         print("Tables created successfully!")
     except mysql.connector.Error as err:
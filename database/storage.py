@@ -0,0 +1,563 @@
+"""Storage engines behind database/db_config.py.
+
+The application writes MySQL-flavoured SQL with %s placeholders. MySQLStorage
+passes it straight to mysql.connector; SQLiteStorage runs the same statements
+against an embedded SQLite file (WAL mode) by translating the few MySQL-only
+constructs the code uses, so the GUI, scripts and benchmarks can run without
+a database server. Select the engine in db_config.py or with the
+ECOM_STORAGE / ECOM_SQLITE_PATH environment variables.
+
+    python -m database.storage init [--sample]   # create the SQLite schema
+"""
+import datetime
+import decimal
+import re
+import sqlite3
+import sys
+import threading
+from functools import lru_cache
+
+# MySQL error codes that mean "try the whole transaction again"
+ER_LOCK_WAIT_TIMEOUT = 1205
+ER_LOCK_DEADLOCK = 1213
+
+# innodb_ft_min_token_size: shorter words are not in the FULLTEXT index
+FULLTEXT_MIN_WORD = 3
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",  # readers never block the writer
+    "synchronous": "NORMAL",  # fsync at checkpoints only; safe with WAL
+    "foreign_keys": "ON",
+    "busy_timeout": 5000,  # ms to wait for the write lock before "database is locked"
+    "cache_size": -65536,  # 64 MB page cache per connection
+    "temp_store": "MEMORY",
+    "mmap_size": 268435456,
+}
+
+# Current schema for a fresh SQLite database, equivalent to database/setup.py
+# plus every migration in database/migrations.py.
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS Products (
+    ProductID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Name VARCHAR(255) NOT NULL,
+    Category VARCHAR(100),
+    Price DECIMAL(10, 2),
+    Stock INT,
+    SupplierID INT REFERENCES Suppliers(SupplierID),
+    UpdatedAt DATETIME
+);
+CREATE INDEX IF NOT EXISTS idx_products_stock ON Products (Stock);
+CREATE INDEX IF NOT EXISTS idx_products_name ON Products (Name);
+CREATE INDEX IF NOT EXISTS idx_products_category ON Products (Category);
+CREATE INDEX IF NOT EXISTS idx_products_category_price ON Products (Category, Price);
+CREATE INDEX IF NOT EXISTS idx_products_price ON Products (Price);
+CREATE INDEX IF NOT EXISTS idx_products_updated ON Products (UpdatedAt);
+
+-- MySQL maintains UpdatedAt with ON UPDATE CURRENT_TIMESTAMP; SQLite needs triggers
+CREATE TRIGGER IF NOT EXISTS products_touch_insert AFTER INSERT ON Products BEGIN
+    UPDATE Products SET UpdatedAt = datetime('now', 'localtime') WHERE ProductID = new.ProductID;
+END;
+CREATE TRIGGER IF NOT EXISTS products_touch_update
+AFTER UPDATE OF Name, Category, Price, Stock, SupplierID ON Products BEGIN
+    UPDATE Products SET UpdatedAt = datetime('now', 'localtime') WHERE ProductID = new.ProductID;
+END;
+
+-- Full-text index over Name/Category, kept in step with Products by triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS ProductSearch USING fts5(
+    Name, Category, content='Products', content_rowid='ProductID', prefix='1 2 3'
+);
+CREATE TRIGGER IF NOT EXISTS products_search_insert AFTER INSERT ON Products BEGIN
+    INSERT INTO ProductSearch (rowid, Name, Category) VALUES (new.ProductID, new.Name, new.Category);
+END;
+CREATE TRIGGER IF NOT EXISTS products_search_delete AFTER DELETE ON Products BEGIN
+    INSERT INTO ProductSearch (ProductSearch, rowid, Name, Category)
+    VALUES ('delete', old.ProductID, old.Name, old.Category);
+END;
+CREATE TRIGGER IF NOT EXISTS products_search_update AFTER UPDATE OF Name, Category ON Products BEGIN
+    INSERT INTO ProductSearch (ProductSearch, rowid, Name, Category)
+    VALUES ('delete', old.ProductID, old.Name, old.Category);
+    INSERT INTO ProductSearch (rowid, Name, Category) VALUES (new.ProductID, new.Name, new.Category);
+END;
+
+CREATE TABLE IF NOT EXISTS Sales (
+    SaleID INTEGER PRIMARY KEY AUTOINCREMENT,
+    ProductID INT REFERENCES Products(ProductID),
+    Quantity INT,
+    SaleDate DATE,
+    OrderID INT
+);
+CREATE INDEX IF NOT EXISTS idx_sales_date_qty ON Sales (SaleDate, Quantity);
+CREATE INDEX IF NOT EXISTS idx_sales_product ON Sales (ProductID);
+CREATE INDEX IF NOT EXISTS idx_sales_order ON Sales (OrderID);
+
+CREATE TABLE IF NOT EXISTS Suppliers (
+    SupplierID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Name VARCHAR(255),
+    ContactInfo VARCHAR(255),
+    LeadTimeDays INT NOT NULL DEFAULT 7
+);
+
+CREATE TABLE IF NOT EXISTS Users (
+    UserID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Username VARCHAR(50) UNIQUE NOT NULL,
+    PasswordHash VARCHAR(255) NOT NULL,
+    Role TEXT NOT NULL CHECK (Role IN ('admin', 'customer'))
+);
+
+CREATE TABLE IF NOT EXISTS Orders (
+    OrderID INTEGER PRIMARY KEY AUTOINCREMENT,
+    CustomerID INT REFERENCES Users(UserID),
+    ProductID INT REFERENCES Products(ProductID),
+    Quantity INT,
+    OrderDate DATE
+);
+CREATE INDEX IF NOT EXISTS idx_orders_customer_date ON Orders (CustomerID, OrderDate, OrderID);
+CREATE INDEX IF NOT EXISTS idx_orders_date ON Orders (OrderDate, OrderID);
+CREATE INDEX IF NOT EXISTS idx_orders_product ON Orders (ProductID);
+
+CREATE TABLE IF NOT EXISTS OrderItems (
+    OrderItemID INTEGER PRIMARY KEY AUTOINCREMENT,
+    OrderID INT NOT NULL REFERENCES Orders(OrderID),
+    ProductID INT NOT NULL REFERENCES Products(ProductID),
+    Quantity INT NOT NULL,
+    UnitPrice DECIMAL(10, 2)
+);
+CREATE INDEX IF NOT EXISTS idx_order_items_order ON OrderItems (OrderID);
+CREATE INDEX IF NOT EXISTS idx_order_items_product ON OrderItems (ProductID);
+CREATE INDEX IF NOT EXISTS idx_order_items_totals ON OrderItems (OrderID, Quantity, UnitPrice);
+
+CREATE TABLE IF NOT EXISTS SalesDailySummary (
+    SummaryDate DATE NOT NULL,
+    ProductID INT NOT NULL,
+    Quantity INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (SummaryDate, ProductID)
+);
+CREATE INDEX IF NOT EXISTS idx_summary_product ON SalesDailySummary (ProductID);
+CREATE INDEX IF NOT EXISTS idx_summary_product_date ON SalesDailySummary (ProductID, SummaryDate, Quantity);
+
+CREATE TABLE IF NOT EXISTS SalesSummaryWatermarks (
+    Source VARCHAR(32) PRIMARY KEY,
+    LastID INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS ReceiptJobs (
+    OrderID INT PRIMARY KEY REFERENCES Orders(OrderID),
+    CustomerID INT NOT NULL,
+    Status TEXT NOT NULL DEFAULT 'pending' CHECK (Status IN ('pending', 'rendering', 'done', 'failed')),
+    Attempts INT NOT NULL DEFAULT 0,
+    ClaimToken CHAR(32),
+    Error VARCHAR(255),
+    ContentHash CHAR(64),
+    CreatedAt DATETIME NOT NULL,
+    UpdatedAt DATETIME NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_receipt_jobs_status ON ReceiptJobs (Status, OrderID);
+CREATE INDEX IF NOT EXISTS idx_receipt_jobs_claim ON ReceiptJobs (ClaimToken);
+
+CREATE TABLE IF NOT EXISTS ReorderSuggestions (
+    ProductID INT PRIMARY KEY,
+    SupplierID INT,
+    Stock INT NOT NULL,
+    DailyVelocity DECIMAL(12, 3) NOT NULL,
+    DaysOfStock DECIMAL(12, 2),
+    Quantity INT NOT NULL,
+    UpdatedAt DATETIME NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reorder_supplier ON ReorderSuggestions (SupplierID, DaysOfStock);
+CREATE INDEX IF NOT EXISTS idx_reorder_days ON ReorderSuggestions (DaysOfStock, ProductID);
+
+CREATE TABLE IF NOT EXISTS EventLog (
+    EventID INTEGER PRIMARY KEY AUTOINCREMENT,
+    EventType VARCHAR(32) NOT NULL,
+    OrderID INT,
+    ProductID INT,
+    Quantity INT,
+    UnitPrice DECIMAL(10, 2),
+    Stock INT,
+    EventDate DATE NOT NULL,
+    CreatedAt DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS EventOffsets (
+    Consumer VARCHAR(32) PRIMARY KEY,
+    LastEventID INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS StockLevels (
+    ProductID INTEGER PRIMARY KEY,
+    Stock INT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS EventGaps (
+    Consumer VARCHAR(32) NOT NULL,
+    FromID INT NOT NULL,
+    ToID INT NOT NULL,
+    SeenAt DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    PRIMARY KEY (Consumer, FromID)
+);
+
+CREATE TABLE IF NOT EXISTS SchemaMigrations (
+    Version INT PRIMARY KEY,
+    Description VARCHAR(255) NOT NULL,
+    AppliedAt DATETIME NOT NULL
+);
+"""
+
+# Columns added after the schema above was first shipped: (table, column, definition).
+# Existing database files get them before the schema script runs.
+SQLITE_ADDED_COLUMNS = [
+    ("Suppliers", "LeadTimeDays", "INT NOT NULL DEFAULT 7"),
+    ("Products", "SupplierID", "INT REFERENCES Suppliers(SupplierID)"),
+    ("Products", "UpdatedAt", "DATETIME"),
+    ("Sales", "OrderID", "INT"),
+]
+
+SAMPLE_DATA = [
+    ("INSERT OR IGNORE INTO Users (Username, PasswordHash, Role) VALUES (?, ?, ?)",
+     [("admin", "admin123", "admin"), ("customer1", "cust123", "customer")]),
+    # Product names are not unique, so re-running skips the ones already there by name
+    ("""
+        INSERT INTO Products (Name, Category, Price, Stock)
+        SELECT ?, ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM Products WHERE Name = ?)
+     """,
+     [(name, category, price, stock, name) for name, category, price, stock in (
+         ("Laptop", "Electronics", 1200.50, 10), ("Smartphone", "Electronics", 800.00, 5),
+         ("Book", "Education", 15.00, 50))]),
+]
+
+_WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "REPLACE", "CREATE", "ALTER", "DROP")
+
+
+class MySQLStorage:
+    """The production engine: mysql.connector against DB_CONFIG."""
+
+    name = "mysql"
+
+    def __init__(self, config):
+        self.config = config
+
+    def connect(self):
+        import mysql.connector
+
+        # Pooled connections must not carry unread result sets back into the pool.
+        return mysql.connector.connect(consume_results=True, **self.config)
+
+    def is_lock_error(self, error):
+        return getattr(error, "errno", None) in (ER_LOCK_WAIT_TIMEOUT, ER_LOCK_DEADLOCK)
+
+    def index_exists(self, cursor, table, name):
+        cursor.execute("""
+            SELECT 1 FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND INDEX_NAME = %s
+            LIMIT 1
+        """, (self.config["database"], table, name))
+        return cursor.fetchone() is not None
+
+    def column_exists(self, cursor, table, name):
+        cursor.execute("""
+            SELECT 1 FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_NAME = %s
+            LIMIT 1
+        """, (self.config["database"], table, name))
+        return cursor.fetchone() is not None
+
+    def rename_column_sql(self, table, old, new, definition):
+        return f"ALTER TABLE {table} CHANGE COLUMN {old} {new} {definition}"
+
+    def product_search(self, words):
+        """Return (condition, params) matching products where every word starts a word of Name/Category.
+
+        Words long enough for the FULLTEXT index are prefix-matched through
+        it; shorter ones fall back to a prefix LIKE on the Name index.
+        """
+        conditions = []
+        params = []
+        indexed = [word for word in words if len(word) >= FULLTEXT_MIN_WORD]
+        if indexed:
+            conditions.append("MATCH(Name, Category) AGAINST (%s IN BOOLEAN MODE)")
+            params.append(" ".join(f"+{word}*" for word in indexed))
+        for word in words:
+            if len(word) < FULLTEXT_MIN_WORD:
+                conditions.append("(Name LIKE %s OR Category LIKE %s)")
+                params.extend([f"{word}%", f"{word}%"])
+        return " AND ".join(conditions), params
+
+    def explain(self, cursor, query, params):
+        """Return (table, estimated rows, full scan?) for each step of the plan."""
+        cursor.execute(f"EXPLAIN {query}", params)
+        columns = [d[0] for d in cursor.description]
+        plans = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return [(plan.get("table"), plan.get("rows"), plan.get("type") == "ALL") for plan in plans]
+
+    def estimate_rows(self, cursor, query, params):
+        """The planner's estimate of how many rows a SELECT returns.
+
+        Taken from the first (driving) table of the plan, scaled by its
+        "filtered" percentage; joined tables are looked up by key.
+        """
+        cursor.execute(f"EXPLAIN {query}", params)
+        columns = [d[0] for d in cursor.description]
+        row = cursor.fetchone()
+        cursor.fetchall()
+        if row is None:
+            return None
+        plan = dict(zip(columns, row))
+        if plan.get("rows") is None:
+            return None
+        return int(plan["rows"] * float(plan.get("filtered") or 100) / 100)
+
+
+@lru_cache(maxsize=1024)
+def translate_mysql(sql):
+    """Rewrite a MySQL statement for SQLite; returns (sql, takes write lock)."""
+    locking = bool(re.search(r"\bFOR\s+UPDATE\b", sql, re.I))
+    sql = re.sub(r"\s+FOR\s+UPDATE\b", "", sql, flags=re.I)
+    sql = re.sub(r"\bINSERT\s+IGNORE\b", "INSERT OR IGNORE", sql, flags=re.I)
+    sql = re.sub(r"\bNOW\(\)\s*-\s*INTERVAL\s+(%s|\d+)\s+SECOND\b",
+                 r"datetime('now', 'localtime', '-' || \1 || ' seconds')", sql, flags=re.I)
+    sql = re.sub(r"\bNOW\(\)", "datetime('now', 'localtime')", sql, flags=re.I)
+    sql = re.sub(r"\bCURDATE\(\)", "date('now', 'localtime')", sql, flags=re.I)
+    sql = re.sub(r"\bIF\(", "IIF(", sql)
+    # ADD COLUMN ... AFTER x: SQLite always appends
+    sql = re.sub(r"(\bADD\s+COLUMN\b.*?)\s+AFTER\s+\w+", r"\1", sql, flags=re.I | re.S)
+    upsert = re.search(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", sql, re.I)
+    if upsert:
+        # A conflict target may be omitted on the last ON CONFLICT clause (SQLite 3.35+).
+        tail = re.sub(r"\bVALUES\((\w+)\)", r"excluded.\1", sql[upsert.end():], flags=re.I)
+        sql = sql[:upsert.start()] + "ON CONFLICT DO UPDATE SET" + tail
+    sql = sql.replace("%s", "?")
+    statement = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+    return sql, locking or statement in _WRITE_STATEMENTS
+
+
+class SQLiteCursor:
+    """mysql.connector-style cursor over sqlite3 (%s placeholders, dictionary rows)."""
+
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._cursor = connection.raw.cursor()
+        self._dictionary = dictionary
+
+    def _begin_if_needed(self, writes):
+        # Writers take the database write lock up front (BEGIN IMMEDIATE), the
+        # closest match to InnoDB row locks: a SELECT ... FOR UPDATE followed
+        # by an UPDATE can never fail halfway through with "database is locked".
+        if writes and not self._connection.raw.in_transaction:
+            self._cursor.execute("BEGIN IMMEDIATE")
+
+    def execute(self, query, params=()):
+        sql, writes = translate_mysql(query)
+        self._begin_if_needed(writes)
+        self._cursor.execute(sql, tuple(params or ()))
+        return self
+
+    def executemany(self, query, seq_of_params):
+        sql, writes = translate_mysql(query)
+        self._begin_if_needed(writes)
+        self._cursor.executemany(sql, [tuple(params) for params in seq_of_params])
+        return self
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip((d[0] for d in self._cursor.description), row))
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        return (self._row(row) for row in self._cursor)
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """Wraps sqlite3.Connection with the parts of the mysql.connector API the app uses."""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def cursor(self, dictionary=False, buffered=None):
+        # sqlite3 cursors always stream, so ``buffered`` needs no handling.
+        return SQLiteCursor(self, dictionary)
+
+    def commit(self):
+        if self.raw.in_transaction:
+            self.raw.commit()
+
+    def rollback(self):
+        if self.raw.in_transaction:
+            self.raw.rollback()
+
+    def ping(self, reconnect=False):
+        self.raw.execute("SELECT 1").fetchone()
+
+    def is_connected(self):
+        try:
+            self.ping()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def close(self):
+        self.raw.close()
+
+
+class SQLiteStorage:
+    """Embedded engine: one SQLite file in WAL mode, schema created on first use."""
+
+    name = "sqlite"
+
+    def __init__(self, path, pragmas=None):
+        self.path = path
+        self.pragmas = dict(SQLITE_PRAGMAS, **(pragmas or {}))
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def connect(self):
+        raw = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False,
+                              detect_types=sqlite3.PARSE_DECLTYPES,
+                              timeout=self.pragmas["busy_timeout"] / 1000)
+        for pragma, value in self.pragmas.items():
+            raw.execute(f"PRAGMA {pragma} = {value}")
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    self.init_schema(raw)
+                    self._initialized = True
+        return SQLiteConnection(raw)
+
+    def init_schema(self, raw):
+        """Create any missing tables and mark the migrations they include as applied."""
+        from database.migrations import EVENT_LOG_SEED, MIGRATIONS
+
+        had_search = raw.execute("SELECT 1 FROM sqlite_master WHERE name = 'ProductSearch'").fetchone()
+        had_events = raw.execute("SELECT 1 FROM sqlite_master WHERE name = 'EventLog'").fetchone()
+        for table, column, definition in SQLITE_ADDED_COLUMNS:
+            columns = [row[1] for row in raw.execute(f"PRAGMA table_info({table})")]
+            if columns and column not in columns:
+                raw.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        raw.executescript(SQLITE_SCHEMA)
+        if not had_search:
+            # Index products that were added before the search table existed
+            raw.execute("INSERT INTO ProductSearch (ProductSearch) VALUES ('rebuild')")
+        if not had_events:
+            # Start the log from orders and stock that were there before it existed
+            cursor = SQLiteConnection(raw).cursor()
+            for statement in EVENT_LOG_SEED:
+                cursor.execute(statement)
+            raw.commit()
+        raw.execute("BEGIN IMMEDIATE")
+        raw.executemany("""
+            INSERT OR IGNORE INTO SchemaMigrations (Version, Description, AppliedAt)
+            VALUES (?, ?, datetime('now', 'localtime'))
+        """, [(version, description) for version, description, _ in MIGRATIONS])
+        raw.commit()
+
+    def is_lock_error(self, error):
+        return isinstance(error, sqlite3.OperationalError) and "locked" in str(error)
+
+    def index_exists(self, cursor, table, name):
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND tbl_name = %s AND name = %s",
+                       (table, name))
+        return cursor.fetchone() is not None
+
+    def column_exists(self, cursor, table, name):
+        cursor.execute(f"PRAGMA table_info({table})")
+        return any(row[1] == name for row in cursor.fetchall())
+
+    def rename_column_sql(self, table, old, new, definition):
+        return f"ALTER TABLE {table} RENAME COLUMN {old} TO {new}"
+
+    def product_search(self, words):
+        """Return (condition, params) matching products where every word starts a word of Name/Category."""
+        query = " ".join(f'"{word}"*' for word in words)
+        return "ProductID IN (SELECT rowid FROM ProductSearch WHERE ProductSearch MATCH %s)", [query]
+
+    def explain(self, cursor, query, params):
+        """Return (table, estimated rows, full scan?) for each step of the plan."""
+        cursor.execute(f"EXPLAIN QUERY PLAN {query}", params)
+        steps = []
+        for row in cursor.fetchall():
+            detail = row[-1]
+            match = re.match(r"SCAN (\w+)", detail)
+            if match:
+                steps.append((match.group(1), None, "INDEX" not in detail))
+            else:
+                steps.append((detail, None, False))
+        return steps
+
+    def estimate_rows(self, cursor, query, params):
+        """SQLite's planner keeps no row estimates that EXPLAIN reports."""
+        return None
+
+
+def _adapt_date(value):
+    return value.isoformat()
+
+
+def _convert_date(value):
+    return datetime.date.fromisoformat(value.decode())
+
+
+def _convert_datetime(value):
+    return datetime.datetime.fromisoformat(value.decode())
+
+
+sqlite3.register_adapter(decimal.Decimal, float)
+sqlite3.register_adapter(datetime.date, _adapt_date)
+sqlite3.register_adapter(datetime.datetime, lambda value: value.isoformat(" ", "seconds"))
+sqlite3.register_converter("DATE", _convert_date)
+sqlite3.register_converter("DATETIME", _convert_datetime)
+
+
+def load_sample_data(storage):
+    """Insert the README's sample users and products that a SQLite database does not have yet."""
+    conn = storage.connect()
+    try:
+        conn.raw.execute("BEGIN IMMEDIATE")
+        last_id = conn.raw.execute("SELECT COALESCE(MAX(ProductID), 0) FROM Products").fetchone()[0]
+        for query, rows in SAMPLE_DATA:
+            conn.raw.executemany(query, rows)
+        # Opening stock of the new products, as backend/event_log.py logs it
+        conn.raw.execute("""
+            INSERT INTO EventLog (EventType, ProductID, Stock, EventDate)
+            SELECT 'stock_set', ProductID, COALESCE(Stock, 0), date('now', 'localtime')
+            FROM Products WHERE ProductID > ? ORDER BY ProductID
+        """, (last_id,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    from database.db_config import SQLITE_PATH
+
+    if len(sys.argv) > 1 and sys.argv[1] == "init":
+        storage = SQLiteStorage(SQLITE_PATH)
+        storage.connect().close()
+        print(f"SQLite schema ready in {SQLITE_PATH}.")
+        if "--sample" in sys.argv:
+            load_sample_data(storage)
+            print("Sample users and products inserted.")
+    else:
+        print(__doc__)
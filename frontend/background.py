@@ -0,0 +1,124 @@
+import queue
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Database calls and receipt rendering run on these worker threads; Tk widgets
+# are only ever touched on the main thread, from the polling callback below.
+MAX_IN_FLIGHT = 4
+POLL_INTERVAL_MS = 30
+
+_executor = ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT, thread_name_prefix="db-worker")
+_results = queue.Queue()
+_pending = {}  # owner widget -> set of unfinished tasks (main thread only)
+_polling = set()  # Tk roots with a poll scheduled
+
+
+class BackgroundTask:
+    """Handle for work submitted with run_in_background()."""
+
+    def __init__(self, owner, on_success, on_error):
+        self.owner = owner
+        self.on_success = on_success
+        self.on_error = on_error
+        self.cancelled = False
+        self.future = None
+
+    def cancel(self):
+        """Drop the result; the work is skipped if it has not started yet."""
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+        _forget(self)
+
+
+def run_in_background(owner, func, *args, on_success=None, on_error=None):
+    """Run func(*args) on a worker thread and deliver the result on the Tk thread.
+
+    ``on_success(result)`` or ``on_error(exception)`` is called on the main
+    loop once the work finishes, unless ``owner`` has been destroyed or the
+    task was cancelled in the meantime. The owner shows a busy cursor while it
+    has work in flight, and closing it cancels its outstanding tasks.
+    """
+    task = BackgroundTask(owner, on_success, on_error)
+    tasks = _pending.get(owner)
+    if tasks is None:
+        tasks = _pending[owner] = set()
+        owner.bind("<Destroy>", lambda event: _on_destroy(event, owner), add="+")
+    tasks.add(task)
+    _set_busy(owner, True)
+
+    task.future = _executor.submit(_run, task, func, args)
+    _schedule_poll(owner._root())
+    return task
+
+
+def cancel_pending(owner):
+    """Cancel every unfinished task started for ``owner``."""
+    for task in list(_pending.get(owner, ())):
+        task.cancel()
+
+
+def _forget(task):
+    """Stop tracking a task, clearing its owner's busy cursor when it was the last."""
+    tasks = _pending.get(task.owner)
+    if tasks is not None and task in tasks:
+        tasks.discard(task)
+        if not tasks:
+            del _pending[task.owner]
+            _set_busy(task.owner, False)
+
+
+def _run(task, func, args):
+    if task.cancelled:
+        return
+    try:
+        result = func(*args)
+    except Exception as e:
+        _results.put((task, None, e))
+    else:
+        _results.put((task, result, None))
+
+
+def _on_destroy(event, owner):
+    # <Destroy> is also delivered for every child of the owner.
+    if event.widget is owner:
+        cancel_pending(owner)
+
+
+def _set_busy(owner, busy):
+    try:
+        owner.configure(cursor="watch" if busy else "")
+    except Exception:
+        pass  # widget already destroyed or has no cursor option
+
+
+def _schedule_poll(root):
+    if root not in _polling:
+        root.after(POLL_INTERVAL_MS, _poll, root)
+        _polling.add(root)
+
+
+def _poll(root):
+    _polling.discard(root)
+    while True:
+        try:
+            task, result, error = _results.get_nowait()
+        except queue.Empty:
+            break
+
+        _forget(task)
+        if task.cancelled:
+            continue
+
+        callback = task.on_error if error is not None else task.on_success
+        if callback is not None:
+            try:
+                callback(error if error is not None else result)
+            except Exception:
+                root.report_callback_exception(*sys.exc_info())
+
+    if _pending:
+        try:
+            _schedule_poll(root)
+        except Exception:
+            pass  # the root window was closed
@@ -3,105 +3,162 @@ import tkinter as tk
 from idlelib import tree
 from tkinter import messagebox
 from tkinter import ttk
-from database.db_config import connect_to_database
+from backend import services
+from backend.order_service import OrderError
+from backend.receipt_service import receipt_path, start_receipt_worker, stop_receipt_worker
+from backend.reorder_service import LOW_STOCK_LEVEL, start_reorder_worker, stop_reorder_worker
+from backend.services import (authenticate_user, categories, customer_orders_query, reorder_query,
+                              count_past_orders as fetch_past_order_count, past_orders_query,
+                              product_query, register_user)
+from database.query_profiler import dump_profile
+from frontend.background import run_in_background
+from frontend.paged_table import PagedTable
 from datetime import datetime
 import os
 
 
-def generate_receipt(order_id, customer_id):
-    """Generate a PDF receipt for the placed order."""
-    try:
-        db = connect_to_database()
-        cursor = db.cursor(dictionary=True)
-
-        # Get order details
-        cursor.execute("""
-            SELECT o.OrderID, o.OrderDate, o.Quantity, 
-                   p.Name AS ProductName, p.Price, 
-                   u.Username AS CustomerName
-            FROM Orders o
-            JOIN Products p ON o.ProductID = p.ProductID
-            JOIN Users u ON o.CustomerID = u.UserID
-            WHERE o.OrderID = %s AND o.CustomerID = %s
-        """, (order_id, customer_id))
-        order = cursor.fetchone()
-
-        if not order:
-            return None, "Order not found!"
-
-        # Calculate total
-        total = order['Quantity'] * order['Price']
-
-        # Create receipts directory if it doesn't exist
-        if not os.path.exists('receipts'):
-            os.makedirs('receipts')
-
-        # Generate PDF receipt
-        from fpdf import FPDF
-
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", size=12)
-
-        # Receipt header
-        pdf.cell(200, 10, txt="ORDER RECEIPT", ln=1, align='C')
-        pdf.cell(200, 10, txt="-" * 50, ln=1, align='C')
-
-        # Order details
-        pdf.cell(200, 10, txt=f"Order ID: {order['OrderID']}", ln=1)
-        pdf.cell(200, 10, txt=f"Date: {order['OrderDate']}", ln=1)
-        pdf.cell(200, 10, txt=f"Customer: {order['CustomerName']}", ln=1)
-        pdf.cell(200, 10, txt="-" * 50, ln=1)
-
-        # Product details
-        pdf.cell(100, 10, txt="Product", border=1)
-        pdf.cell(30, 10, txt="Price", border=1)
-        pdf.cell(30, 10, txt="Qty", border=1)
-        pdf.cell(30, 10, txt="Subtotal", border=1, ln=1)
-
-        pdf.cell(100, 10, txt=order['ProductName'], border=1)
-        pdf.cell(30, 10, txt=f"${order['Price']:.2f}", border=1)
-        pdf.cell(30, 10, txt=str(order['Quantity']), border=1)
-        pdf.cell(30, 10, txt=f"${total:.2f}", border=1, ln=1)
-
-        # Total
-        pdf.cell(160, 10, txt="TOTAL:", border=1)
-        pdf.cell(30, 10, txt=f"${total:.2f}", border=1, ln=1)
-
-        # Footer
-        pdf.cell(200, 10, txt="Thank you for your order!", ln=1, align='C')
-
-        # Save the PDF
-        filename = f"receipts/Order_{order_id}_{customer_id}.pdf"
-        pdf.output(filename)
-
-        return filename, None
+SEARCH_DEBOUNCE_MS = 250  # wait for a pause in typing before querying
+ALL_CATEGORIES = "All categories"
 
-    except Exception as e:
-        return None, f"Error generating receipt: {e}"
-    finally:
-        if db.is_connected():
-            cursor.close()
-            db.close()
+
+def product_filter_bar(parent, table, in_stock_only):
+    """Search box with category and price filters that re-query ``table`` as the user types."""
+    bar = tk.Frame(parent)
+    search_var = tk.StringVar()
+    category_var = tk.StringVar(value=ALL_CATEGORIES)
+    min_price_var = tk.StringVar()
+    max_price_var = tk.StringVar()
+
+    tk.Label(bar, text="Search:").pack(side=tk.LEFT)
+    tk.Entry(bar, textvariable=search_var, width=25).pack(side=tk.LEFT, padx=5)
+    category_box = ttk.Combobox(bar, textvariable=category_var, values=[ALL_CATEGORIES],
+                                state="readonly", width=16)
+    category_box.pack(side=tk.LEFT, padx=5)
+    tk.Label(bar, text="Price:").pack(side=tk.LEFT)
+    tk.Entry(bar, textvariable=min_price_var, width=7).pack(side=tk.LEFT, padx=2)
+    tk.Label(bar, text="to").pack(side=tk.LEFT)
+    tk.Entry(bar, textvariable=max_price_var, width=7).pack(side=tk.LEFT, padx=2)
+
+    pending = None
+    applied = None
+
+    def apply_filters():
+        nonlocal pending, applied
+        pending = None
+        try:
+            min_price = float(min_price_var.get()) if min_price_var.get().strip() else None
+            max_price = float(max_price_var.get()) if max_price_var.get().strip() else None
+        except ValueError:
+            return  # wait until the number is complete
+        category = category_var.get()
+        filters = (search_var.get().strip().lower(), None if category == ALL_CATEGORIES else category,
+                   min_price, max_price)
+        if filters != applied:
+            applied = filters
+            table.set_query(product_query(in_stock_only, *filters))
+
+    def schedule(*_):
+        nonlocal pending
+        if pending is not None:
+            bar.after_cancel(pending)
+        pending = bar.after(SEARCH_DEBOUNCE_MS, apply_filters)
+
+    for var in (search_var, category_var, min_price_var, max_price_var):
+        var.trace_add("write", schedule)
+    run_in_background(bar, categories,
+                      on_success=lambda names: category_box.config(values=[ALL_CATEGORIES] + names))
+    return bar
+
+
+def stock_tags(product):
+    """Treeview tags that highlight out-of-stock and low-stock products."""
+    stock = product[4]
+    if stock <= 0:
+        return ('out-of-stock',)
+    elif stock < LOW_STOCK_LEVEL:
+        return ('low-stock',)
+    return ()
+
+
+def open_receipt_file(filename):
+    """Open a receipt PDF with the platform's default viewer."""
+    import subprocess
+    if os.name == 'nt':  # Windows
+        os.startfile(filename)
+    else:  # macOS and Linux
+        subprocess.run(['open', filename] if sys.platform == 'darwin' else ['xdg-open', filename])
+
+
+def order_count_text(result):
+    """Label text for a (count, kind) result of KeysetQuery.count_estimate()."""
+    count, kind = result
+    prefix = {"exact": "", "estimate": "About ", "at least": "More than "}[kind]
+    return f"{prefix}{count:,} order{'' if count == 1 else 's'}"
+
+
+def show_order_count(label, query):
+    """Fill ``label`` with the (estimated) number of rows of an order query."""
+    label.config(text="Counting orders...")
+    label.counted_query = query  # a count still running for an older filter is ignored
+
+    def show(text):
+        if label.counted_query is query:
+            label.config(text=text)
+
+    run_in_background(label, query.count_estimate,
+                      on_success=lambda result: show(order_count_text(result)),
+                      on_error=lambda e: show(""))
+
+
+def order_filter_bar(parent, table, make_query, count_label, with_customer=False):
+    """Date range (and customer) filters that re-query ``table`` when applied.
+
+    ``make_query(start_date, end_date[, customer])`` builds the filtered query.
+    """
+    bar = tk.Frame(parent)
+    from_var = tk.StringVar()
+    to_var = tk.StringVar()
+    customer_var = tk.StringVar()
+
+    tk.Label(bar, text="From:").pack(side=tk.LEFT)
+    tk.Entry(bar, textvariable=from_var, width=11).pack(side=tk.LEFT, padx=2)
+    tk.Label(bar, text="To:").pack(side=tk.LEFT)
+    tk.Entry(bar, textvariable=to_var, width=11).pack(side=tk.LEFT, padx=2)
+    if with_customer:
+        tk.Label(bar, text="Customer:").pack(side=tk.LEFT, padx=(5, 0))
+        tk.Entry(bar, textvariable=customer_var, width=15).pack(side=tk.LEFT, padx=2)
+
+    def apply_filters(*_):
+        try:
+            filters = [datetime.strptime(var.get().strip(), "%Y-%m-%d").date() if var.get().strip() else None
+                       for var in (from_var, to_var)]
+        except ValueError:
+            messagebox.showerror("Error", "Dates must be in YYYY-MM-DD format!")
+            return
+        if with_customer:
+            filters.append(customer_var.get().strip() or None)
+        query = make_query(*filters)
+        table.set_query(query)
+        show_order_count(count_label, query)
+
+    tk.Button(bar, text="Filter", command=apply_filters).pack(side=tk.LEFT, padx=5)
+    for child in bar.winfo_children():
+        if isinstance(child, tk.Entry):
+            child.bind("<Return>", apply_filters)
+    return bar
 
 
 def view_past_orders(parent_window, customer_id):
     """Display a window showing the customer's past orders."""
+    run_in_background(parent_window, fetch_past_order_count, customer_id,
+                      on_success=lambda count: show_past_orders(parent_window, customer_id, count),
+                      on_error=lambda e: messagebox.showerror("Error", f"Failed to fetch orders: {e}"))
+
+
+def show_past_orders(parent_window, customer_id, count):
+    """Build the order history window; orders are fetched a page at a time as it scrolls."""
     try:
-        db = connect_to_database()
-        cursor = db.cursor(dictionary=True)
-
-        cursor.execute("""
-            SELECT o.OrderID, o.OrderDate, p.Name AS ProductName, 
-                   o.Quantity, p.Price, (o.Quantity * p.Price) AS Total
-            FROM Orders o
-            JOIN Products p ON o.ProductID = p.ProductID
-            WHERE o.CustomerID = %s
-            ORDER BY o.OrderDate DESC
-        """, (customer_id,))
-        orders = cursor.fetchall()
-
-        if not orders:
+        if count[0] == 0:
             messagebox.showinfo("Info", "You haven't placed any orders yet!")
             return
 
@@ -111,52 +168,31 @@ def view_past_orders(parent_window, customer_id):
 
         tk.Label(orders_window, text="Your Order History", font=("Arial", 16)).pack(pady=10)
 
-        # Create treeview with scrollbars
-        frame = tk.Frame(orders_window)
-        frame.pack(fill=tk.BOTH, expand=True)
-
-        tree = ttk.Treeview(frame, columns=("OrderID", "OrderDate", "ProductName", "Quantity", "Price", "Total"),
-                            show="headings")
-
-        # Define headings
-        tree.heading("OrderID", text="Order ID")
-        tree.heading("OrderDate", text="Date")
-        tree.heading("ProductName", text="Product")
-        tree.heading("Quantity", text="Qty")
-        tree.heading("Price", text="Unit Price")
-        tree.heading("Total", text="Total")
+        # Newest orders first, one row per order
+        table = PagedTable(orders_window, past_orders_query(customer_id), {
+            "OrderID": "Order ID",
+            "OrderDate": "Date",
+            "ProductName": "Product",
+            "Quantity": "Qty",
+            "Total": "Total",
+        }, sort_column="OrderDate", descending=True,
+            row_format=lambda row: (*row[:4], f"${row[4]:.2f}"))
+        tree = table.tree
 
         # Set column widths
         tree.column("OrderID", width=80, anchor='center')
         tree.column("OrderDate", width=100, anchor='center')
         tree.column("ProductName", width=200)
         tree.column("Quantity", width=60, anchor='center')
-        tree.column("Price", width=80, anchor='center')
         tree.column("Total", width=80, anchor='center')
 
-        # Add scrollbars
-        vscroll = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
-        hscroll = ttk.Scrollbar(frame, orient="horizontal", command=tree.xview)
-        tree.configure(yscrollcommand=vscroll.set, xscrollcommand=hscroll.set)
-
-        tree.grid(row=0, column=0, sticky="nsew")
-        vscroll.grid(row=0, column=1, sticky="ns")
-        hscroll.grid(row=1, column=0, sticky="ew")
-
-        # Configure grid weights
-        frame.grid_rowconfigure(0, weight=1)
-        frame.grid_columnconfigure(0, weight=1)
-
-        # Insert order data
-        for order in orders:
-            tree.insert("", tk.END, values=(
-                order['OrderID'],
-                order['OrderDate'],
-                order['ProductName'],
-                order['Quantity'],
-                f"${order['Price']:.2f}",
-                f"${order['Total']:.2f}"
-            ))
+        count_label = tk.Label(orders_window, text=order_count_text(count))
+        order_filter_bar(orders_window, table,
+                         lambda start, end: past_orders_query(customer_id, start, end),
+                         count_label).pack(pady=5)
+        count_label.pack()
+        table.pack(fill=tk.BOTH, expand=True)
+        table.reload()
 
         # Add button to view receipt
         def view_receipt():
@@ -166,17 +202,15 @@ def view_past_orders(parent_window, customer_id):
                 return
 
             order_id = tree.item(selected)['values'][0]
-            filename, error = generate_receipt(order_id, customer_id)
+            run_in_background(orders_window, services.receipt, order_id, customer_id,
+                              on_success=lambda result: show_receipt(*result))
 
+        def show_receipt(filename, error):
             if error:
                 messagebox.showerror("Error", error)
             else:
                 try:
-                    import subprocess
-                    if os.name == 'nt':  # Windows
-                        os.startfile(filename)
-                    else:  # macOS and Linux
-                        subprocess.run(['open', filename] if sys.platform == 'darwin' else ['xdg-open', filename])
+                    open_receipt_file(filename)
                 except Exception as e:
                     messagebox.showinfo("Receipt Generated",
                                         f"Receipt saved as:\n{filename}\n\n(No PDF viewer found to open automatically)")
@@ -189,29 +223,6 @@ def view_past_orders(parent_window, customer_id):
 
     except Exception as e:
         messagebox.showerror("Error", f"Failed to fetch orders: {e}")
-    finally:
-        if db.is_connected():
-            cursor.close()
-            db.close()
-def authenticate_user(username, password):
-    """Authenticate the user by checking credentials in the database."""
-    try:
-        db = connect_to_database()
-        cursor = db.cursor(dictionary=True)
-
-        cursor.execute("SELECT * FROM Users WHERE Username = %s AND Password = %s", (username, password))
-        user = cursor.fetchone()
-
-        if user:
-            return user["Role"], user["UserID"], None  # Return role, user ID, and no error
-        else:
-            return None, None, "Invalid username or password!"
-    except Exception as e:
-        return None, None, f"Authentication error: {e}"
-    finally:
-        if db.is_connected():
-            cursor.close()
-            db.close()
 
 
 def add_product():
@@ -229,23 +240,17 @@ def add_product():
             return
 
         try:
-            db = connect_to_database()
-            cursor = db.cursor()
-
-            cursor.execute("""
-                INSERT INTO Products (Name, Category, Price, Stock)
-                VALUES (%s, %s, %s, %s)
-            """, (name, category, float(price), int(stock)))
-            db.commit()
+            values = (name, category, float(price), int(stock))
+        except ValueError as e:
+            messagebox.showerror("Error", f"Failed to add product: {e}")
+            return
 
+        def on_saved(_):
             messagebox.showinfo("Success", f"Product '{name}' added successfully!")
             add_product_window.destroy()
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to add product: {e}")
-        finally:
-            if db.is_connected():
-                cursor.close()
-                db.close()
+
+        run_in_background(add_product_window, services.add_product, *values, on_success=on_saved,
+                          on_error=lambda e: messagebox.showerror("Error", f"Failed to add product: {e}"))
 
     add_product_window = tk.Toplevel()
     add_product_window.title("Add Product")
@@ -280,89 +285,60 @@ def view_stocks(admin_app):
             return
 
         product_id = tree.item(selected_item)["values"][0]
-        try:
-            db = connect_to_database()
-            cursor = db.cursor()
-
-            cursor.execute("DELETE FROM Products WHERE ProductID = %s", (product_id,))
-            db.commit()
 
+        def on_deleted(_):
             messagebox.showinfo("Success", f"Product ID {product_id} deleted successfully!")
-            tree.delete(selected_item)
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to delete product: {e}")
-        finally:
-            if db.is_connected():
-                cursor.close()
-                db.close()
+            if tree.exists(selected_item):
+                tree.delete(selected_item)
 
-    try:
-        db = connect_to_database()
-        cursor = db.cursor()
-
-        cursor.execute("SELECT * FROM Products")
-        products = cursor.fetchall()
+        run_in_background(view_stocks_window, services.delete_product, product_id, on_success=on_deleted,
+                          on_error=lambda e: messagebox.showerror("Error", f"Failed to delete product: {e}"))
 
+    try:
         view_stocks_window = tk.Toplevel(admin_app)
         view_stocks_window.title("View Stocks")
         view_stocks_window.geometry("600x400")
 
         tk.Label(view_stocks_window, text="Stock Details", font=("Arial", 16)).pack(pady=10)
 
-        tree = ttk.Treeview(view_stocks_window, columns=("ProductID", "Name", "Category", "Price", "Stock"),
-                            show="headings")
-        tree.heading("ProductID", text="Product ID")
-        tree.heading("Name", text="Name")
-        tree.heading("Category", text="Category")
-        tree.heading("Price", text="Price")
-        tree.heading("Stock", text="Stock")
-
-        tree.pack(fill=tk.BOTH, expand=True)
-
-        for product in products:
-            tree.insert("", tk.END, values=product)
+        # Rows are fetched a page at a time as the admin scrolls
+        table = PagedTable(view_stocks_window, product_query(), {
+            "ProductID": "Product ID",
+            "Name": "Name",
+            "Category": "Category",
+            "Price": "Price",
+            "Stock": "Stock",
+        }, sort_column="ProductID")
+        tree = table.tree
+        table.pack(fill=tk.BOTH, expand=True)
+        table.reload()
 
         tk.Button(view_stocks_window, text="Delete Product", command=delete_product).pack(pady=10)
 
     except Exception as e:
         messagebox.showerror("Error", f"Failed to fetch stock data: {e}")
-    finally:
-        if db.is_connected():
-            cursor.close()
-            db.close()
 
 
 def view_products(parent_window, is_admin=False):
     """Open a new window to view available products with stock quantities."""
     try:
-        db = connect_to_database()
-        cursor = db.cursor()
-
-        if is_admin:
-            # Admin sees all products, even those with 0 stock
-            cursor.execute("SELECT ProductID, Name, Category, Price, Stock FROM Products")
-        else:
-            # Customer only sees products with stock > 0
-            cursor.execute("SELECT ProductID, Name, Category, Price, Stock FROM Products WHERE Stock > 0")
-
-        products = cursor.fetchall()
-
         view_products_window = tk.Toplevel(parent_window)
         view_products_window.title("Available Products")
-        view_products_window.geometry("600x400")
+        view_products_window.geometry("650x450")
 
         title = "Product Inventory" if is_admin else "Available Products"
         tk.Label(view_products_window, text=title, font=("Arial", 16)).pack(pady=10)
 
-        columns = ("ProductID", "Name", "Category", "Price", "Stock")
-        tree = ttk.Treeview(view_products_window, columns=columns, show="headings")
-
-        # Configure columns
-        tree.heading("ProductID", text="Product ID")
-        tree.heading("Name", text="Name")
-        tree.heading("Category", text="Category")
-        tree.heading("Price", text="Price")
-        tree.heading("Stock", text="In Stock")
+        # Admin sees all products, even those with 0 stock; customers only see stock > 0.
+        # Rows are fetched a page at a time with stock quantity highlighting.
+        table = PagedTable(view_products_window, product_query(in_stock_only=not is_admin), {
+            "ProductID": "Product ID",
+            "Name": "Name",
+            "Category": "Category",
+            "Price": "Price",
+            "Stock": "In Stock",
+        }, sort_column="ProductID", row_tags=stock_tags)
+        tree = table.tree
 
         # Set column widths
         tree.column("ProductID", width=80, anchor='center')
@@ -371,67 +347,36 @@ def view_products(parent_window, is_admin=False):
         tree.column("Price", width=80, anchor='center')
         tree.column("Stock", width=80, anchor='center')
 
-        tree.pack(fill=tk.BOTH, expand=True)
-
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(view_products_window, orient="vertical", command=tree.yview)
-        scrollbar.pack(side="right", fill="y")
-        tree.configure(yscrollcommand=scrollbar.set)
-
-        # Insert data with stock quantity highlighting
-        for product in products:
-            stock = product[4]
-            if stock <= 0 and not is_admin:
-                continue  # Skip out-of-stock items for customers
-
-            tags = ()
-            if stock <= 0:
-                tags = ('out-of-stock',)
-            elif stock < 5:
-                tags = ('low-stock',)
-
-            tree.insert("", tk.END, values=product, tags=tags)
-
         # Configure tag styles
         tree.tag_configure('out-of-stock', foreground='red')
         tree.tag_configure('low-stock', foreground='orange')
 
+        product_filter_bar(view_products_window, table, in_stock_only=not is_admin).pack(fill=tk.X, padx=10)
+        table.pack(fill=tk.BOTH, expand=True)
+        table.reload()
+
     except Exception as e:
         messagebox.showerror("Error", f"Failed to fetch products: {e}")
-    finally:
-        if db.is_connected():
-            cursor.close()
-            db.close()
 
 
 def place_order(parent_window, customer_id):
     """Open a new window for the customer to place an order with stock visibility."""
     try:
-        db = connect_to_database()
-        cursor = db.cursor()
-
-        cursor.execute("SELECT ProductID, Name, Category, Price, Stock FROM Products WHERE Stock > 0")
-        products = cursor.fetchall()
-
         place_order_window = tk.Toplevel(parent_window)
         place_order_window.title("Place Order")
         place_order_window.geometry("700x500")
 
         tk.Label(place_order_window, text="Available Products (Stock shown)", font=("Arial", 16)).pack(pady=10)
 
-        # Create treeview with scrollbars
-        frame = tk.Frame(place_order_window)
-        frame.pack(fill=tk.BOTH, expand=True)
-
-        tree = ttk.Treeview(frame, columns=("ProductID", "Name", "Category", "Price", "Stock"),
-                            show="headings")
-
-        # Define headings
-        tree.heading("ProductID", text="Product ID")
-        tree.heading("Name", text="Name")
-        tree.heading("Category", text="Category")
-        tree.heading("Price", text="Price")
-        tree.heading("Stock", text="In Stock")
+        # Paged product list with low stock highlighting
+        table = PagedTable(place_order_window, product_query(in_stock_only=True), {
+            "ProductID": "Product ID",
+            "Name": "Name",
+            "Category": "Category",
+            "Price": "Price",
+            "Stock": "In Stock",
+        }, sort_column="ProductID", row_tags=stock_tags)
+        tree = table.tree
 
         # Set column widths
         tree.column("ProductID", width=80, anchor='center')
@@ -440,30 +385,13 @@ def place_order(parent_window, customer_id):
         tree.column("Price", width=80, anchor='center')
         tree.column("Stock", width=80, anchor='center')
 
-        # Add scrollbars
-        vscroll = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
-        hscroll = ttk.Scrollbar(frame, orient="horizontal", command=tree.xview)
-        tree.configure(yscrollcommand=vscroll.set, xscrollcommand=hscroll.set)
-
-        tree.grid(row=0, column=0, sticky="nsew")
-        vscroll.grid(row=0, column=1, sticky="ns")
-        hscroll.grid(row=1, column=0, sticky="ew")
-
-        # Configure grid weights
-        frame.grid_rowconfigure(0, weight=1)
-        frame.grid_columnconfigure(0, weight=1)
-
-        # Insert products with stock highlighting
-        for product in products:
-            stock = product[4]
-            tags = ()
-            if stock < 5:  # Highlight low stock items
-                tags = ('low-stock',)
-            tree.insert("", tk.END, values=product, tags=tags)
-
         # Configure tag style
         tree.tag_configure('low-stock', foreground='orange')
 
+        product_filter_bar(place_order_window, table, in_stock_only=True).pack(fill=tk.X, padx=10)
+        table.pack(fill=tk.BOTH, expand=True)
+        table.reload()
+
         # Quantity input frame
         input_frame = tk.Frame(place_order_window)
         input_frame.pack(pady=10)
@@ -476,126 +404,143 @@ def place_order(parent_window, customer_id):
         btn_frame = tk.Frame(place_order_window)
         btn_frame.pack(pady=10)
 
-        # Place Order button
-        tk.Button(btn_frame, text="Place Order", command=lambda: submit_order()).pack(side=tk.LEFT, padx=5)
+        # Place Order / cart buttons
+        order_btn = tk.Button(btn_frame, text="Place Order", command=lambda: submit_order())
+        order_btn.pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="Add to Cart", command=lambda: add_to_cart()).pack(side=tk.LEFT, padx=5)
+        checkout_btn = tk.Button(btn_frame, text="Checkout Cart (0)", command=lambda: checkout())
+        checkout_btn.pack(side=tk.LEFT, padx=5)
         tk.Button(btn_frame, text="Cancel", command=place_order_window.destroy).pack(side=tk.LEFT, padx=5)
 
-        def submit_order():
+        cart = {}  # product ID -> quantity
+
+        def selected_order_line():
             selected_item = tree.focus()
             if not selected_item:
                 messagebox.showerror("Error", "Please select a product!")
-                return
+                return None
 
             product_id = tree.item(selected_item)["values"][0]
-            current_stock = tree.item(selected_item)["values"][4]
             quantity = quantity_entry.get()
 
             if not quantity or not quantity.isdigit() or int(quantity) <= 0:
                 messagebox.showerror("Error", "Please enter a valid quantity!")
-                return
-
-            if int(quantity) > current_stock:
-                messagebox.showerror("Error", f"Not enough stock! Only {current_stock} available.")
-                return
-
-            try:
-                db = connect_to_database()
-                cursor = db.cursor()
-
-                # Update order and stock in a transaction
-                cursor.execute("START TRANSACTION")
-
-                # Place the order
-                cursor.execute("""
-                    INSERT INTO Orders (CustomerID, ProductID, Quantity, OrderDate)
-                    VALUES (%s, %s, %s, CURDATE())
-                """, (customer_id, product_id, int(quantity)))
-
-                # Get the auto-generated order ID
-                order_id = cursor.lastrowid
-
-                # Update stock
-                cursor.execute("""
-                    UPDATE Products 
-                    SET Stock = Stock - %s 
-                    WHERE ProductID = %s
-                """, (int(quantity), product_id))
-
-                db.commit()
+                return None
+            return product_id, int(quantity)
+
+        def place(order_func, *args):
+            # Stock is checked and decremented atomically by the order service,
+            # so the (possibly stale) value shown in the tree is not trusted here.
+            # The receipt is rendered later by the background receipt worker.
+            def on_placed(order_id):
+                messagebox.showinfo("Order Placed",
+                                    f"Order #{order_id} placed successfully!\n\n"
+                                    f"Your receipt will be saved as:\n{receipt_path(order_id, customer_id)}")
+                place_order_window.destroy()
 
-                # Generate and show receipt
-                filename, error = generate_receipt(order_id, customer_id)
-                if error:
-                    messagebox.showerror("Error", f"Order placed but receipt generation failed: {error}")
+            def on_failed(e):
+                order_btn.config(state=tk.NORMAL)
+                checkout_btn.config(state=tk.NORMAL)
+                if isinstance(e, OrderError):
+                    messagebox.showerror("Error", str(e))
                 else:
-                    try:
-                        import subprocess
-                        if os.name == 'nt':  # Windows
-                            os.startfile(filename)
-                        else:  # macOS and Linux
-                            subprocess.run(['open', filename] if sys.platform == 'darwin' else ['xdg-open', filename])
-                    except:
-                        messagebox.showinfo("Order Placed",
-                                            f"Order #{order_id} placed successfully!\n\nReceipt saved as:\n{filename}")
+                    messagebox.showerror("Error", f"Failed to place order: {e}")
 
-                place_order_window.destroy()
-            except Exception as e:
-                db.rollback()
-                messagebox.showerror("Error", f"Failed to place order: {e}")
-            finally:
-                if db.is_connected():
-                    cursor.close()
-                    db.close()
+            # Disable the buttons so a slow order cannot be submitted twice
+            order_btn.config(state=tk.DISABLED)
+            checkout_btn.config(state=tk.DISABLED)
+            run_in_background(place_order_window, order_func, customer_id, *args,
+                              on_success=on_placed, on_error=on_failed)
+
+        def submit_order():
+            line = selected_order_line()
+            if line:
+                place(services.place_order, *line)
+
+        def add_to_cart():
+            line = selected_order_line()
+            if line:
+                product_id, quantity = line
+                cart[product_id] = cart.get(product_id, 0) + quantity
+                checkout_btn.config(text=f"Checkout Cart ({sum(cart.values())})")
+
+        def checkout():
+            if not cart:
+                messagebox.showerror("Error", "Your cart is empty!")
+                return
+            # The whole cart is one order, one transaction and one receipt
+            place(services.checkout, list(cart.items()))
 
     except Exception as e:
         messagebox.showerror("Error", f"Failed to fetch products: {e}")
-    finally:
-        if db.is_connected():
-            cursor.close()
-            db.close()
 
 
 def view_customer_orders(admin_app):
     """Open a new window to view customer orders."""
     try:
-        db = connect_to_database()
-        cursor = db.cursor()
-
-        query = """
-        SELECT o.OrderID, u.Username AS CustomerName, p.Name AS ProductName, o.Quantity, o.OrderDate
-        FROM Orders o
-        JOIN Users u ON o.CustomerID = u.UserID
-        JOIN Products p ON o.ProductID = p.ProductID
-        ORDER BY o.OrderDate DESC
-        """
-        cursor.execute(query)
-        orders = cursor.fetchall()
+        query = customer_orders_query()
 
         orders_window = tk.Toplevel(admin_app)
         orders_window.title("View Customer Orders")
-        orders_window.geometry("600x400")
+        orders_window.geometry("650x450")
 
         tk.Label(orders_window, text="Customer Orders", font=("Arial", 16)).pack(pady=10)
 
-        tree = ttk.Treeview(orders_window, columns=("OrderID", "CustomerName", "ProductName", "Quantity", "OrderDate"),
-                            show="headings")
-        tree.heading("OrderID", text="Order ID")
-        tree.heading("CustomerName", text="Customer Name")
-        tree.heading("ProductName", text="Product Name")
-        tree.heading("Quantity", text="Quantity")
-        tree.heading("OrderDate", text="Order Date")
+        # Newest orders first, fetched a page at a time
+        table = PagedTable(orders_window, query, {
+            "OrderID": "Order ID",
+            "CustomerName": "Customer Name",
+            "ProductName": "Product Name",
+            "Quantity": "Quantity",
+            "OrderDate": "Order Date",
+        }, sort_column="OrderDate", descending=True)
+
+        count_label = tk.Label(orders_window)
+        order_filter_bar(orders_window, table, customer_orders_query, count_label,
+                         with_customer=True).pack(pady=5)
+        count_label.pack()
+        table.pack(fill=tk.BOTH, expand=True)
+        table.reload()
+        show_order_count(count_label, query)
 
-        tree.pack(fill=tk.BOTH, expand=True)
+    except Exception as e:
+        messagebox.showerror("Error", f"Failed to fetch customer orders: {e}")
 
-        for order in orders:
-            tree.insert("", tk.END, values=order)
+
+def view_reorder_suggestions(admin_app):
+    """Open a window listing the products to reorder, most urgent first."""
+    try:
+        reorder_window = tk.Toplevel(admin_app)
+        reorder_window.title("Reorder Suggestions")
+        reorder_window.geometry("700x450")
+
+        tk.Label(reorder_window, text="Reorder Suggestions", font=("Arial", 16)).pack(pady=10)
+
+        # Fewest days of stock first; products that did not sell show "-"
+        table = PagedTable(reorder_window, reorder_query(), {
+            "ProductID": "Product ID",
+            "Name": "Product Name",
+            "Supplier": "Supplier",
+            "Stock": "Stock",
+            "DaysOfStock": "Days Left",
+            "Quantity": "Order Qty",
+        }, sort_column="DaysOfStock",
+            row_format=lambda row: (*row[:4], "-" if row[4] >= 999999 else row[4], row[5]))
+        table.pack(fill=tk.BOTH, expand=True)
+        table.reload()
+
+        def refresh():
+            run_in_background(reorder_window, services.refresh_reorders,
+                              on_success=lambda counts: table.reload(),
+                              on_error=lambda e: messagebox.showerror("Error", f"Failed to refresh: {e}"))
+
+        btn_frame = tk.Frame(reorder_window)
+        btn_frame.pack(pady=10)
+        tk.Button(btn_frame, text="Refresh Now", command=refresh).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="Close", command=reorder_window.destroy).pack(side=tk.LEFT, padx=5)
 
     except Exception as e:
-        messagebox.showerror("Error", f"Failed to fetch customer orders: {e}")
-    finally:
-        if db.is_connected():
-            cursor.close()
-            db.close()
+        messagebox.showerror("Error", f"Failed to fetch reorder suggestions: {e}")
 
 
 def admin_dashboard():
@@ -718,8 +663,10 @@ def login_screen():
     def perform_login():
         username = username_entry.get()
         password = password_entry.get()
-        role, user_id, error = authenticate_user(username, password)
+        run_in_background(root, authenticate_user, username, password,
+                          on_success=lambda result: finish_login(*result))
 
+    def finish_login(role, user_id, error):
         if error:
             messagebox.showerror("Error", error)
             return
@@ -733,40 +680,6 @@ def login_screen():
     root.mainloop()
 
 
-def register_user(username, password, confirm_password):
-    """Register a new user in the database."""
-    if not username or not password:
-        return "Username and password are required!"
-
-    if password != confirm_password:
-        return "Passwords do not match!"
-
-    try:
-        db = connect_to_database()
-        cursor = db.cursor()
-
-        # Check if username already exists
-        cursor.execute("SELECT * FROM Users WHERE Username = %s", (username,))
-        if cursor.fetchone():
-            return "Username already exists!"
-
-        # Insert new user with 'customer' role by default
-        cursor.execute("""
-            INSERT INTO Users (Username, Password, Role)
-            VALUES (%s, %s, 'customer')
-        """, (username, password))
-        db.commit()
-
-        return None  # No error means success
-
-    except Exception as e:
-        return f"Registration error: {e}"
-    finally:
-        if db.is_connected():
-            cursor.close()
-            db.close()
-
-
 def registration_window():
     """Registration window with modern styling."""
     register_window = tk.Toplevel()
@@ -830,7 +743,10 @@ def registration_window():
         password = password_entry.get()
         confirm_password = confirm_password_entry.get()
 
-        error = register_user(username, password, confirm_password)
+        run_in_background(register_window, register_user, username, password, confirm_password,
+                          on_success=finish_registration)
+
+    def finish_registration(error):
         if error:
             messagebox.showerror("Registration Error", error)
         else:
@@ -842,7 +758,7 @@ def admin_dashboard():
     """Admin dashboard with modern styling."""
     admin_app = tk.Tk()
     admin_app.title("Admin Dashboard")
-    admin_app.geometry("450x400")
+    admin_app.geometry("450x520")
     admin_app.configure(bg="#f0f2f5")
 
     # Custom colors
@@ -864,6 +780,8 @@ def admin_dashboard():
         ("View Stocks", lambda: view_stocks(admin_app)),
         ("Add Product", add_product),
         ("View Customer Orders", lambda: view_customer_orders(admin_app)),
+        ("Reorder Suggestions", lambda: view_reorder_suggestions(admin_app)),
+        ("Query Profile", lambda: view_query_profile(admin_app)),
         ("Logout", lambda: [admin_app.destroy(), login_screen()])
     ]
 
@@ -919,11 +837,38 @@ def customer_dashboard(customer_id):
     customer_app.mainloop()
 
 
+def view_query_profile(admin_app):
+    """Show the slowest database statements and write the report to logs/app.log."""
+    try:
+        report = dump_profile()
+    except Exception as e:
+        messagebox.showerror("Error", f"Failed to build query profile: {e}")
+        return
+
+    profile_window = tk.Toplevel(admin_app)
+    profile_window.title("Query Profile")
+    profile_window.geometry("800x500")
+
+    text = tk.Text(profile_window, wrap="none", font=("Courier", 10))
+    scrollbar = ttk.Scrollbar(profile_window, orient=tk.VERTICAL, command=text.yview)
+    text.configure(yscrollcommand=scrollbar.set)
+    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    text.pack(fill=tk.BOTH, expand=True)
+    text.insert("1.0", report)
+    text.configure(state="disabled")
+
+
 # ... (keep all other functions the same)
 
 def main():
     """Main function to start the application."""
-    login_screen()
+    start_receipt_worker()
+    start_reorder_worker()
+    try:
+        login_screen()
+    finally:
+        stop_reorder_worker()
+        stop_receipt_worker()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,167 @@
+import tkinter as tk
+from collections import deque
+from tkinter import messagebox
+from tkinter import ttk
+
+from backend.pagination import KeysetQuery  # re-exported for the GUI windows
+from frontend.background import run_in_background
+
+PAGE_SIZE = 100
+MAX_PAGES = 3  # pages kept in the Treeview at once
+PREFETCH_MARGIN = 0.15  # fraction of the scroll range that triggers the next page
+
+
+class PagedTable:
+    """A Treeview that loads rows page by page as the user scrolls.
+
+    Only ``max_pages`` pages are kept in the widget; pages scrolled far out of
+    view are dropped and fetched again when the user scrolls back. Clicking a
+    column header re-sorts on the server. ``row_format`` turns a fetched row
+    into the values displayed, e.g. to format prices; keys use the raw row.
+    """
+
+    def __init__(self, parent, query, headings, sort_column, descending=False,
+                 row_tags=None, page_size=PAGE_SIZE, max_pages=MAX_PAGES, row_format=None):
+        self.query = query
+        self.sort_column = sort_column
+        self.descending = descending
+        self.row_tags = row_tags
+        self.row_format = row_format
+        self.page_size = page_size
+        self.max_pages = max_pages
+
+        self.frame = tk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=query.column_names, show="headings")
+        for column, text in headings.items():
+            self.tree.heading(column, text=text, command=lambda c=column: self.sort_by(c))
+
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._on_scroll)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.frame.grid_rowconfigure(0, weight=1)
+        self.frame.grid_columnconfigure(0, weight=1)
+
+        # Each page is (item ids, first row key, last row key), top to bottom
+        self._pages = deque()
+        self._has_before = False
+        self._has_after = True
+        self._loading = False
+        self._generation = 0  # bumped on reload so late pages from an old sort are ignored
+        self._task = None
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def reload(self):
+        """Clear the table and load the first page."""
+        if self._task is not None:
+            self._task.cancel()
+        self._generation += 1
+        self.tree.delete(*self.tree.get_children())
+        self._pages.clear()
+        self._has_before = False
+        self._has_after = True
+        self._load(forward=True)
+
+    def set_query(self, query):
+        """Show the rows of another query with the same columns, e.g. a new search."""
+        self.query = query
+        self.reload()
+
+    def sort_by(self, column):
+        """Sort on a column; clicking the current sort column flips the direction."""
+        if column == self.sort_column:
+            self.descending = not self.descending
+        else:
+            self.sort_column = column
+            self.descending = False
+        self.reload()
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if self._loading:
+            return
+        first, last = float(first), float(last)
+        if last >= 1 - PREFETCH_MARGIN and self._has_after:
+            self._loading = True
+            self.tree.after_idle(self._load, True)
+        elif first <= PREFETCH_MARGIN and self._has_before:
+            self._loading = True
+            self.tree.after_idle(self._load, False)
+
+    def _load(self, forward):
+        if (forward and not self._has_after) or (not forward and not self._has_before):
+            self._loading = False
+            return
+        self._loading = True
+        if forward:
+            key = self._pages[-1][2] if self._pages else None
+        else:
+            key = self._pages[0][1]
+        generation = self._generation
+        # The query runs on a worker thread; rows are inserted back on the Tk thread.
+        self._task = run_in_background(
+            self.tree, self.query.fetch_page,
+            self.sort_column, self.descending, key, forward, self.page_size,
+            on_success=lambda rows: self._on_page(rows, forward, generation),
+            on_error=lambda e: self._on_error(e, generation),
+        )
+
+    def _on_page(self, rows, forward, generation):
+        if generation != self._generation:
+            return
+        self._task = None
+        self._loading = False
+        self._insert_page(rows, forward)
+
+    def _on_error(self, error, generation):
+        if generation != self._generation:
+            return
+        self._task = None
+        self._loading = False
+        self._has_after = self._has_before = False
+        messagebox.showerror("Error", f"Failed to load rows: {error}")
+
+    def _insert_page(self, rows, forward):
+        anchor = self.tree.identify_row(1)
+        if forward:
+            self._has_after = len(rows) == self.page_size
+        elif len(rows) < self.page_size:
+            self._has_before = False
+        if not rows:
+            return
+
+        position = tk.END if forward else 0
+        items = []
+        for row in (rows if forward else reversed(rows)):
+            tags = self.row_tags(row) if self.row_tags else ()
+            values = self.row_format(row) if self.row_format else row
+            items.append(self.tree.insert("", position, values=values, tags=tags))
+        if not forward:
+            items.reverse()
+
+        page = (items, self.query.row_key(rows[0], self.sort_column),
+                self.query.row_key(rows[-1], self.sort_column))
+        if forward:
+            self._pages.append(page)
+        else:
+            self._pages.appendleft(page)
+
+        # Drop the page furthest from the direction of travel.
+        if len(self._pages) > self.max_pages:
+            if forward:
+                dropped = self._pages.popleft()
+                self._has_before = True
+            else:
+                dropped = self._pages.pop()
+                self._has_after = True
+            # Rows may already have been removed by the caller (e.g. a delete).
+            self.tree.delete(*[item for item in dropped[0] if self.tree.exists(item)])
+
+        # Keep the row the user was looking at in view.
+        if anchor and self.tree.exists(anchor):
+            self.tree.see(anchor)
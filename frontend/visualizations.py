@@ -1,68 +1,298 @@
-import mysql.connector
+"""Inventory and sales charts, shown in a window or rendered headless to PNG/SVG.
+
+Every chart is built in two steps: a data function reduces the analytics
+frames to what will actually be drawn (top N products plus "Other", series
+coarsened to at most MAX_SERIES_POINTS points), and a draw function plots
+that onto a Matplotlib axes. plot_*() shows the chart interactively;
+render_chart() draws it with the non-interactive Agg canvas into
+charts/<name>_<hash>.<fmt>, where the hash covers the reduced data, so an
+unchanged chart is never drawn twice.
+
+    python -m frontend.visualizations                     # show all charts
+    python -m frontend.visualizations --render --format svg
+"""
+import argparse
+import glob
+import hashlib
+import os
+import threading
+
 import matplotlib.pyplot as plt
-from database.db_config import connect_to_database
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from backend.analytics import (category_breakdown, coarsest_needed, load_daily_sales, load_products, sales_trend,
+                               top_movers, top_n_with_other)
+from backend.catalog_cache import cached_catalog_query
+from backend.event_log import catch_up
+from backend.forecasting import FORECAST_HORIZON_DAYS, total_demand
+from database.db_config import get_connection
 
+CHARTS_DIR = "charts"
+CHART_FORMATS = ("png", "svg")
+CHART_STYLE_VERSION = 1  # bump when a draw function changes so cached files are redrawn
+CHART_SIZE = (10, 6)
+CHART_DPI = 100
+INVENTORY_TOP_N = 30
+CATEGORY_TOP_N = 8
+MAX_SERIES_POINTS = 400
 
-def plot_inventory():
-    """Plot inventory levels for products."""
-    try:
-        db = connect_to_database()
-        cursor = db.cursor()
+_render_locks = {}
+_render_locks_lock = threading.Lock()
 
-        query = "SELECT Name, Stock FROM Products"
-        cursor.execute(query)
-        data = cursor.fetchall()
 
-        names = [row[0] for row in data]
-        stocks = [row[1] for row in data]
+def fetch_inventory():
+    """Return (Name, Stock) for every product."""
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            query = "SELECT Name, Stock FROM Products"
+            cursor.execute(query)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
 
-        plt.bar(names, stocks, color="blue")
-        plt.xlabel("Product Names")
-        plt.ylabel("Stock Levels")
-        plt.title("Inventory Levels")
-        plt.xticks(rotation=45, ha="right")
-        plt.tight_layout()
-        plt.show()
 
-    finally:
-        if db.is_connected():
+def fetch_sales_trends():
+    """Return (SaleDate, TotalSales) per day, oldest first."""
+    catch_up("sales")
+    with get_connection() as db:
+        cursor = db.cursor()
+        try:
+            query = """
+            SELECT SaleDate, SUM(Quantity) AS TotalSales
+            FROM Sales
+            GROUP BY SaleDate
+            ORDER BY SaleDate
+            """
+            cursor.execute(query)
+            return cursor.fetchall()
+        finally:
             cursor.close()
-            db.close()
 
 
-def plot_sales_trends():
-    """Plot sales trends over time."""
+def _products():
+    return cached_catalog_query("products:frame", load_products)
+
+
+def inventory_data(top_n=INVENTORY_TOP_N):
+    """Stock per product name: the ``top_n`` best-stocked products plus "Other"."""
+    products = _products()
+    return top_n_with_other(products.set_index("Name")["Stock"], top_n)
+
+
+def sales_trend_data(freq="day", window=7, max_points=MAX_SERIES_POINTS):
+    """Units sold per period plus a rolling average, coarsened to at most ``max_points`` periods."""
+    daily = load_daily_sales()
+    freq = coarsest_needed(daily, freq, max_points)
+    trend = sales_trend(daily, freq, window)
+    return trend.rename(columns={"RollingMean": f"{window}-{freq} average"})
+
+
+def category_data(freq="month", value="Revenue", top_n=CATEGORY_TOP_N, max_points=MAX_SERIES_POINTS):
+    """``value`` per period and category, biggest ``top_n`` categories plus "Other"."""
+    daily = load_daily_sales()
+    freq = coarsest_needed(daily, freq, max_points)
+    return category_breakdown(daily, _products(), freq, value, top_n).rename_axis(value, axis=1)
+
+
+def top_movers_data(days=30, n=10):
+    """Change in units sold per product, last ``days`` days vs the ``days`` before."""
+    movers = top_movers(load_daily_sales(), _products(), days, n)
+    return movers.set_index("Name")["Change"].rename(f"Units sold, last {days} days vs previous {days}")
+
+
+def forecast_data(days=90, horizon=FORECAST_HORIZON_DAYS):
+    """Units sold per day over the last ``days`` days, then the forecast total with its error band."""
+    forecast = total_demand(horizon)
+    start = forecast.index[0] - pd.Timedelta(days=days)
+    daily = load_daily_sales(start, forecast.index[0] - pd.Timedelta(days=1))
+    actual = daily.groupby("Date")["Quantity"].sum().reindex(
+        pd.date_range(start, periods=days, freq="D"), fill_value=0)
+    return pd.concat([actual.rename("Actual").astype("float64"), forecast]).rename_axis("Date")
+
+
+def draw_inventory(ax, stock):
+    ax.bar(stock.index.astype(str), stock.to_numpy(), color="blue")
+    ax.set_xlabel("Product Names")
+    ax.set_ylabel("Stock Levels")
+    ax.set_title("Inventory Levels")
+    ax.tick_params(axis="x", labelrotation=45)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment("right")
+
+
+def draw_sales_trends(ax, trend):
+    ax.plot(trend.index, trend["Total"], marker="o" if len(trend) <= 60 else None, label="Total")
+    ax.plot(trend.index, trend.iloc[:, 1], label=trend.columns[1])
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Total Sales")
+    ax.set_title("Sales Trends Over Time")
+    ax.legend()
+    ax.tick_params(axis="x", labelrotation=45)
+
+
+def draw_category_breakdown(ax, table):
+    value = table.columns.name or "Revenue"
+    if table.empty:
+        ax.set_title("No sales to plot")
+        return
+    bottom = np.zeros(len(table))
+    labels = table.index.strftime("%Y-%m-%d")
+    for category in table.columns:
+        values = table[category].to_numpy(dtype=float)
+        ax.bar(labels, values, bottom=bottom, label=category or "(none)")
+        bottom += values
+    ax.set_xlabel("Period")
+    ax.set_ylabel(value)
+    ax.set_title(f"{value} by Category")
+    ax.legend()
+    ax.tick_params(axis="x", labelrotation=45)
+
+
+def draw_top_movers(ax, changes):
+    values = changes.to_numpy()
+    ax.barh(changes.index.astype(str), values, color=np.where(values > 0, "green", "red"))
+    ax.set_xlabel(changes.name)
+    ax.set_title("Top Movers")
+    ax.invert_yaxis()
+
+
+def draw_demand_forecast(ax, table):
+    actual = table["Actual"].dropna()
+    forecast = table[["Forecast", "Low", "High"]].dropna()
+    ax.plot(actual.index, actual.to_numpy(), label="Units sold")
+    ax.plot(forecast.index, forecast["Forecast"].to_numpy(), linestyle="--", label="Forecast")
+    ax.fill_between(forecast.index, forecast["Low"].to_numpy(), forecast["High"].to_numpy(), alpha=0.2,
+                    label="Forecast error")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Units per Day")
+    ax.set_title("Demand Forecast")
+    ax.legend()
+    ax.tick_params(axis="x", labelrotation=45)
+
+
+# name: (data function, draw function)
+CHARTS = {
+    "inventory": (inventory_data, draw_inventory),
+    "sales_trends": (sales_trend_data, draw_sales_trends),
+    "category_breakdown": (category_data, draw_category_breakdown),
+    "top_movers": (top_movers_data, draw_top_movers),
+    "demand_forecast": (forecast_data, draw_demand_forecast),
+}
+
+
+def chart_digest(name, fmt, data):
+    """Return a hash of everything that ends up in the rendered chart."""
+    digest = hashlib.sha256(f"{CHART_STYLE_VERSION}|{name}|{fmt}|{CHART_SIZE}|{CHART_DPI}".encode("utf-8"))
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    digest.update(repr((list(frame.columns), frame.columns.name)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def render_chart(name, fmt="png", directory=CHARTS_DIR, **options):
+    """Draw a chart headless to ``directory`` and return the file name.
+
+    If the file for the same data already exists it is returned without
+    drawing; renders of the chart older than it are removed.
+    """
+    if fmt not in CHART_FORMATS:
+        raise ValueError(f"Unsupported chart format: {fmt}")
+    data_func, draw = CHARTS[name]
+    data = data_func(**options)
+    filename = os.path.join(directory, f"{name}_{chart_digest(name, fmt, data)[:16]}.{fmt}")
+
+    with _render_locks_lock:
+        lock = _render_locks.setdefault((os.path.abspath(directory), name, fmt), threading.Lock())
+    with lock:
+        if os.path.exists(filename):
+            os.utime(filename)  # the current render again, newer than the others
+        else:
+            # A bare Figure renders on the Agg canvas: no GUI backend, safe off the main thread.
+            figure = Figure(figsize=CHART_SIZE, dpi=CHART_DPI)
+            draw(figure.add_subplot(), data)
+            figure.tight_layout()
+
+            os.makedirs(directory, exist_ok=True)
+            temp_name = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                figure.savefig(temp_name, format=fmt)
+                os.replace(temp_name, filename)
+            finally:
+                if os.path.exists(temp_name):
+                    os.remove(temp_name)
+        _remove_older_renders(filename, os.path.join(directory, f"{name}_*.{fmt}"))
+    return filename
+
+
+def _remove_older_renders(filename, pattern):
+    # Another process may be rendering the same chart; only files written
+    # before this one are stale, a newer one is left for its caller.
     try:
-        db = connect_to_database()
-        cursor = db.cursor()
+        current = os.path.getmtime(filename)
+    except FileNotFoundError:
+        return
+    for old in glob.glob(pattern):
+        try:
+            if old != filename and os.path.getmtime(old) < current:
+                os.remove(old)
+        except FileNotFoundError:
+            pass
 
-        query = """
-        SELECT SaleDate, SUM(Quantity) AS TotalSales
-        FROM Sales
-        GROUP BY SaleDate
-        ORDER BY SaleDate
-        """
-        cursor.execute(query)
-        data = cursor.fetchall()
-
-        dates = [row[0] for row in data]
-        sales = [row[1] for row in data]
-
-        plt.plot(dates, sales, marker="o")
-        plt.xlabel("Date")
-        plt.ylabel("Total Sales")
-        plt.title("Sales Trends Over Time")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.show()
-
-    finally:
-        if db.is_connected():
-            cursor.close()
-            db.close()
+
+def render_all_charts(fmt="png", directory=CHARTS_DIR):
+    """Render every chart with default options; returns {name: file name}."""
+    return {name: render_chart(name, fmt, directory) for name in CHARTS}
+
+
+def show_chart(name, **options):
+    """Show a chart in an interactive Matplotlib window."""
+    data_func, draw = CHARTS[name]
+    figure, ax = plt.subplots(figsize=CHART_SIZE)
+    draw(ax, data_func(**options))
+    figure.tight_layout()
+    plt.show()
+
+
+def plot_inventory(top_n=INVENTORY_TOP_N):
+    """Plot stock levels of the ``top_n`` best-stocked products, the rest as "Other"."""
+    show_chart("inventory", top_n=top_n)
+
+
+def plot_sales_trends(freq="day", window=7):
+    """Plot units sold per day, week or month with a rolling average."""
+    show_chart("sales_trends", freq=freq, window=window)
+
+
+def plot_category_breakdown(freq="month", value="Revenue"):
+    """Plot revenue (or units) per category as stacked bars per period."""
+    show_chart("category_breakdown", freq=freq, value=value)
+
+
+def plot_top_movers(days=30, n=10):
+    """Plot the products whose sales changed most over the last ``days`` days."""
+    show_chart("top_movers", days=days, n=n)
+
+
+def plot_demand_forecast(days=90, horizon=FORECAST_HORIZON_DAYS):
+    """Plot the last ``days`` days of sales and the forecast for the next ``horizon`` days."""
+    show_chart("demand_forecast", days=days, horizon=horizon)
 
 
 if __name__ == "__main__":
-    plot_inventory()
-    plot_sales_trends()
+    parser = argparse.ArgumentParser(description="Show or render the inventory and sales charts.")
+    parser.add_argument("--render", action="store_true", help="write chart files instead of opening windows")
+    parser.add_argument("--format", choices=CHART_FORMATS, default="png")
+    parser.add_argument("--output", default=CHARTS_DIR, help="directory for rendered charts")
+    args = parser.parse_args()
+    if args.render:
+        for chart, filename in render_all_charts(args.format, args.output).items():
+            print(f"{chart}: {filename}")
+    else:
+        plot_inventory()
+        plot_sales_trends()
+        plot_category_breakdown()
+        plot_top_movers()
+        plot_demand_forecast()
 # Placeholder for Python script
@@ -0,0 +1,82 @@
+"""Paging through backend/api_server.py routes on a throwaway SQLite database."""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from urllib.parse import urlencode
+
+from backend import api_server, services
+from database.db_config import STORAGE_BACKEND, SQLITE_PATH, close_pool, configure_storage
+
+
+def _get(path, params, token=None):
+    headers = {"authorization": f"Bearer {token}"} if token else {}
+    status, payload = api_server._handle("GET", f"{path}?{urlencode(params)}", headers, b"")
+    # Round-trip through JSON as a client would see the page
+    return status, json.loads(json.dumps(payload, default=api_server._json_default))
+
+
+class PagingTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp(prefix="ecommerce-test-")
+        configure_storage("sqlite", os.path.join(cls.temp_dir, "test.db"))
+        cls.prices = [5.25, 12.5, 12.5, 40, 99.99]
+        for i, price in enumerate(cls.prices):
+            services.add_product(f"Paging Product {i}", "Paging", price, 10 + i)
+        services.register_user("paging_user", "paging-pass", "paging-pass")
+        status, payload = api_server._handle("POST", "/login", {}, json.dumps(
+            {"username": "paging_user", "password": "paging-pass"}).encode())
+        cls.token = payload["token"]
+        user_id = payload["user"]["UserID"]
+        product_ids = [row[0] for row in services.list_products(limit=100)]
+        for quantity, product_id in zip((3, 1, 2), product_ids):
+            services.place_order(user_id, product_id, quantity)
+
+    @classmethod
+    def tearDownClass(cls):
+        close_pool()
+        configure_storage(STORAGE_BACKEND, SQLITE_PATH)
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
+
+    def _all_pages(self, path, params, token=None):
+        items = []
+        status, page = _get(path, params, token)
+        while page["items"]:
+            self.assertEqual(status, 200)
+            items.extend(page["items"])
+            self.assertLessEqual(len(items), 100, "paging does not advance")
+            status, page = _get(path, {**params, **page["next"]}, token)
+        return items
+
+    def test_products_second_page_by_price(self):
+        params = {"in_stock": "0", "sort": "Price", "limit": 2}
+        status, first = _get("/products", params)
+        self.assertEqual(status, 200)
+        status, second = _get("/products", {**params, **first["next"]})
+        self.assertEqual(status, 200)
+        self.assertEqual([item["Price"] for item in second["items"]], [12.5, 40])
+
+        items = self._all_pages("/products", params)
+        self.assertEqual([item["Price"] for item in items], sorted(self.prices))
+        self.assertEqual(len({item["ProductID"] for item in items}), len(self.prices))
+
+    def test_products_descending_by_stock(self):
+        items = self._all_pages("/products", {"in_stock": "0", "sort": "Stock", "desc": "1", "limit": 2})
+        self.assertEqual([item["Stock"] for item in items], sorted((item["Stock"] for item in items), reverse=True))
+        self.assertEqual(len(items), len(self.prices))
+
+    def test_orders_by_total(self):
+        items = self._all_pages("/orders", {"sort": "Total", "limit": 1}, self.token)
+        self.assertEqual(len(items), 3)
+        self.assertEqual([item["Total"] for item in items], sorted((item["Total"] for item in items), reverse=True))
+
+    def test_invalid_page_key(self):
+        status, payload = _get("/products", {"sort": "Price", "after": "cheap", "after_id": 1})
+        self.assertEqual(status, 400)
+        self.assertIn("error", payload)
+
+
+if __name__ == "__main__":
+    unittest.main()